@@ -1,7 +1,12 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from src.agents.orchestrator_agent import OrchestratorAgent
+from src.services.job_service import get_job_manager
+from typing import Any, Dict, Tuple
+import json
 import logging
 import os
+import signal
+import threading
 
 # Configuration du logging
 logging.basicConfig(
@@ -17,37 +22,106 @@ app = Flask(__name__,
     static_url_path='/static'
 )
 
-orchestrator = OrchestratorAgent()
+job_manager = get_job_manager()
+
+# Intervalle entre deux octets envoyés au client pendant une analyse longue
+HEARTBEAT_INTERVAL = 5
+# Temps laissé aux analyses pour s'arrêter à l'arrêt du serveur
+SHUTDOWN_GRACE = 10
+
+def _shutdown(signum, frame):
+    """Annule les analyses en cours avant l'arrêt du serveur."""
+    cancelled = job_manager.cancel_all('server shutdown', wait=SHUTDOWN_GRACE)
+    logger.info(f"Arrêt du serveur: {cancelled} analyses annulées")
+    if callable(_previous_sigterm):
+        _previous_sigterm(signum, frame)
+    else:
+        raise SystemExit(0)
+
+_previous_sigterm = None
+if threading.current_thread() is threading.main_thread():
+    _previous_sigterm = signal.signal(signal.SIGTERM, _shutdown)
+
+def _run_analysis(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Exécute une analyse sur un orchestrateur propre au job: annuler un job
+    interrompt ses agents, pas ceux des analyses menées en parallèle.
+    """
+    return OrchestratorAgent().run_app(*args, **kwargs)
 
 @app.route('/')
 def index():
     """Page d'accueil."""
     return render_template('index.html')
 
+def _analysis_response(result: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Corps et code HTTP de la réponse d'une analyse terminée."""
+    if result['status'] == 'success':
+        return {
+            'status': 'success',
+            'data': result['result'],
+            'report': result.get('report')
+        }, 200
+    elif result['status'] in ('partial', 'cancelled'):
+        # Budget de temps épuisé ou analyse annulée: résultats des étapes terminées
+        # run_id: reprise possible avec le champ resume_id
+        return {
+            'status': result['status'],
+            'run_id': result.get('run_id'),
+            'data': result['result'],
+            'message': result['error'],
+            'report': result.get('report')
+        }, 200
+    return {
+        'status': 'error',
+        'run_id': result.get('run_id'),
+        'message': result['error']
+    }, 500
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
-    """Analyse une entreprise et génère du contenu."""
+    """
+    Analyse une entreprise et génère du contenu.
+
+    L'analyse tourne dans un job annulable (en-tête X-Job-Id). Si elle dure
+    plus de HEARTBEAT_INTERVAL secondes, la réponse JSON est précédée d'espaces
+    envoyés périodiquement: si le client s'est déconnecté, l'écriture échoue
+    et l'analyse est annulée.
+    """
     try:
         url = request.form.get('url')
-        if not url:
+        # Reprise d'une analyse interrompue depuis sa dernière étape terminée
+        resume_id = request.form.get('resume_id')
+        if not url and not resume_id:
             return jsonify({
                 'status': 'error',
                 'message': 'URL is required'
             }), 400
 
-        logger.info(f"Starting analysis for URL: {url}")
-        result = orchestrator.run_app(url)
+        logger.info(f"Starting analysis for URL: {url}" if not resume_id else f"Resuming analysis {resume_id}")
+        budget = request.form.get('budget', type=float)
+        job = job_manager.submit(_run_analysis, url, budget=budget, resume_id=resume_id)
 
-        if result['status'] == 'success':
-            return jsonify({
-                'status': 'success',
-                'data': result['result']
-            })
-        else:
-            return jsonify({
-                'status': 'error',
-                'message': result['error']
-            }), 500
+        # Analyses courtes: réponse classique avec son code HTTP
+        if job.done.wait(HEARTBEAT_INTERVAL):
+            job_manager.forget(job.id)
+            body, status_code = _analysis_response(job.result)
+            return jsonify(body), status_code, {'X-Job-Id': job.id}
+
+        def stream():
+            try:
+                while not job.done.wait(HEARTBEAT_INTERVAL):
+                    # Espace ignoré par le parseur JSON du client
+                    yield ' '
+                body, _ = _analysis_response(job.result)
+                yield json.dumps(body)
+            finally:
+                # Générateur fermé avant la fin de l'analyse: le client est parti
+                if not job.done.is_set():
+                    job_manager.cancel(job.id, 'client disconnected')
+                job_manager.forget(job.id)
+
+        return Response(stream(), mimetype='application/json', headers={'X-Job-Id': job.id})
 
     except Exception as e:
         logger.error(f"Error during analysis: {str(e)}")
@@ -56,6 +130,21 @@ def analyze():
             'message': str(e)
         }), 500
 
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Liste les analyses en cours."""
+    return jsonify({'jobs': [job.to_dict() for job in job_manager.list()]})
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id: str):
+    """Annule une analyse en cours; elle s'arrête à sa prochaine étape."""
+    if not job_manager.cancel(job_id, 'cancelled by client'):
+        return jsonify({
+            'status': 'error',
+            'message': f'No running job {job_id}'
+        }), 404
+    return jsonify({'status': 'cancelling', 'id': job_id}), 202
+
 @app.route('/status')
 def status():
     """Vérifie le statut de l'application."""
@@ -0,0 +1,84 @@
+"""
+Memory benchmark: service dicts versus slotted record types.
+
+Builds the same 100k-record workload twice, once as the dicts the services
+used to return and once as Tweet/RedditPost records, and reports the memory
+held by each with tracemalloc. Also times the conversion to columnar form.
+
+Usage:
+    python -m benchmarks.bench_records [--records 100000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from src.models.records import RedditPost, Tweet, to_columns
+
+def make_tweet_dict(i):
+    return {
+        'id': str(1700000000000000000 + i),
+        'text': f"Tweet number {i} about #python",
+        'created_at': datetime.fromtimestamp(1700000000 + i, tz=timezone.utc),
+        'author_id': str(1000 + i % 5000),
+        'conversation_id': str(1700000000000000000 + i),
+        'metrics': {'like_count': i % 97, 'retweet_count': i % 13, 'reply_count': i % 7, 'quote_count': i % 3}
+    }
+
+def make_post_dict(i):
+    return {
+        'id': f"t3_{i:07x}",
+        'subreddit': 'python',
+        'title': f"Post number {i}",
+        'url': f"https://reddit.com/r/python/comments/{i:07x}",
+        'score': i % 500,
+        'num_comments': i % 50,
+        'is_self': i % 2 == 0,
+        'created_utc': 1700000000.0 + i
+    }
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=100000)
+    args = parser.parse_args()
+    n = args.records
+    half = n // 2
+
+    # Source values are built up front so only the containers are measured
+    tweet_sources = [make_tweet_dict(i) for i in range(half)]
+    post_sources = [make_post_dict(i) for i in range(n - half)]
+
+    dicts, dict_bytes, dict_time = measure(lambda: (
+        [dict(t, metrics=dict(t['metrics'])) for t in tweet_sources],
+        [dict(p) for p in post_sources]
+    ))
+    del dicts
+    records, record_bytes, record_time = measure(lambda: (
+        [Tweet.from_dict(t) for t in tweet_sources],
+        [RedditPost.from_dict(p) for p in post_sources]
+    ))
+
+    start = time.perf_counter()
+    to_columns(records[0])
+    to_columns(records[1])
+    columns_time = time.perf_counter() - start
+
+    print(f"Workload: {half} tweets + {n - half} Reddit posts")
+    print(f"dicts:   {dict_bytes / 1e6:8.1f} MB  ({dict_time:.2f}s to build)")
+    print(f"records: {record_bytes / 1e6:8.1f} MB  ({record_time:.2f}s to build)")
+    print(f"reduction: {100 * (1 - record_bytes / dict_bytes):.0f}%")
+    print(f"records -> columns: {columns_time:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,10 @@
 from typing import List, Optional
-from smolagents import CodeAgent, LiteLLMModel, tool
+from smolagents import CodeAgent, tool
+from src.utils.cancellation import interrupt_on_cancel
+from src.utils.checkpoint import checkpoint_step
+from src.utils.deadline import interrupt_on_deadline
+from src.utils.llm import CachingLiteLLMModel
+from src.utils.memory_compaction import MemoryCompactor
 
 class BaseAgent:
     """Base class for all agents in the system."""
@@ -9,8 +14,10 @@ class BaseAgent:
         name: str,
         description: str,
         tools: List[tool],
-        model_id: str = "anthropic/claude-3-5-sonnet-latest",
-        temperature: float = 0.5
+        model_id: Optional[str] = None,
+        temperature: float = 0.5,
+        task_class: str = 'draft',
+        latency_slo: Optional[float] = None
     ):
         """
         Initialize the base agent.
@@ -19,17 +26,25 @@ class BaseAgent:
             name: Name of the agent
             description: Description of the agent's purpose
             tools: List of tools available to the agent
-            model_id: ID of the model to use
+            model_id: ID of the model to use (routed by task class if omitted)
             temperature: Temperature setting for the model
+            task_class: Task class used to route model calls ('summarize', 'classify', 'draft', 'plan')
+            latency_slo: Latency SLO in seconds (defaults to the task class's)
         """
         self.agent = CodeAgent(
             tools=tools,
-            model=LiteLLMModel(
+            model=CachingLiteLLMModel(
                 model_id=model_id,
-                temperature=temperature
+                temperature=temperature,
+                task_class=task_class,
+                latency_slo=latency_slo
             ),
             name=name,
-            description=description
+            description=description,
+            # Stop between steps once the current request is out of time or cancelled,
+            # keep the resent memory within the compaction threshold, and save the
+            # run's checkpoint (facts pinned by this agent's tools)
+            step_callbacks=[interrupt_on_deadline, interrupt_on_cancel, MemoryCompactor(), checkpoint_step]
         )
     
     def run(self, task: str) -> str:
@@ -1,12 +1,23 @@
 import logging
-from typing import Dict, Any
+import time
+import uuid
+from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
 
-from smolagents import CodeAgent, LiteLLMModel, DuckDuckGoSearchTool
-from src.agents.twitter_agent import twitter_agent 
-from src.agents.reddit_agent import reddit_agent
-from src.agents.web_agent import web_agent
+from smolagents import CodeAgent, DuckDuckGoSearchTool, tool
+from src.agents.twitter_agent import TwitterAgent
+from src.agents.reddit_agent import RedditAgent
+from src.agents.web_agent import build_web_agent, start_prefetch
+from src.analytics.trends import current_trends, format_trends
 from src.config.settings import settings
+from src.services.storage_service import get_data_store
+from src.utils.cancellation import CancelToken, cancel_scope, interrupt_on_cancel
+from src.utils.checkpoint import RunCheckpoint, checkpoint_scope, checkpoint_step
+from src.utils.circuit_breaker import OPEN, circuit_states
+from src.utils.deadline import deadline_scope, interrupt_on_deadline
+from src.utils.llm import CachingLiteLLMModel
+from src.utils.memory_compaction import MemoryCompactor
+from src.utils.run_context import RunReport, run_scope
 
 # Configuration du logging
 logging.basicConfig(
@@ -15,12 +26,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Instructions identiques pour toutes les analyses: elles forment un préfixe
+# stable que le cache de prompts d'Anthropic peut réutiliser d'un appel à l'autre
+ANALYSIS_INSTRUCTIONS = """Analyze the company whose website is given at the end of this task and create a comprehensive social media strategy.
+
+Follow these steps:
+1. Website Analysis:
+   - Analyze the website content and structure
+   - Extract key topics, themes, and value propositions
+   - Identify target audience and key messages
+
+2. Social Media Strategy:
+   For each platform (Twitter and Reddit):
+   - Research relevant communities and hashtags
+   - Analyze engagement patterns and best posting times
+   - Identify key influencers and thought leaders
+   - Review community guidelines and rules
+
+3. Content Creation and Distribution:
+   Twitter:
+   - Create 3-5 educational tweets about the company's key features
+   - Include relevant hashtags and mentions
+   - Ensure content is informative and adds value
+
+   Reddit:
+   - Identify 2-3 relevant subreddits for posting
+   - Create an educational post for each subreddit
+   - Include detailed analysis and insights
+   - Engage with community comments
+
+4. Engagement Plan:
+   - Monitor and respond to comments
+   - Participate in relevant discussions
+   - Share additional insights and resources
+
+Use the following tools and agents:
+- Web Agent: For website analysis and content extraction
+- Twitter Agent: For creating and managing Twitter content
+- Reddit Agent: For creating and managing Reddit content
+- Web Search: For additional research and verification
+- platform_status: Before the steps of a platform, check that it is available;
+  skip the steps of a platform that is down instead of retrying them
+- trending_terms: Once the agents have searched Twitter and Reddit, get the top and
+  rising hashtags, terms and domains of every post and tweet they fetched, to choose
+  hashtags and communities without reading the raw results again
+
+Important Guidelines:
+- Ensure all content is educational and adds value
+- Follow each platform's community guidelines
+- Maintain a professional and helpful tone
+- Include relevant data and examples
+- Engage authentically with the community"""
+
+# Reprise d'une analyse interrompue: les étapes terminées sont déjà dans la mémoire de l'agent
+RESUME_INSTRUCTIONS = """The analysis of {url} was interrupted. The steps above were completed before it stopped.
+Continue the analysis from where it stopped and complete the remaining steps of the original task.
+Do not redo the completed steps: reuse their observations. Variables defined by earlier code are no
+longer available."""
+
+@tool
+def platform_status() -> str:
+    """
+    Check which external platforms (Reddit, Twitter, the LLM provider, scraped
+    websites) are available. Calls to a platform marked DOWN fail immediately
+    until it recovers: skip its steps instead of retrying them.
+
+    Returns:
+        str: Availability of each platform
+    """
+    states = circuit_states()
+    lines = []
+    for name in ('reddit', 'twitter', 'anthropic'):
+        state = states.pop(name, {'state': 'closed'})
+        lines.append(f"{name}: {'DOWN' if state['state'] == OPEN else 'available'}")
+    # Hôtes scrapés: seulement ceux en panne
+    lines.extend(f"{name}: DOWN" for name, state in states.items() if state['state'] == OPEN)
+    return "\n".join(lines)
+
+@tool
+def trending_terms(top: int = 10) -> str:
+    """
+    Rank the hashtags, terms and shared domains of all the tweets and Reddit
+    posts fetched so far in this analysis, and flag those rising in the
+    latest day compared with the days before.
+
+    Args:
+        top: Number of entries per ranking
+
+    Returns:
+        str: Top and rising hashtags, terms and domains, with their counts
+    """
+    tracker = current_trends()
+    if tracker is None:
+        return "No posts or tweets fetched yet"
+    return format_trends(tracker, k=max(1, min(top, 50)))
+
 class OrchestratorAgent:
     """Agent orchestrateur principal qui coordonne tous les autres agents."""
     
     def __init__(
         self,
-        model_id: str = "anthropic/claude-3-5-sonnet-latest",
+        model_id: Optional[str] = None,
         temperature: float = 0.3,
         planning_interval: int = 5,
         verbosity_level: int = 2,
@@ -30,17 +136,26 @@ class OrchestratorAgent:
         self.web_search = DuckDuckGoSearchTool()
         
         self.agent = CodeAgent(
-            model=LiteLLMModel(
+            model=CachingLiteLLMModel(
                 model_id=model_id,
                 api_key=settings.ANTHROPIC_API_KEY,
-                temperature=temperature
+                temperature=temperature,
+                static_prefixes=[ANALYSIS_INSTRUCTIONS],
+                # Modèle de planification choisi par le routeur si aucun n'est imposé
+                task_class='plan'
             ),
-            tools=[self.web_search],
-            managed_agents=[web_agent, twitter_agent, reddit_agent],
+            tools=[self.web_search, platform_status, trending_terms],
+            # Agents propres à cet orchestrateur: l'interruption ou la mémoire d'une analyse
+            # ne touche pas les analyses menées en parallèle par d'autres orchestrateurs
+            managed_agents=[build_web_agent(), TwitterAgent(), RedditAgent()],
             planning_interval=planning_interval,
             verbosity_level=verbosity_level,
             final_answer_checks=[],
-            max_steps=max_steps
+            max_steps=max_steps,
+            # Arrêt entre deux étapes une fois le budget de temps épuisé ou l'analyse annulée,
+            # compaction de la mémoire pour borner la taille du prompt à chaque étape,
+            # puis point de reprise de l'analyse
+            step_callbacks=[interrupt_on_deadline, interrupt_on_cancel, MemoryCompactor(), checkpoint_step]
         )
     
     def _validate_url(self, url: str) -> bool:
@@ -51,81 +166,138 @@ class OrchestratorAgent:
         except Exception:
             return False
     
-    def run_app(self, url: str) -> Dict[str, Any]:
+    def _partial_result(self) -> List[str]:
+        """Observations des étapes terminées avant l'échéance."""
+        return [
+            step.observations for step in getattr(self.agent.memory, 'steps', [])
+            if getattr(step, 'observations', None) and not getattr(step, 'error', None)
+        ]
+    
+    def _resume(self, checkpoint: RunCheckpoint, saved: Dict[str, Any], report: RunReport) -> Any:
+        """Reprend une analyse depuis son dernier point de reprise."""
+        completed = checkpoint.restore(saved['state'])
+        logger.info(f"Reprise de l'analyse {saved['run_id']} après {completed} étapes terminées")
+        report.record_section('checkpoint', 'reused', f"{completed} steps of run {saved['run_id']}")
+        report.increment('resumed_steps', completed)
+        # Nouveau point de reprise avant de supprimer l'ancien: la reprise reste possible si elle échoue
+        checkpoint.save()
+        if saved['run_id'] != checkpoint.run_id:
+            checkpoint.store.delete_checkpoint(saved['run_id'])
+
+        task = RESUME_INSTRUCTIONS.format(url=checkpoint.url)
+        facts = report.pinned_facts()
+        if facts:
+            task += "\n\nResults already obtained (verbatim):\n" + "\n\n".join(
+                f"[{name}]\n{text}" for name, text in facts.items()
+            )
+        return self.agent.run(task, reset=False, max_steps=max(1, self.agent.max_steps - completed))
+    
+    def run_app(self, url: Optional[str] = None, budget: Optional[float] = None,
+                cancel_token: Optional[CancelToken] = None, run_id: Optional[str] = None,
+                resume_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyse une entreprise et crée une stratégie de médias sociaux.
         
         Args:
-            url: URL du site web de l'entreprise
+            url: URL du site web de l'entreprise (celle de l'analyse reprise par défaut)
+            budget: Durée maximale de l'analyse en secondes (settings.RUN_BUDGET par défaut)
+            cancel_token: Jeton d'annulation de l'analyse (client déconnecté, DELETE /jobs/<id>, arrêt du serveur)
+            run_id: Identifiant de l'analyse (resume_id, ou généré si absent)
+            resume_id: Identifiant d'une analyse interrompue à reprendre depuis sa dernière étape terminée
             
         Returns:
-            Dict contenant les résultats de l'analyse
+            Dict contenant les résultats de l'analyse ('partial' si le budget est épuisé,
+            'cancelled' si l'analyse est annulée)
         """
+        run_id = run_id or resume_id or uuid.uuid4().hex
+        started_at = time.time()
         try:
+            saved = None
+            if resume_id:
+                saved = get_data_store().get_checkpoint(resume_id)
+                if saved is None:
+                    raise ValueError(f"Aucun point de reprise pour l'analyse {resume_id}")
+                url = url or saved['url']
+            
             logger.info(f"Début de l'analyse de l'entreprise: {url}")
             
-            if not self._validate_url(url):
+            if not url or not self._validate_url(url):
                 raise ValueError(f"Format d'URL invalide: {url}")
             
-            result = self.agent.run(
-                f"""Analyze the company at {url} and create a comprehensive social media strategy.
-                
-                Follow these steps:
-                1. Website Analysis:
-                   - Analyze the website content and structure
-                   - Extract key topics, themes, and value propositions
-                   - Identify target audience and key messages
-                
-                2. Social Media Strategy:
-                   For each platform (Twitter and Reddit):
-                   - Research relevant communities and hashtags
-                   - Analyze engagement patterns and best posting times
-                   - Identify key influencers and thought leaders
-                   - Review community guidelines and rules
-                
-                3. Content Creation and Distribution:
-                   Twitter:
-                   - Create 3-5 educational tweets about the company's key features
-                   - Include relevant hashtags and mentions
-                   - Ensure content is informative and adds value
-                   
-                   Reddit:
-                   - Identify 2-3 relevant subreddits for posting
-                   - Create an educational post for each subreddit
-                   - Include detailed analysis and insights
-                   - Engage with community comments
-                
-                4. Engagement Plan:
-                   - Monitor and respond to comments
-                   - Participate in relevant discussions
-                   - Share additional insights and resources
-                
-                Use the following tools and agents:
-                - Web Agent: For website analysis and content extraction
-                - Twitter Agent: For creating and managing Twitter content
-                - Reddit Agent: For creating and managing Reddit content
-                - Web Search: For additional research and verification
-                
-                Important Guidelines:
-                - Ensure all content is educational and adds value
-                - Follow each platform's community guidelines
-                - Maintain a professional and helpful tone
-                - Include relevant data and examples
-                - Engage authentically with the community
-                """
-            )
+            # Chaque appel sortant (web, API, LLM, attente de rate limit) est borné par cette échéance
+            # et s'arrête dès que l'analyse est annulée; l'état est sauvegardé après chaque étape
+            with run_scope(run_id) as report, deadline_scope(budget or settings.RUN_BUDGET) as deadline, \
+                    cancel_scope(cancel_token) as token, \
+                    checkpoint_scope(RunCheckpoint(run_id, url, self.agent)) as checkpoint:
+                # Le site est récupéré pendant la planification: c'est presque toujours la première étape
+                stop_prefetch = start_prefetch(url) if saved is None else None
+                try:
+                    if saved is not None:
+                        result = self._resume(checkpoint, saved, report)
+                    else:
+                        # Instructions statiques d'abord (préfixe mis en cache), URL à la fin
+                        result = self.agent.run(f"{ANALYSIS_INSTRUCTIONS}\n\nCompany website to analyze: {url}")
+                except Exception as e:
+                    if token.cancelled:
+                        return self._interrupted(run_id, url, started_at, 'cancelled',
+                                                 f"Analyse annulée ({token.reason})", report.to_dict(), e)
+                    if deadline.expired:
+                        return self._interrupted(run_id, url, started_at, 'partial',
+                                                 f"Budget de {deadline.budget:.0f}s épuisé", report.to_dict(), e)
+                    raise
+                finally:
+                    if stop_prefetch is not None:
+                        stop_prefetch.set()
+                # Analyse terminée: plus rien à reprendre
+                checkpoint.delete()
             
             logger.info("Analyse terminée avec succès")
+            # Sections réutilisées ou recalculées depuis la dernière analyse
+            run_report = report.to_dict()
+            run_report['circuits'] = circuit_states()
+            logger.info(f"Sections réutilisées: {run_report['reused']}, recalculées: {run_report['recomputed']}")
+            counters = run_report['counters']
+            logger.info(
+                f"Tokens LLM: {counters.get('llm_input_tokens', 0)} en entrée, "
+                f"{counters.get('llm_cache_read_tokens', 0)} lus depuis le cache, "
+                f"{counters.get('llm_cache_write_tokens', 0)} écrits dans le cache"
+            )
+            if counters.get('memory_compacted_tokens'):
+                logger.info(f"Compaction de la mémoire: {counters['memory_compacted_tokens']} tokens retirés des prompts")
+            if counters.get('tool_memo_hits'):
+                logger.info(f"Appels d'outils réutilisés dans l'analyse: {counters['tool_memo_hits']}")
+            # Historique des analyses pour l'export (main.py export)
+            get_data_store().save_run(run_id, url, 'success', result=result, started_at=started_at)
             return {
                 'status': 'success',
+                'run_id': run_id,
                 'url': url,
-                'result': result
+                'result': result,
+                'report': run_report
             }
             
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse: {str(e)}")
+            get_data_store().save_run(run_id, url, 'error', error=str(e), started_at=started_at)
             return {
                 'status': 'error',
+                'run_id': run_id,
                 'url': url,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+    
+    def _interrupted(self, run_id: str, url: str, started_at: float, status: str, reason: str,
+                     run_report: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Résultat partiel d'une analyse interrompue (échéance dépassée ou annulation)."""
+        partial = self._partial_result()
+        message = f"{reason} après {len(partial)} étapes terminées"
+        logger.warning(f"{message} ({error})")
+        get_data_store().save_run(run_id, url, status, result=partial, error=message, started_at=started_at)
+        return {
+            'status': status,
+            'run_id': run_id,
+            'url': url,
+            'result': partial,
+            'error': message,
+            'report': run_report
+        }
@@ -1,7 +1,7 @@
 # Standard library imports
 import praw
 import json
-import re
+import math
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -12,13 +12,19 @@ from dotenv import load_dotenv
 
 # Third-party imports
 import backoff
+import numpy as np
 from smolagents import DuckDuckGoSearchTool, tool
 
 # Local imports
-from src.config.settings import settings
 from src.agents.base_agent import BaseAgent
-from src.services.reddit_service import RedditService
-from src.utils.decorators import log_execution_time, rate_limit
+from src.analytics.engagement import EngagementData, format_summary
+from src.analytics.posting_times import PostingTimeCalculator, format_windows
+from src.services.publish_queue import get_publish_queue
+from src.services.reddit_service import RedditService, extract_submission_id
+from src.utils.cancellation import backoff_on_cancel
+from src.utils.deadline import backoff_max_time
+from src.utils.decorators import log_execution_time, run_memo
+from src.utils.run_context import pin_fact
 
 # Configuration
 load_dotenv()
@@ -26,12 +32,12 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @tool
-@backoff.on_exception(backoff.expo, praw.exceptions.RedditAPIException, max_tries=3)
-@rate_limit(calls=30, period=60)
 def publish_post(title: str, content: str, subreddit: str, 
                 post_type: Optional[str] = None, url: Optional[str] = None) -> str:
     """
-    Publie un post sur Reddit dans un subreddit spécifique.
+    Met en file de publication un post Reddit dans un subreddit spécifique.
+    Le post est publié par le worker de publication; la réponse donne l'ID du job,
+    utilisable par comment_on_post (after_job_id) pour y répondre une fois publié.
 
     Args:
         title: Titre du post Reddit
@@ -53,28 +59,28 @@ def publish_post(title: str, content: str, subreddit: str,
         if post_type == "link" and not url:
             raise ValueError("URL requise pour un post de type link")
 
-        # Initialisation de l'API Reddit
-        reddit = get_reddit_client()
-        sub = reddit.subreddit(subreddit)
+        # Publication par le worker, au rythme permis par la limite de Reddit:
+        # l'agent n'attend jamais la limite de débit
+        job = get_publish_queue().enqueue('reddit_post', {
+            'subreddit': subreddit,
+            'title': title,
+            'content': content,
+            'url': url if post_type == "link" else None
+        })
         
-        if post_type is None:
-            post_type = "text"
-        
-        if post_type == "text":
-            submission = sub.submit(title=title, selftext=content)
-        else:  # post_type == "link"
-            submission = sub.submit(title=title, url=url)
-        
-        logger.info(f"Post publié avec succès dans r/{subreddit}")
-        return f"Post publié avec succès! URL: https://reddit.com{submission.permalink}"
+        logger.info(f"Post pour r/{subreddit} mis en file de publication (job {job['id']})")
+        # Post conservé tel quel lors de la compaction de la mémoire des agents
+        pin_fact(f"reddit_post:r/{subreddit}", f"{title}\n{url or content}\njob {job['id']}")
+        return f"Post mis en file de publication (job {job['id']}, statut: {job['status']})"
         
     except Exception as e:
-        logger.error(f"Erreur lors de la publication: {str(e)}")
+        logger.error(f"Erreur lors de la mise en file du post: {str(e)}")
         raise
 
 @tool
-@backoff.on_exception(backoff.expo, praw.exceptions.RedditAPIException, max_tries=3)
-@rate_limit(calls=30, period=60)
+@run_memo()
+@backoff.on_exception(backoff.expo, praw.exceptions.RedditAPIException, max_tries=3, max_time=backoff_max_time,
+                      on_backoff=backoff_on_cancel)
 def analyze_subreddit(subreddit: str) -> str:
     """
     Analyse les règles et tendances d'un subreddit.
@@ -86,14 +92,15 @@ def analyze_subreddit(subreddit: str) -> str:
         if not subreddit:
             raise ValueError("Le nom du subreddit est requis")
 
-        reddit = get_reddit_client()
-        sub = reddit.subreddit(subreddit)
+        # Les règles et les posts chauds passent par le cache Reddit du service,
+        # qui applique lui-même la limite de débit sur les appels réseau.
+        service = get_reddit_service()
         
         # Récupérer les règles
         rules = []
         try:
-            for rule in sub.rules:
-                rules.append(f"- {rule.short_name}: {rule.description}")
+            for rule in service.get_subreddit_rules(subreddit):
+                rules.append(f"- {rule['short_name']}: {rule['description']}")
         except Exception as e:
             logger.warning(f"Impossible de récupérer les règles: {str(e)}")
             rules = ["Règles non accessibles"]
@@ -101,16 +108,13 @@ def analyze_subreddit(subreddit: str) -> str:
         # Analyser les posts populaires récents
         hot_posts = []
         try:
-            for post in sub.hot(limit=10):
-                hot_posts.append({
-                    "title": post.title,
-                    "score": post.score,
-                    "num_comments": post.num_comments,
-                    "is_self": post.is_self
-                })
+            # Une page de 100 posts coûte le même appel API qu'une page de 10
+            hot_posts = service.get_listing(subreddit, 'hot', limit=100)
         except Exception as e:
             logger.warning(f"Impossible de récupérer les posts chauds: {str(e)}")
         
+        engagement = EngagementData.from_reddit_posts(hot_posts)
+        
         analysis = f"""
         Analyse du subreddit r/{subreddit}:
         
@@ -118,15 +122,21 @@ def analyze_subreddit(subreddit: str) -> str:
         {chr(10).join(rules)}
         
         Tendances des posts populaires:
-        - Score moyen: {sum(p['score'] for p in hot_posts) / len(hot_posts) if hot_posts else 0:.0f}
-        - Commentaires moyens: {sum(p['num_comments'] for p in hot_posts) / len(hot_posts) if hot_posts else 0:.0f}
-        - Posts texte: {sum(1 for p in hot_posts if p['is_self'])} / {len(hot_posts)}
+        - Score moyen: {engagement.score.mean() if len(engagement) else 0:.0f} (médian: {np.median(engagement.score) if len(engagement) else 0:.0f})
+        - Commentaires moyens: {engagement.comments.mean() if len(engagement) else 0:.0f}
+        - Posts texte: {sum(1 for p in hot_posts if p.is_self)} / {len(hot_posts)}
+        
+        Statistiques d'engagement:
+        {format_summary(engagement.summary())}
         
         Exemples de titres populaires:
-        {chr(10).join([f"- {p['title'][:80]}..." for p in hot_posts[:3]]) if hot_posts else "Aucun post disponible"}
+        {chr(10).join([f"- {p.title[:80]}..." for p in hot_posts[:3]]) if hot_posts else "Aucun post disponible"}
         """
         
-        logger.info(f"Analyse terminée pour r/{subreddit}")
+        logger.info(
+            f"Analyse terminée pour r/{subreddit} "
+            f"(appels API économisés par le cache: {service.cache_stats()['api_calls_saved']})"
+        )
         return analysis
         
     except Exception as e:
@@ -134,68 +144,148 @@ def analyze_subreddit(subreddit: str) -> str:
         raise
 
 @tool
-@backoff.on_exception(backoff.expo, praw.exceptions.RedditAPIException, max_tries=3)
-@rate_limit(calls=30, period=60)
+@run_memo()
+@backoff.on_exception(backoff.expo, praw.exceptions.RedditAPIException, max_tries=3, max_time=backoff_max_time,
+                      on_backoff=backoff_on_cancel)
+def analyze_subreddits(subreddits: List[str]) -> str:
+    """
+    Compare plusieurs subreddits candidats en une seule fois et les classe par potentiel.
+    À préférer à des appels répétés à analyze_subreddit pour trouver les meilleurs subreddits.
+
+    Args:
+        subreddits: Liste des noms de subreddits à comparer (sans r/)
+    """
+    try:
+        if not subreddits:
+            raise ValueError("Au moins un subreddit est requis")
+
+        service = get_reddit_service()
+        ranked = _rank_subreddits(service.get_subreddits_batch(subreddits, posts_per_subreddit=10))
+        
+        lines = [
+            "| Rang | Subreddit | Abonnés | Score moyen | Commentaires moyens | Posts texte | Règles | Score |",
+            "|---|---|---|---|---|---|---|---|"
+        ]
+        for rank, row in enumerate(ranked, start=1):
+            lines.append(
+                f"| {rank} | r/{row['name']} | {row['subscribers']} | {row['avg_score']:.0f} | "
+                f"{row['avg_comments']:.0f} | {row['self_posts']}/{row['posts']} | {row['rules']} | {row['rank_score']:.2f} |"
+            )
+        
+        unavailable = [entry['name'] for entry in ranked if not entry['exists']]
+        if unavailable:
+            lines.append(f"\nSubreddits introuvables ou privés: {', '.join(unavailable)}")
+        
+        logger.info(f"Comparaison terminée pour {len(ranked)} subreddits")
+        pin_fact('subreddit_ranking', "\n".join(lines))
+        return "\n".join(lines)
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la comparaison: {str(e)}")
+        raise
+
+def _rank_subreddits(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Classe les subreddits selon leur audience et l'engagement de leurs posts chauds"""
+    rows = []
+    for entry in batch:
+        posts = entry['hot_posts']
+        about = entry['about'] or {}
+        subscribers = about.get('subscribers') or 0
+        avg_score = sum(p.score for p in posts) / len(posts) if posts else 0
+        avg_comments = sum(p.num_comments for p in posts) / len(posts) if posts else 0
+        rows.append({
+            'name': entry['name'],
+            'exists': entry['about'] is not None,
+            'subscribers': subscribers,
+            'avg_score': avg_score,
+            'avg_comments': avg_comments,
+            'self_posts': sum(1 for p in posts if p.is_self),
+            'posts': len(posts),
+            'rules': len(entry['rules']),
+            # Audience et engagement sur une échelle logarithmique pour comparer petites et grandes communautés
+            'rank_score': (
+                0.4 * math.log10(subscribers + 1)
+                + 0.3 * math.log10(max(avg_score, 0) + 1)
+                + 0.3 * math.log10(avg_comments + 1)
+            )
+        })
+    return sorted(rows, key=lambda row: row['rank_score'], reverse=True)
+
+@tool
+@run_memo()
+@backoff.on_exception(backoff.expo, praw.exceptions.RedditAPIException, max_tries=3, max_time=backoff_max_time,
+                      on_backoff=backoff_on_cancel)
+def best_posting_times(subreddit: Optional[str] = None, query: Optional[str] = None) -> str:
+    """
+    Calcule les meilleurs créneaux de publication (jour et heure UTC) à partir de l'historique
+    des posts d'un subreddit ou des posts Reddit correspondant à une recherche.
+
+    Args:
+        subreddit: Nom du subreddit (sans r/)
+        query: Recherche Reddit, utilisée si aucun subreddit n'est donné
+    """
+    try:
+        if not subreddit and not query:
+            raise ValueError("Un subreddit ou une recherche est requis")
+
+        calculator = PostingTimeCalculator(reddit_service=get_reddit_service())
+        if subreddit:
+            result = calculator.for_subreddit(subreddit)
+        else:
+            result = calculator.for_reddit_query(query)
+        
+        logger.info(f"Créneaux calculés pour {result['target']} sur {result['sample_size']} posts")
+        return (
+            f"Meilleurs créneaux pour {result['target']} "
+            f"(échantillon de {result['sample_size']} posts):\n"
+            f"{format_windows(result['windows'], immature=result.get('immature', False))}"
+        )
+        
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des créneaux: {str(e)}")
+        raise
+
+@tool
 def comment_on_post(post_url: str, comment_text: str, 
-                   parent_comment_id: Optional[str] = None) -> str:
+                   parent_comment_id: Optional[str] = None, after_job_id: Optional[int] = None) -> str:
     """
-    Ajoute un commentaire à un post Reddit existant.
+    Met en file de publication un commentaire sur un post Reddit existant.
 
     Args:
-        post_url: URL complète du post Reddit à commenter
+        post_url: URL complète du post Reddit à commenter (vide si after_job_id est donné)
         comment_text: Texte du commentaire à publier
         parent_comment_id: ID du commentaire parent si c'est une réponse
+        after_job_id: ID du job d'un post ou commentaire encore en file auquel répondre une fois publié
     """
     try:
+        if not comment_text:
+            raise ValueError("Le texte du commentaire est requis")
         # Extraire l'ID du post depuis l'URL
-        submission_id = _extract_submission_id(post_url)
-        if not submission_id:
+        if after_job_id is None and not parent_comment_id and not extract_submission_id(post_url or ''):
             raise ValueError("Impossible d'extraire l'ID du post depuis l'URL")
         
-        reddit = get_reddit_client()
-        
-        # Récupérer le post
-        submission = reddit.submission(id=submission_id)
+        # Une réponse à un job en file n'est publiée qu'après lui, et échoue s'il échoue
+        job = get_publish_queue().enqueue('reddit_comment', {
+            'post_url': post_url or None,
+            'text': comment_text,
+            'parent_comment_id': parent_comment_id
+        }, depends_on=after_job_id)
         
-        # Si c'est une réponse à un commentaire
-        if parent_comment_id:
-            parent_comment = reddit.comment(id=parent_comment_id)
-            comment = parent_comment.reply(comment_text)
-        else:
-            comment = submission.reply(comment_text)
-        
-        logger.info(f"Commentaire publié avec succès sur {post_url}")
-        return f"Commentaire publié avec succès! URL: https://reddit.com{comment.permalink}"
+        logger.info(f"Commentaire mis en file de publication (job {job['id']})")
+        return f"Commentaire mis en file de publication (job {job['id']}, statut: {job['status']})"
         
     except Exception as e:
-        logger.error(f"Erreur lors de la publication du commentaire: {str(e)}")
+        logger.error(f"Erreur lors de la mise en file du commentaire: {str(e)}")
         raise
 
-def _extract_submission_id(url: str) -> Optional[str]:
-    """Extrait l'ID du post depuis une URL Reddit"""
-    patterns = [
-        r'reddit\.com/r/\w+/comments/([a-zA-Z0-9]+)',
-        r'redd\.it/([a-zA-Z0-9]+)',
-        r'/comments/([a-zA-Z0-9]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    
-    return None
+_reddit_service: Optional[RedditService] = None
 
-def get_reddit_client():
-    """Initialize and return an authenticated Reddit client"""
-    config = settings.get_reddit_config()
-    return praw.Reddit(
-        client_id=config['client_id'],
-        client_secret=config['client_secret'],
-        user_agent=config['user_agent'],
-        username=config['username'],
-        password=config['password']
-    )
+def get_reddit_service() -> RedditService:
+    """Return the Reddit service shared by the tools of this module"""
+    global _reddit_service
+    if _reddit_service is None:
+        _reddit_service = RedditService()
+    return _reddit_service
 
 class RedditAgent(BaseAgent):
     """Agent for handling Reddit interactions."""
@@ -207,10 +297,10 @@ class RedditAgent(BaseAgent):
         super().__init__(
             name=self.name,
             description=self.description,
-            tools=[publish_post, analyze_subreddit, comment_on_post, DuckDuckGoSearchTool()],
+            tools=[publish_post, analyze_subreddit, analyze_subreddits, best_posting_times, comment_on_post, DuckDuckGoSearchTool()],
             temperature=0.7
         )
-        self.reddit_service = RedditService()
+        self.reddit_service = get_reddit_service()
     
     @log_execution_time
     def create_educational_post(self, subreddit: str, topic: str) -> Dict[str, Any]:
@@ -222,7 +312,7 @@ class RedditAgent(BaseAgent):
             topic: Topic to create post about
             
         Returns:
-            Dict containing post information
+            The publish job of the post
         """
         # First, get subreddit info to ensure it exists and check rules
         subreddit_info = self.reddit_service.get_subreddit_info(subreddit)
@@ -236,12 +326,12 @@ class RedditAgent(BaseAgent):
         
         response = self.run(prompt)
         
-        # Create the post
-        return self.reddit_service.create_post(
-            subreddit=subreddit,
-            title=response.get('title', f'Educational Post: {topic}'),
-            content=response.get('content', '')
-        )
+        # Queue the post: the publish worker posts it within Reddit's rate limit
+        return get_publish_queue().enqueue('reddit_post', {
+            'subreddit': subreddit,
+            'title': response.get('title', f'Educational Post: {topic}'),
+            'content': response.get('content', '')
+        })
     
     @log_execution_time
     def analyze_subreddit(self, subreddit: str) -> Dict[str, Any]:
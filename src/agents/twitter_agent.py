@@ -1,34 +1,41 @@
 # Standard library imports
 import tweepy
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 # Third-party imports
 import backoff
 from smolagents import tool
 
 # Local imports
-from src.config.settings import settings
 from src.agents.base_agent import BaseAgent
+from src.analytics.engagement import EngagementData
+from src.analytics.influencers import format_influencers, score_influencers
+from src.analytics.posting_times import PostingTimeCalculator, format_windows
+from src.models.records import _iso
+from src.services.publish_queue import get_publish_queue
 from src.services.twitter_service import TwitterService
-from src.utils.decorators import log_execution_time, rate_limit
+from src.utils.cancellation import backoff_on_cancel
+from src.utils.deadline import backoff_max_time
+from src.utils.decorators import log_execution_time, run_memo
+from src.utils.run_context import pin_fact
 
 # Configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @tool
-@backoff.on_exception(backoff.expo, tweepy.TweepyException, max_tries=3)
-@rate_limit(calls=50, period=900)  # 50 tweets per 15 minutes (Twitter's limit)
-def post_tweet(text: str) -> Dict[str, Any]:
+def post_tweet(text: str, reply_to_job_id: Optional[int] = None) -> Dict[str, Any]:
     """
-    Post a tweet to Twitter.
+    Queue a tweet for posting to Twitter. The publish worker posts it within
+    Twitter's rate limit; for a thread, pass the job ID of the previous tweet.
 
     Args:
         text: The text content of the tweet (max 280 characters)
+        reply_to_job_id: Job ID of the queued tweet this one replies to (next tweet of a thread)
     
     Returns:
-        dict: Contains success status, tweet ID, and URL if successful
+        dict: Contains success status, the publish job ID and its status
     """
     try:
         if not text or len(text.strip()) == 0:
@@ -38,72 +45,82 @@ def post_tweet(text: str) -> Dict[str, Any]:
             text = text[:277] + "..."
             logger.warning(f"Tweet text was truncated to 280 characters")
         
-        client = get_twitter_client()
-        response = client.create_tweet(text=text)
+        # A reply is only posted after the tweet it replies to, and fails if that one fails
+        job = get_publish_queue().enqueue('tweet', {'text': text}, depends_on=reply_to_job_id)
         
         result = {
             "success": True,
-            "tweet_id": response.data['id'],
-            "text": text,
-            "url": f"https://twitter.com/user/status/{response.data['id']}"
+            "queued": True,
+            "job_id": job['id'],
+            "status": job['status'],
+            "text": text
         }
         
-        logger.info(f"Tweet posted successfully: {result['url']}")
+        logger.info(f"Tweet queued for posting (job {job['id']})")
+        # Kept verbatim when the agents' memory is compacted
+        pin_fact(f"tweet:job {job['id']}", text)
         return result
         
     except Exception as e:
-        logger.error(f"Error posting tweet: {str(e)}")
+        logger.error(f"Error queueing tweet: {str(e)}")
         return {"success": False, "error": str(e)}
 
 @tool
-@backoff.on_exception(backoff.expo, tweepy.TweepyException, max_tries=3)
-@rate_limit(calls=900, period=900)  # 900 requests per 15 minutes
-def get_user_timeline(username: str, count: int = 5) -> Dict[str, Any]:
+# only_new depends on the previous only_new call: never reused
+@run_memo(bypass=lambda args: args['only_new'])
+@backoff.on_exception(backoff.expo, tweepy.TweepyException, max_tries=3, max_time=backoff_max_time,
+                      on_backoff=backoff_on_cancel)
+def get_user_timeline(username: str, count: int = 5, only_new: bool = False) -> Dict[str, Any]:
     """
     Get recent tweets from a user's timeline.
 
     Args:
         username: Twitter username (without @)
-        count: Number of tweets to retrieve (max 100)
+        count: Number of tweets to retrieve (max 3200)
+        only_new: Only return tweets posted since the previous only_new call for this user
     
     Returns:
-        dict: Contains user info and list of recent tweets
+        dict: Contains user info, list of recent tweets and engagement statistics
     """
     try:
         if not username:
             raise ValueError("Username is required")
             
-        count = min(max(1, count), 100)  # Ensure count is between 1 and 100
+        count = min(max(1, count), 3200)  # The API serves at most the 3200 latest tweets
         
-        client = get_twitter_client()
-        user = client.get_user(username=username)
+        service = get_twitter_service()
+        user = service.get_users([username]).get(username.lstrip('@').lower())
         
-        if not user.data:
+        if not user:
             return {"success": False, "error": f"User @{username} not found"}
-            
-        tweets = client.get_users_tweets(
-            id=user.data.id,
-            tweet_fields=["created_at", "public_metrics"],
-            max_results=count
+        
+        # Pages are fetched lazily, so small counts cost a single request
+        tweets = service.iter_user_timeline(
+            user["id"],
+            max_tweets=count,
+            incremental=only_new
         )
         
         result = {
             "success": True,
             "user": {
-                "id": user.data.id,
-                "username": user.data.username,
-                "name": user.data.name,
-                "description": user.data.description
+                "id": user["id"],
+                "username": user["username"],
+                "name": user["name"],
+                "description": user["description"]
             },
             "tweets": [{
-                "id": tweet.id,
-                "text": tweet.text,
-                "created_at": tweet.created_at,
-                "url": f"https://twitter.com/{user.data.username}/status/{tweet.id}",
-                "metrics": tweet.public_metrics
-            } for tweet in tweets.data] if tweets.data else []
+                "id": tweet["id"],
+                "text": tweet["text"],
+                # Records keep epoch seconds; the model reads dates better
+                "created_at": _iso(tweet["created_at"]),
+                "url": f"https://twitter.com/{user['username']}/status/{tweet['id']}",
+                "metrics": tweet["metrics"]
+            } for tweet in tweets]
         }
         
+        result["engagement"] = EngagementData.from_tweets(result["tweets"]).summary()
+        
         logger.info(f"Retrieved {len(result['tweets'])} tweets from @{username}")
         return result
         
@@ -111,17 +128,70 @@ def get_user_timeline(username: str, count: int = 5) -> Dict[str, Any]:
         logger.error(f"Error fetching user timeline: {str(e)}")
         return {"success": False, "error": str(e)}
 
-def get_twitter_client():
-    """Initialize and return an authenticated Twitter client"""
-    config = settings.get_twitter_config()
-    return tweepy.Client(
-        consumer_key=config['api_key'],
-        consumer_secret=config['api_secret'],
-        access_token=config['access_token'],
-        access_token_secret=config['access_token_secret'],
-        wait_on_rate_limit=True
+@tool
+@run_memo()
+@backoff.on_exception(backoff.expo, tweepy.TweepyException, max_tries=3, max_time=backoff_max_time,
+                      on_backoff=backoff_on_cancel)
+def best_tweet_times(query: str) -> str:
+    """
+    Compute the best posting windows (day and UTC hour) from the engagement
+    of recent tweets matching a search query.
+
+    Args:
+        query: Twitter search query (keywords or hashtags)
+    
+    Returns:
+        str: Ranked table of posting windows
+    """
+    if not query:
+        raise ValueError("Query is required")
+    
+    calculator = PostingTimeCalculator(twitter_service=get_twitter_service())
+    result = calculator.for_tweet_query(query)
+    
+    logger.info(f"Computed posting windows for {result['target']} from {result['sample_size']} tweets")
+    return (
+        f"Best posting windows for {result['target']} "
+        f"(sample of {result['sample_size']} tweets):\n{format_windows(result['windows'])}"
     )
 
+@tool
+@run_memo()
+@backoff.on_exception(backoff.expo, tweepy.TweepyException, max_tries=3, max_time=backoff_max_time,
+                      on_backoff=backoff_on_cancel)
+def find_influencers(topic: str, max_tweets: int = 300) -> str:
+    """
+    Find the key influencers for a topic by ranking the authors of recent
+    tweets on reach, engagement and recency.
+
+    Args:
+        topic: Twitter search query (keywords or hashtags)
+        max_tweets: Number of recent tweets to collect (max 1000)
+    
+    Returns:
+        str: Ranked table of influencers
+    """
+    if not topic:
+        raise ValueError("Topic is required")
+    
+    service = get_twitter_service()
+    tweets = list(service.iter_search(topic, max_tweets=min(max(10, max_tweets), 1000), incremental=False))
+    # One lookup per 100 distinct authors, cached users cost nothing
+    users = service.get_users_by_ids([tweet["author_id"] for tweet in tweets])
+    influencers = score_influencers(tweets, users, top=10)
+    
+    logger.info(f"Ranked {len(users)} authors from {len(tweets)} tweets about '{topic}'")
+    return f"Key influencers for '{topic}' ({len(tweets)} tweets, {len(users)} authors):\n{format_influencers(influencers)}"
+
+_twitter_service: Optional[TwitterService] = None
+
+def get_twitter_service() -> TwitterService:
+    """Return the Twitter service shared by the tools of this module"""
+    global _twitter_service
+    if _twitter_service is None:
+        _twitter_service = TwitterService()
+    return _twitter_service
+
 class TwitterAgent(BaseAgent):
     """Agent for handling Twitter interactions."""
     
@@ -132,10 +202,10 @@ class TwitterAgent(BaseAgent):
         super().__init__(
             name=self.name,
             description=self.description,
-            tools=[post_tweet, get_user_timeline],
+            tools=[post_tweet, get_user_timeline, best_tweet_times, find_influencers],
             temperature=0.7
         )
-        self.twitter_service = TwitterService()
+        self.twitter_service = get_twitter_service()
     
     @log_execution_time
     def create_educational_tweet(self, topic: str) -> Dict[str, Any]:
@@ -146,7 +216,7 @@ class TwitterAgent(BaseAgent):
             topic: Topic to tweet about
             
         Returns:
-            Dict containing tweet information
+            The publish job of the tweet
         """
         # Generate tweet content using the agent
         prompt = f"""
@@ -160,8 +230,8 @@ class TwitterAgent(BaseAgent):
         
         response = self.run(prompt)
         
-        # Create the tweet
-        return self.twitter_service.create_tweet(response.get('content', ''))
+        # Queue the tweet: the publish worker posts it within Twitter's rate limit
+        return get_publish_queue().enqueue('tweet', {'text': response.get('content', '')})
     
     @log_execution_time
     def analyze_topic(self, topic: str) -> Dict[str, Any]:
@@ -206,7 +276,7 @@ class TwitterAgent(BaseAgent):
             num_tweets: Number of tweets in the thread
             
         Returns:
-            List of tweet information dictionaries
+            List of publish jobs, one per tweet
         """
         # Generate thread content using the agent
         prompt = f"""
@@ -222,13 +292,15 @@ class TwitterAgent(BaseAgent):
         response = self.run(prompt)
         tweets = response.get('tweets', [])
         
-        # Create the tweets
-        created_tweets = []
+        # Queue the tweets, each one a reply to the previous one: the worker
+        # posts them in order and stops the thread if a tweet fails
+        queue = get_publish_queue()
+        jobs = []
         for tweet_content in tweets:
-            tweet = self.twitter_service.create_tweet(tweet_content)
-            created_tweets.append(tweet)
+            jobs.append(queue.enqueue('tweet', {'text': tweet_content},
+                                      depends_on=jobs[-1]['id'] if jobs else None))
         
-        return created_tweets
+        return jobs
 
 # Create an instance of TwitterAgent for use in other modules
 twitter_agent = TwitterAgent()
\ No newline at end of file
@@ -1,22 +1,56 @@
 # Standard library imports
-import requests
-from typing import Dict, Any, List
+import logging
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
 
-# Third-party imports
-from anthropic import Anthropic
 from bs4 import BeautifulSoup
-from smolagents import tool, CodeAgent, LiteLLMModel
+
+# Third-party imports
+from anthropic import Anthropic, AsyncAnthropic
+from smolagents import tool, CodeAgent
 
 # Local imports
 from src.config.settings import settings
 from src.agents.base_agent import BaseAgent
-from src.services.web_service import WebService
-from src.utils.decorators import log_execution_time, rate_limit
+from src.services.storage_service import get_data_store
+from src.services.web_service import AsyncWebService, WebService
+from src.utils.aio import gather_bounded, in_current_context, run_blocking
+from src.utils.circuit_breaker import CircuitBreakerSession
+from src.utils.content_extractor import Extraction, get_content_extractor
+from src.utils.cancellation import interrupt_on_cancel
+from src.utils.checkpoint import checkpoint_step
+from src.utils.deadline import interrupt_on_deadline
+from src.utils.decorators import log_execution_time, rate_limit, run_memo
+from src.utils.fingerprint import content_fingerprint
+from src.utils.llm import CachingLiteLLMModel, cached_system, record_usage
+from src.utils.model_router import get_model_router
+from src.utils.run_context import current_report, pin_fact, record_section
 
-# Initialize Anthropic client
+logger = logging.getLogger(__name__)
+
+# Initialize Anthropic clients
 client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+async_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+
+# Scraping session: timeouts within the run's deadline, fast failure while a host is failing
+session = CircuitBreakerSession(timeout=settings.WEB_TIMEOUT)
+
+# Static instructions go in a cached system prompt; the page or description goes in the user message
+DESCRIPTION_INSTRUCTIONS = "Summarize the website content you are given as a professional company description."
+PROFILER_INSTRUCTIONS = (
+    "Based on the company description you are given, please provide a detailed ideal customer profile including:\n"
+    "1. Demographics (age, role, industry)\n"
+    "2. Pain points and challenges they face\n"
+    "3. Goals and objectives they want to achieve\n"
+    "4. Decision-making factors\n"
+    "5. Technical sophistication level\n"
+    "Please format this as a clear, professional customer profile."
+)
 
 @tool
+@run_memo()
 @rate_limit(calls=10, period=60)
 def describe_company_from_url(url: str) -> str:
     """
@@ -25,12 +59,37 @@ def describe_company_from_url(url: str) -> str:
     Args:
         url: The URL of the company website to summarize.
     """
-    website_text = scrape_website(url)
-    if website_text.startswith("Error"):
-        return website_text
-    return generate_description(website_text)
+    try:
+        # Extracted once per run, possibly already by the prefetch
+        extraction, previous = fetch_page(url)
+    except Exception as e:
+        return f"Error scraping site: {e}"
+
+    fingerprint, description = _reuse_description(url, extraction.fingerprint, previous)
+    if description is None:
+        description = generate_description(extraction.text[:8000])  # truncate for Claude
+        _save_description(url, fingerprint, description, previous)
+    # Kept verbatim when the agents' memory is compacted
+    pin_fact(f"company_description:{url}", description)
+    return description
+
+def _reuse_description(url: str, fingerprint: str, previous: Optional[Dict[str, Any]]) -> Tuple[str, Optional[str]]:
+    """Fingerprint of the page content, and the description stored for it if any."""
+    # The description only changes when the page content does
+    cached = get_data_store().get_analysis('description', fingerprint)
+    if cached is None:
+        return fingerprint, None
+    unchanged = previous is not None and previous['fingerprint'] == fingerprint
+    record_section(f"description:{url}", 'reused',
+                   "page unchanged" if unchanged else "page content seen in an earlier run")
+    return fingerprint, cached['content']
+
+def _save_description(url: str, fingerprint: str, description: str, previous: Optional[Dict[str, Any]]) -> None:
+    get_data_store().save_analysis('description', fingerprint, description, url=url)
+    record_section(f"description:{url}", 'recomputed', "new page" if previous is None else "page changed")
 
 @tool
+@run_memo()
 @rate_limit(calls=10, period=60)
 def profiler(company_description: str) -> str:
     """
@@ -39,51 +98,254 @@ def profiler(company_description: str) -> str:
     Args:
         company_description: The description of the company to analyze.
     """
-    prompt = (
-        f"Here is a company description:\n\n{company_description}\n\n"
-        "Based on this description, please provide a detailed ideal customer profile including:\n"
-        "1. Demographics (age, role, industry)\n"
-        "2. Pain points and challenges they face\n"
-        "3. Goals and objectives they want to achieve\n"
-        "4. Decision-making factors\n"
-        "5. Technical sophistication level\n"
-        "Please format this as a clear, professional customer profile."
-    )
-    
-    response = client.messages.create(
-        model="claude-3-opus-20240229",
+    # An unchanged description gets the profile generated for it last time
+    store = get_data_store()
+    fingerprint = content_fingerprint(company_description)
+    cached = store.get_analysis('profile', fingerprint)
+    if cached:
+        record_section('profile', 'reused', "company description unchanged")
+        pin_fact('company_profile', cached['content'])
+        return cached['content']
+
+    response = get_model_router().call('summarize', lambda model, timeout: client.messages.create(
+        model=model,
         max_tokens=300,
         temperature=0.5,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return response.content[0].text
+        system=cached_system(PROFILER_INSTRUCTIONS),
+        messages=[{"role": "user", "content": f"Here is a company description:\n\n{company_description}"}],
+        timeout=timeout
+    ))
+    record_usage(response.usage, response.model)
+    profile = response.content[0].text
+    store.save_analysis('profile', fingerprint, profile)
+    record_section('profile', 'recomputed', "new company description")
+    pin_fact('company_profile', profile)
+    return profile
 
 def scrape_website(url: str) -> str:
     """Scrape text content from the given website URL."""
+    text = fetch_page_text(url)
+    return text if text.startswith("Error") else text[:8000]  # truncate for Claude
+
+def fetch_html(url: str) -> Tuple[str, int]:
+    """
+    Fetch a page, at most once per run: a page being fetched by the prefetch
+    is waited for rather than fetched again.
+
+    Args:
+        url: Page URL
+
+    Returns:
+        HTML of the page and HTTP status code
+    """
+    def fetch() -> Tuple[str, int]:
+        response = session.get(url)
+        return response.text, response.status_code
+
+    report = current_report()
+    if report is None:
+        return fetch()
+    # Failed fetches raise and are not kept: the next call tries again
+    page, _ = report.memoized(f"fetch:{url}", fetch)
+    return page
+
+def fetch_page(url: str) -> Tuple[Extraction, Optional[Dict[str, Any]]]:
+    """
+    Fetch the main content of a page and store it with its fingerprint, at
+    most once per run: the prefetch and the agents share one extraction.
+
+    Args:
+        url: Page URL
+
+    Returns:
+        Extraction of the page, and the page as stored before this run (None if new)
+    """
+    def extract() -> Tuple[Extraction, Optional[Dict[str, Any]]]:
+        html, status_code = fetch_html(url)
+        # Navigation, cookie banners, footers and site-wide template blocks are dropped
+        extraction = get_content_extractor().extract(html, url)
+        store = get_data_store()
+        previous = store.get_page(url)
+        store.save_page(
+            url,
+            extraction.text,
+            status_code=status_code,
+            title=extraction.title,
+            fingerprint=extraction.fingerprint
+        )
+        return extraction, previous
+
+    report = current_report()
+    if report is None:
+        return extract()
+    # Failed extractions raise and are not kept, like failed fetches
+    page, _ = report.memoized(f"page:{url}", extract)
+    return page
+
+def fetch_page_text(url: str) -> str:
+    """Fetch the main text content of the given website URL and store it with its fingerprint."""
     try:
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-        # Remove scripts and styles
-        for tag in soup(["script", "style"]): tag.decompose()
-        return ' '.join(soup.stripped_strings)[:8000]  # truncate for Claude
+        extraction, _ = fetch_page(url)
+        return extraction.text
     except Exception as e:
         return f"Error scraping site: {e}"
 
+# Pages worth prefetching besides the landing page, by URL path
+KEY_PAGE_HINTS = ('about', 'product', 'feature', 'pricing', 'solution', 'platform', 'customer', 'how-it-works')
+
+def key_pages(url: str, links: List[str], limit: int) -> List[str]:
+    """
+    Pick the pages of a site most likely to describe the company.
+
+    Args:
+        url: Landing page URL
+        links: Links found on the landing page or in the sitemap
+        limit: Maximum number of pages
+
+    Returns:
+        Absolute URLs on the same host, in order of the hints
+    """
+    host = urlparse(url).netloc.lower()
+    candidates = []
+    for link in links:
+        absolute = urljoin(url, link).split('#', 1)[0]
+        parsed = urlparse(absolute)
+        path = parsed.path.lower().rstrip('/')
+        if parsed.netloc.lower() != host or not path or absolute.rstrip('/') == url.rstrip('/'):
+            continue
+        # Top-level sections only: /pricing rather than /blog/our-pricing-story
+        if path.count('/') > 2:
+            continue
+        rank = next((i for i, hint in enumerate(KEY_PAGE_HINTS) if hint in path), None)
+        if rank is not None and absolute not in (c for _, c in candidates):
+            candidates.append((rank, absolute))
+    return [page for _, page in sorted(candidates, key=lambda c: c[0])[:limit]]
+
+def prefetch_site(url: str, stop: Optional[threading.Event] = None, max_pages: Optional[int] = None) -> List[str]:
+    """
+    Fetch a company website ahead of the agents: the landing page, the
+    sitemap and the key pages, into the current run's fetch cache.
+
+    Args:
+        url: Company website URL
+        stop: Set when the run no longer needs the pages
+        max_pages: Maximum number of key pages (defaults to settings.PREFETCH_KEY_PAGES)
+
+    Returns:
+        URLs of the pages prefetched
+    """
+    stop = stop or threading.Event()
+    limit = settings.PREFETCH_KEY_PAGES if max_pages is None else max_pages
+    fetched = []
+    # Landing page first: it is what describe_company_from_url is asked for
+    text = fetch_page_text(url)
+    if text.startswith("Error"):
+        logger.info(f"Prefetch of {url} failed: {text}")
+        return fetched
+    fetched.append(url)
+
+    links = [a['href'] for a in BeautifulSoup(fetch_html(url)[0], 'html.parser').find_all('a', href=True)]
+    if not stop.is_set():
+        try:
+            sitemap, status_code = fetch_html(urljoin(url, '/sitemap.xml'))
+            if status_code == 200:
+                links.extend(re.findall(r'<loc>\s*([^<\s]+)\s*</loc>', sitemap))
+        except Exception as e:
+            logger.info(f"No sitemap for {url}: {str(e)}")
+
+    for page in key_pages(url, links, limit):
+        if stop.is_set():
+            break
+        if not fetch_page_text(page).startswith("Error"):
+            fetched.append(page)
+    logger.info(f"Prefetched {len(fetched)} pages of {url}")
+    return fetched
+
+def start_prefetch(url: str) -> threading.Event:
+    """
+    Start prefetching a company website in the background, within the current
+    run (fetch cache, deadline, cancellation).
+
+    Args:
+        url: Company website URL
+
+    Returns:
+        Event to set once the run is over, stopping the prefetch
+    """
+    stop = threading.Event()
+
+    def prefetch() -> None:
+        try:
+            prefetch_site(url, stop)
+        except Exception as e:
+            # Only an optimization: the agents fetch the pages themselves
+            logger.info(f"Prefetch of {url} stopped: {str(e)}")
+
+    threading.Thread(target=in_current_context(prefetch), name='prefetch', daemon=True).start()
+    return stop
+
 def generate_description(text: str) -> str:
     """Use Anthropic Claude to generate a company description from text."""
-    prompt = (
-        f"Here is some website content:\n\n{text}\n\n"
-        "Please summarize this as a professional company description."
-    )
-    
-    response = client.messages.create(
-        model="claude-3-opus-20240229",
+    response = get_model_router().call('summarize', lambda model, timeout: client.messages.create(
+        model=model,
+        max_tokens=300,
+        temperature=0.5,
+        system=cached_system(DESCRIPTION_INSTRUCTIONS),
+        messages=[{"role": "user", "content": f"Here is some website content:\n\n{text}"}],
+        timeout=timeout
+    ))
+    record_usage(response.usage, response.model)
+    return response.content[0].text
+
+async def generate_description_async(text: str) -> str:
+    """Async generate_description, on the async Anthropic client."""
+    response = await get_model_router().call_async('summarize', lambda model, timeout: async_client.messages.create(
+        model=model,
         max_tokens=300,
         temperature=0.5,
-        messages=[{"role": "user", "content": prompt}]
-    )
+        system=cached_system(DESCRIPTION_INSTRUCTIONS),
+        messages=[{"role": "user", "content": f"Here is some website content:\n\n{text}"}],
+        timeout=timeout
+    ))
+    record_usage(response.usage, response.model)
     return response.content[0].text
 
+async def describe_company_async(url: str, web_service: AsyncWebService) -> str:
+    """Async describe_company_from_url, fetching through the given async web service."""
+    store = get_data_store()
+    previous = await run_blocking(store.get_page, url)
+    try:
+        extraction = await web_service.extract_content(url)
+    except Exception as e:
+        return f"Error scraping site: {e}"
+
+    fingerprint, cached = await run_blocking(_reuse_description, url, extraction.fingerprint, previous)
+    if cached is not None:
+        return cached
+    description = await generate_description_async(extraction.text[:8000])
+    await run_blocking(_save_description, url, fingerprint, description, previous)
+    return description
+
+async def describe_companies(urls: List[str], limit: Optional[int] = None) -> Dict[str, str]:
+    """
+    Describe many company websites concurrently from one event loop.
+
+    Args:
+        urls: Company website URLs
+        limit: Maximum number of URLs in flight (defaults to settings.ASYNC_MAX_CONCURRENCY)
+
+    Returns:
+        Dict mapping each URL to its description or an error message
+    """
+    async with AsyncWebService() as web_service:
+        results = await gather_bounded(
+            (lambda url=url: describe_company_async(url, web_service) for url in urls),
+            limit,
+            return_exceptions=True
+        )
+    return {url: f"Error describing company: {result}" if isinstance(result, Exception) else result
+            for url, result in zip(urls, results)}
+
 class WebAgent(BaseAgent):
     """Agent for handling web analysis and content extraction."""
     
@@ -206,11 +468,17 @@ class WebAgent(BaseAgent):
             'comparison': comparison
         }
 
-web_agent = CodeAgent(tools=[describe_company_from_url, profiler], 
-                      model=LiteLLMModel(
-                          model_id="anthropic/claude-3-5-sonnet-latest",
-                          api_key=settings.ANTHROPIC_API_KEY,
-                      ),
-                      name="URLDescriptionAgent",
-                      description="An agent that gives you the ideal customer profile from website URLs"
-                      )
+def build_web_agent() -> CodeAgent:
+    """New URL description agent: each orchestrator gets its own, so concurrent runs share no memory or interrupt."""
+    return CodeAgent(tools=[describe_company_from_url, profiler],
+                     model=CachingLiteLLMModel(
+                         api_key=settings.ANTHROPIC_API_KEY,
+                         # Calls two tools and relays their output: no planning model needed
+                         task_class='summarize'
+                     ),
+                     name="URLDescriptionAgent",
+                     description="An agent that gives you the ideal customer profile from website URLs",
+                     step_callbacks=[interrupt_on_deadline, interrupt_on_cancel, checkpoint_step]
+                     )
+
+web_agent = build_web_agent()
@@ -0,0 +1,283 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+def _to_epoch(value: Any) -> float:
+    """Convert a created_utc/created_at value (epoch, datetime or ISO string) to epoch seconds."""
+    if value is None:
+        return np.nan
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    return float(value)
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Average ranks of the values, ties sharing the mean of their positions."""
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+    # Start index of each run of equal values
+    boundaries = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1], True])
+    run_ids = np.repeat(np.arange(len(boundaries) - 1), np.diff(boundaries))
+    mean_ranks = (boundaries[:-1] + boundaries[1:] - 1) / 2.0
+    ranks = np.empty(len(values), dtype=float)
+    ranks[order] = mean_ranks[run_ids]
+    return ranks
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    if len(x) < 3 or np.std(x) == 0 or np.std(y) == 0:
+        return None
+    return float(np.corrcoef(x, y)[0, 1])
+
+class EngagementData:
+    """
+    Column-oriented engagement data for Reddit posts or tweets.
+
+    Records are loaded once into NumPy arrays so that distributions,
+    ratios, correlations and outliers are computed over thousands of
+    items without Python-level loops.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        engagement: np.ndarray,
+        score: np.ndarray,
+        comments: np.ndarray,
+        text_length: np.ndarray,
+        created_utc: np.ndarray,
+        platform: str
+    ):
+        """
+        Initialize engagement data from aligned columns.
+
+        Args:
+            ids: Post or tweet IDs
+            engagement: Total engagement per item
+            score: Reddit score or tweet like count
+            comments: Number of comments or replies
+            text_length: Title or tweet length in characters
+            created_utc: Creation time as epoch seconds
+            platform: 'reddit' or 'twitter'
+        """
+        self.ids = ids
+        self.engagement = engagement
+        self.score = score
+        self.comments = comments
+        self.text_length = text_length
+        self.created_utc = created_utc
+        self.platform = platform
+
+    @classmethod
+    def from_reddit_posts(cls, posts: Iterable[Dict[str, Any]]) -> 'EngagementData':
+        """
+        Load Reddit post dicts (as returned by RedditService).
+
+        Args:
+            posts: Posts with 'score', 'num_comments', 'title' and 'created_utc'
+
+        Returns:
+            EngagementData for the posts
+        """
+        posts = list(posts)
+        score = np.fromiter((p.get('score') or 0 for p in posts), dtype=float, count=len(posts))
+        comments = np.fromiter((p.get('num_comments') or 0 for p in posts), dtype=float, count=len(posts))
+        return cls(
+            ids=[str(p.get('id', '')) for p in posts],
+            engagement=score + comments,
+            score=score,
+            comments=comments,
+            text_length=np.fromiter((len(p.get('title') or '') for p in posts), dtype=float, count=len(posts)),
+            created_utc=np.fromiter((_to_epoch(p.get('created_utc')) for p in posts), dtype=float, count=len(posts)),
+            platform='reddit'
+        )
+
+    @classmethod
+    def from_tweets(cls, tweets: Iterable[Dict[str, Any]]) -> 'EngagementData':
+        """
+        Load tweet dicts carrying Twitter v2 public metrics.
+
+        Args:
+            tweets: Tweets with 'text', 'created_at' and 'metrics' or 'public_metrics'
+
+        Returns:
+            EngagementData for the tweets
+        """
+        tweets = list(tweets)
+        metrics = [t.get('metrics') or t.get('public_metrics') or {} for t in tweets]
+        column = lambda name: np.fromiter((m.get(name) or 0 for m in metrics), dtype=float, count=len(tweets))
+        likes = column('like_count')
+        replies = column('reply_count')
+        return cls(
+            ids=[str(t.get('id', '')) for t in tweets],
+            engagement=likes + replies + column('retweet_count') + column('quote_count'),
+            score=likes,
+            comments=replies,
+            text_length=np.fromiter((len(t.get('text') or '') for t in tweets), dtype=float, count=len(tweets)),
+            created_utc=np.fromiter((_to_epoch(t.get('created_at')) for t in tweets), dtype=float, count=len(tweets)),
+            platform='twitter'
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def select(self, mask: np.ndarray) -> 'EngagementData':
+        """
+        Keep only the items selected by a boolean mask.
+
+        Args:
+            mask: Boolean array aligned with the items
+
+        Returns:
+            New EngagementData with the selected items
+        """
+        return EngagementData(
+            ids=[item_id for item_id, keep in zip(self.ids, mask) if keep],
+            engagement=self.engagement[mask],
+            score=self.score[mask],
+            comments=self.comments[mask],
+            text_length=self.text_length[mask],
+            created_utc=self.created_utc[mask],
+            platform=self.platform
+        )
+
+    def distribution(self, values: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Describe the distribution of a column (engagement by default).
+
+        Args:
+            values: Column to describe
+
+        Returns:
+            Dict with count, mean, std, min, max and percentiles
+        """
+        values = self.engagement if values is None else values
+        if len(values) == 0:
+            return {'count': 0}
+        return {
+            'count': int(len(values)),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'percentiles': dict(zip(
+                (f"p{p}" for p in PERCENTILES),
+                (float(v) for v in np.percentile(values, PERCENTILES))
+            ))
+        }
+
+    def score_per_comment(self) -> Dict[str, Any]:
+        """
+        Ratio of score to comments, over items that have comments.
+
+        Returns:
+            Dict with the median and mean ratio and how many items had comments
+        """
+        has_comments = self.comments > 0
+        if not has_comments.any():
+            return {'items_with_comments': 0}
+        ratios = self.score[has_comments] / self.comments[has_comments]
+        return {
+            'items_with_comments': int(has_comments.sum()),
+            'median': float(np.median(ratios)),
+            'mean': float(ratios.mean())
+        }
+
+    def length_correlation(self) -> Dict[str, Optional[float]]:
+        """
+        Correlation between title/tweet length and engagement.
+
+        Returns:
+            Dict with Pearson and Spearman (rank) coefficients, None when undefined
+        """
+        if len(self) < 3:
+            return {'pearson': None, 'spearman': None}
+        return {
+            'pearson': _pearson(self.text_length, self.engagement),
+            'spearman': _pearson(_ranks(self.text_length), _ranks(self.engagement))
+        }
+
+    def outliers(self, threshold: float = 3.5) -> List[Dict[str, Any]]:
+        """
+        Items whose engagement is unusually high or low.
+
+        Uses the modified z-score (median absolute deviation), which stays
+        robust on the heavy-tailed distributions typical of social posts.
+
+        Args:
+            threshold: Minimum absolute modified z-score to flag an item
+
+        Returns:
+            List of outliers sorted by decreasing z-score
+        """
+        if len(self) == 0:
+            return []
+        median = np.median(self.engagement)
+        mad = np.median(np.abs(self.engagement - median))
+        if mad == 0:
+            return []
+        z_scores = 0.6745 * (self.engagement - median) / mad
+        flagged = np.flatnonzero(np.abs(z_scores) >= threshold)
+        flagged = flagged[np.argsort(-z_scores[flagged])]
+        return [{
+            'id': self.ids[i],
+            'engagement': float(self.engagement[i]),
+            'z_score': float(z_scores[i])
+        } for i in flagged]
+
+    def summary(self, max_outliers: int = 5) -> Dict[str, Any]:
+        """
+        Full engagement report.
+
+        Args:
+            max_outliers: Maximum number of outliers to include
+
+        Returns:
+            Dict containing every statistic of this class
+        """
+        outliers = self.outliers()
+        return {
+            'platform': self.platform,
+            'items': len(self),
+            'engagement': self.distribution(),
+            'comments': self.distribution(self.comments),
+            'score_per_comment': self.score_per_comment(),
+            'length_correlation': self.length_correlation(),
+            'outliers': outliers[:max_outliers],
+            'outlier_count': len(outliers)
+        }
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """
+    Render an engagement summary as short text for an agent prompt.
+
+    Args:
+        summary: Output of EngagementData.summary()
+
+    Returns:
+        Human-readable summary
+    """
+    if not summary['items']:
+        return "No engagement data available"
+
+    engagement = summary['engagement']
+    percentiles = engagement['percentiles']
+    ratio = summary['score_per_comment']
+    correlation = summary['length_correlation']
+    fmt = lambda value: 'n/a' if value is None else f"{value:.2f}"
+    return "\n".join([
+        f"Items analyzed: {summary['items']}",
+        f"Engagement: mean {engagement['mean']:.1f}, median {percentiles['p50']:.1f}, "
+        f"p90 {percentiles['p90']:.1f}, p99 {percentiles['p99']:.1f}",
+        f"Comments: mean {summary['comments']['mean']:.1f}, median {summary['comments']['percentiles']['p50']:.1f}",
+        f"Score per comment: median {fmt(ratio.get('median'))} over {ratio['items_with_comments']} items",
+        f"Length vs engagement correlation: pearson {fmt(correlation['pearson'])}, "
+        f"spearman {fmt(correlation['spearman'])}",
+        f"Outliers: {summary['outlier_count']}"
+    ])
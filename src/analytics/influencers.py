@@ -0,0 +1,102 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.analytics.engagement import EngagementData
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each component in the influencer score
+WEIGHTS = {'reach': 0.4, 'engagement': 0.4, 'recency': 0.2}
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    """Scale values to [0, 1]; a constant column scores 0 everywhere."""
+    spread = values.max() - values.min() if len(values) else 0
+    if spread == 0:
+        return np.zeros_like(values)
+    return (values - values.min()) / spread
+
+def score_influencers(
+    tweets: List[Dict[str, Any]],
+    users: Dict[str, Dict[str, Any]],
+    now: Optional[float] = None,
+    half_life_hours: float = 72.0,
+    top: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Rank the authors of a set of tweets as potential influencers.
+
+    Each author gets three vectorized components, normalized to [0, 1]:
+    reach (log followers), engagement (log mean engagement of their tweets
+    in the sample) and recency (tweets weighted by exponential decay).
+
+    Args:
+        tweets: Tweets with 'author_id', 'created_at' and metrics
+        users: User information keyed by user ID (as string)
+        now: Reference epoch time for recency (defaults to the current time)
+        half_life_hours: Age at which a tweet counts half for recency
+        top: Number of authors to return
+
+    Returns:
+        Authors sorted by decreasing score
+    """
+    tweets = [t for t in tweets if str(t.get('author_id')) in users]
+    if not tweets:
+        return []
+
+    data = EngagementData.from_tweets(tweets)
+    author_ids, author_index = np.unique([str(t['author_id']) for t in tweets], return_inverse=True)
+    authors = len(author_ids)
+
+    tweet_counts = np.bincount(author_index, minlength=authors)
+    mean_engagement = np.bincount(author_index, weights=data.engagement, minlength=authors) / tweet_counts
+
+    now = time.time() if now is None else now
+    age_hours = np.nan_to_num((now - data.created_utc) / 3600.0, nan=np.inf)
+    decay = np.power(0.5, np.clip(age_hours, 0, None) / half_life_hours)
+    recency = np.bincount(author_index, weights=decay, minlength=authors)
+
+    followers = np.array([users[author_id].get('followers_count') or 0 for author_id in author_ids], dtype=float)
+
+    components = {
+        'reach': _normalize(np.log1p(followers)),
+        'engagement': _normalize(np.log1p(mean_engagement)),
+        'recency': _normalize(np.log1p(recency))
+    }
+    scores = sum(WEIGHTS[name] * values for name, values in components.items())
+
+    ranked = np.argsort(-scores, kind='stable')[:top]
+    return [{
+        'user_id': author_ids[i],
+        'username': users[author_ids[i]]['username'],
+        'followers': int(followers[i]),
+        'tweets_in_sample': int(tweet_counts[i]),
+        'mean_engagement': float(mean_engagement[i]),
+        'score': float(scores[i]),
+        'components': {name: float(values[i]) for name, values in components.items()}
+    } for i in ranked]
+
+def format_influencers(influencers: List[Dict[str, Any]]) -> str:
+    """
+    Render ranked influencers as a markdown table.
+
+    Args:
+        influencers: Output of score_influencers()
+
+    Returns:
+        Markdown table
+    """
+    if not influencers:
+        return "No influencers found"
+    lines = [
+        "| Rank | Author | Followers | Tweets in sample | Mean engagement | Score |",
+        "|---|---|---|---|---|---|"
+    ]
+    for rank, author in enumerate(influencers, start=1):
+        lines.append(
+            f"| {rank} | @{author['username']} | {author['followers']} | {author['tweets_in_sample']} | "
+            f"{author['mean_engagement']:.1f} | {author['score']:.2f} |"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,226 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.analytics.engagement import EngagementData
+from src.config.settings import settings
+from src.services.storage_service import get_data_store
+from src.utils.cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 7 * 24
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+# Posts younger than this have not collected their engagement yet
+MIN_POST_AGE = 24 * 3600
+
+posting_time_cache = TieredCache(
+    settings.data_path('analytics_cache.db'),
+    ttls={'posting_times': settings.POSTING_TIMES_CACHE_TTL}
+)
+
+def hour_of_week(created_utc: np.ndarray) -> np.ndarray:
+    """
+    Map epoch timestamps to their UTC hour of the week (0 = Monday 00:00).
+
+    Args:
+        created_utc: Epoch seconds
+
+    Returns:
+        Integer array of values in [0, 168)
+    """
+    seconds = created_utc.astype(np.int64)
+    # 1970-01-01 was a Thursday (weekday 3)
+    weekday = (seconds // 86400 + 3) % 7
+    hour = (seconds % 86400) // 3600
+    return weekday * 24 + hour
+
+def posting_windows(data: EngagementData, top: int = 10, prior_weight: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    Rank the hours of the week by the engagement of posts published in them.
+
+    Engagement is compared on a log scale so a single viral post does not
+    decide the ranking, and each hour's mean is shrunk towards the overall
+    mean in proportion to how few posts it has. The confidence column is
+    the share of the estimate that comes from the hour's own posts.
+
+    Args:
+        data: Engagement data with creation timestamps
+        top: Number of windows to return
+        prior_weight: Number of 'virtual' average posts added to every hour
+
+    Returns:
+        Ranked list of posting windows
+    """
+    valid = ~np.isnan(data.created_utc)
+    if not valid.any():
+        return []
+
+    hours = hour_of_week(data.created_utc[valid])
+    log_engagement = np.log1p(np.clip(data.engagement[valid], 0, None))
+    overall = log_engagement.mean()
+
+    counts = np.bincount(hours, minlength=HOURS_PER_WEEK)
+    totals = np.bincount(hours, weights=log_engagement, minlength=HOURS_PER_WEEK)
+    shrunk = (totals + prior_weight * overall) / (counts + prior_weight)
+    confidence = counts / (counts + prior_weight)
+
+    ranked = np.argsort(-shrunk, kind='stable')
+    ranked = ranked[counts[ranked] > 0][:top]
+    return [{
+        'day': DAY_NAMES[hour // 24],
+        'hour_utc': int(hour % 24),
+        'posts': int(counts[hour]),
+        'expected_engagement': float(np.expm1(shrunk[hour])),
+        'lift': float(np.expm1(shrunk[hour]) / np.expm1(overall)) if overall > 0 else None,
+        'confidence': float(confidence[hour])
+    } for hour in ranked]
+
+def format_windows(windows: List[Dict[str, Any]], immature: bool = False) -> str:
+    """
+    Render posting windows as a markdown table.
+
+    Args:
+        windows: Output of posting_windows()
+        immature: Whether the windows were computed from posts still collecting their score
+
+    Returns:
+        Markdown table
+    """
+    if not windows:
+        return "Not enough timestamped data to compute posting windows"
+    lines = [
+        "| Rank | Day | Hour (UTC) | Posts | Expected engagement | Lift | Confidence |",
+        "|---|---|---|---|---|---|---|"
+    ]
+    for rank, window in enumerate(windows, start=1):
+        lift = f"{window['lift']:.2f}x" if window['lift'] is not None else "n/a"
+        lines.append(
+            f"| {rank} | {window['day']} | {window['hour_utc']:02d}:00 | {window['posts']} | "
+            f"{window['expected_engagement']:.1f} | {lift} | {window['confidence']:.0%} |"
+        )
+    if immature:
+        lines.append(f"\nWarning: every post of the sample is less than {MIN_POST_AGE // 3600}h old and still "
+                     f"collecting engagement; recent hours are underrated.")
+    return "\n".join(lines)
+
+class PostingTimeCalculator:
+    """Compute best posting windows from large historical samples, cached per target."""
+
+    def __init__(self, reddit_service: Optional[Any] = None, twitter_service: Optional[Any] = None):
+        """
+        Initialize the calculator.
+
+        Args:
+            reddit_service: RedditService used for subreddit and Reddit search samples
+            twitter_service: TwitterService used for tweet search samples
+        """
+        self.reddit_service = reddit_service
+        self.twitter_service = twitter_service
+
+    def _cached(self, target: str, compute) -> Dict[str, Any]:
+        cached = posting_time_cache.get('posting_times', target)
+        if cached is not None:
+            return cached
+        result = compute()
+        # Windows from immature posts are worth computing again once the posts have their score
+        if not result['immature']:
+            posting_time_cache.set('posting_times', target, result, cost=result['api_calls'])
+        return result
+
+    def _result(self, target: str, data: EngagementData, api_calls: int, top: int) -> Dict[str, Any]:
+        immature = False
+        if data.platform == 'reddit':
+            # Tweets peak within hours; Reddit posts need a day to collect their score
+            mature = data.created_utc <= time.time() - MIN_POST_AGE
+            if mature.any():
+                data = data.select(mature)
+            elif len(data):
+                # Only posts still collecting their score: their windows favour the oldest hours
+                immature = True
+                logger.warning(f"No post of {target} older than {MIN_POST_AGE // 3600}h, "
+                               f"posting windows computed from immature posts")
+        return {
+            'target': target,
+            'sample_size': len(data),
+            'api_calls': api_calls,
+            'immature': immature,
+            'windows': posting_windows(data, top=top)
+        }
+
+    def for_subreddit(self, subreddit: str, max_posts: int = 1000, top: int = 10) -> Dict[str, Any]:
+        """
+        Best posting windows of a subreddit, from its newest posts.
+
+        Args:
+            subreddit: Name of the subreddit
+            max_posts: Size of the historical sample (Reddit caps listings at 1000)
+            top: Number of windows to return
+
+        Returns:
+            Dict with the target, sample size and ranked windows
+        """
+        def compute():
+            posts = self.reddit_service.get_listing(subreddit, 'new', limit=max_posts)
+            return self._result(f"r/{subreddit}", EngagementData.from_reddit_posts(posts), -(-max_posts // 100), top)
+        return self._cached(f"reddit:sub:{subreddit}:{max_posts}", compute)
+
+    def for_reddit_query(self, query: str, max_posts: int = 1000, top: int = 10) -> Dict[str, Any]:
+        """
+        Best posting windows for Reddit posts matching a search query.
+
+        Args:
+            query: Search query
+            max_posts: Size of the historical sample
+            top: Number of windows to return
+
+        Returns:
+            Dict with the target, sample size and ranked windows
+        """
+        def compute():
+            posts = self.reddit_service.search_posts('all', query, limit=max_posts, sort='new')
+            return self._result(f"reddit:{query}", EngagementData.from_reddit_posts(posts), -(-max_posts // 100), top)
+        return self._cached(f"reddit:search:{query}:{max_posts}", compute)
+
+    def for_stored(self, platform: str, subreddit: Optional[str] = None, query: Optional[str] = None,
+                   since: Optional[Any] = None, top: int = 10) -> Dict[str, Any]:
+        """
+        Best posting windows from posts and tweets already in the local data
+        store, without any API call.
+
+        Args:
+            platform: 'reddit' or 'twitter'
+            subreddit: Only posts of this subreddit
+            query: Only items returned by this search query
+            since: Only items created at or after this time
+            top: Number of windows to return
+
+        Returns:
+            Dict with the target, sample size and ranked windows
+        """
+        rows = get_data_store().query_posts(platform=platform, subreddit=subreddit, query=query, since=since)
+        if platform == 'twitter':
+            data = EngagementData.from_tweets(rows)
+        else:
+            data = EngagementData.from_reddit_posts(rows)
+        target = f"stored:{platform}:{subreddit or query or 'all'}"
+        return self._result(target, data, 0, top)
+
+    def for_tweet_query(self, query: str, max_tweets: int = 500, top: int = 10) -> Dict[str, Any]:
+        """
+        Best posting windows for tweets matching a search query.
+
+        Args:
+            query: Search query
+            max_tweets: Size of the sample
+            top: Number of windows to return
+
+        Returns:
+            Dict with the target, sample size and ranked windows
+        """
+        def compute():
+            tweets = self.twitter_service.search_tweets(query, max_results=max_tweets)
+            return self._result(f"twitter:{query}", EngagementData.from_tweets(tweets), -(-max_tweets // 100), top)
+        return self._cached(f"twitter:search:{query}:{max_tweets}", compute)
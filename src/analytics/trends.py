@@ -0,0 +1,390 @@
+import hashlib
+import heapq
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.run_context import current_report
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('hashtag', 'term', 'domain')
+
+HASHTAG_RE = re.compile(r'(?<![\w#])#(\w{2,})')
+URL_RE = re.compile(r'https?://\S+')
+MENTION_RE = re.compile(r'(?<!\w)@\w+')
+WORD_RE = re.compile(r"[a-z][a-z0-9+#'-]*[a-z0-9+#]")
+
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can could did do
+does doing don't down during each few for from further get got had has have having he her here hers him his
+how i i'm if in into is it it's its just let's like me more most my no nor not now of off on once one only or
+other our ours out over own same she should so some such than that that's the their theirs them then there
+these they this those through to too under until up us very was we were what when where which while who whom
+why will with would you your yours yourself amp rt via new
+""".split())
+
+# Links to the platforms themselves say nothing about what is shared
+PLATFORM_DOMAINS = frozenset({
+    'reddit.com', 'old.reddit.com', 'redd.it', 'i.redd.it', 'v.redd.it',
+    'twitter.com', 'x.com', 't.co', 'pic.twitter.com'
+})
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def _domain(url: str) -> Optional[str]:
+    host = urlparse(url).netloc.lower().split(':')[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    return host if host and host not in PLATFORM_DOMAINS else None
+
+def extract_terms(text: str, url: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Extract the hashtags, terms (words and two-word phrases without stop
+    words) and linked domains of a post or tweet, each counted once.
+
+    Args:
+        text: Tweet text or post title
+        url: Link of the post, if any
+
+    Returns:
+        Dict mapping 'hashtag', 'term' and 'domain' to their distinct values
+    """
+    text = text or ''
+    urls = URL_RE.findall(text) + ([url] if url else [])
+    hashtags = [tag.lower() for tag in HASHTAG_RE.findall(text)]
+    stripped = MENTION_RE.sub(' ', HASHTAG_RE.sub(' ', URL_RE.sub(' ', text))).lower()
+    words = WORD_RE.findall(stripped)
+
+    terms = [word for word in words if len(word) > 2 and word not in STOPWORDS]
+    terms.extend(
+        f"{first} {second}" for first, second in zip(words, words[1:])
+        if first not in STOPWORDS and second not in STOPWORDS
+    )
+    domains = [domain for domain in map(_domain, urls) if domain]
+    return {
+        'hashtag': list(dict.fromkeys(hashtags)),
+        'term': list(dict.fromkeys(terms)),
+        'domain': list(dict.fromkeys(domains))
+    }
+
+class CountMinSketch:
+    """
+    Approximate counts of any number of keys in a fixed width x depth table.
+
+    Estimates never undercount; they overcount by at most 2/width of the
+    total count with probability 1 - 2^-depth.
+    """
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth, dtype=np.uint64)
+        # Broadcasts against columns of shape (keys, depth)
+        self._row_index = np.arange(depth)[None, :]
+
+    def columns(self, keys: List[str]) -> np.ndarray:
+        """Column of each key in each row (double hashing), shape (len(keys), depth)."""
+        hashes = np.array([_hash(key) for key in keys], dtype=np.uint64)
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        return ((low[:, None] + self._rows[None, :] * high[:, None]) % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, keys: List[str], columns: Optional[np.ndarray] = None) -> None:
+        """Count each key once."""
+        columns = self.columns(keys) if columns is None else columns
+        np.add.at(self.table, (self._row_index, columns), 1)
+
+    def estimate(self, keys: List[str], columns: Optional[np.ndarray] = None) -> np.ndarray:
+        """Estimated count of each key."""
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        columns = self.columns(keys) if columns is None else columns
+        return self.table[self._row_index, columns].min(axis=1)
+
+class SpaceSaving:
+    """
+    Top-k heavy hitters of a stream in `capacity` counters.
+
+    A key not yet tracked takes over the smallest counter once all are in
+    use, inheriting its count as error: every key more frequent than
+    total / capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        # One entry per tracked key; counts only grow, so an entry is at most stale-low
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, key: str, count: int = 1) -> None:
+        if key in self.counts:
+            self.counts[key] += count
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (count, key))
+            return
+        while True:
+            smallest, victim = heapq.heappop(self._heap)
+            if self.counts[victim] == smallest:
+                break
+            heapq.heappush(self._heap, (self.counts[victim], victim))
+        del self.counts[victim]
+        del self.errors[victim]
+        self.counts[key] = smallest + count
+        self.errors[key] = smallest
+        heapq.heappush(self._heap, (smallest + count, key))
+
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """The k largest counters as (key, count, error), count an upper bound of the true count."""
+        return heapq.nlargest(k, ((key, count, self.errors[key]) for key, count in self.counts.items()),
+                              key=lambda entry: entry[1])
+
+class _Summary:
+    """Sketch and heavy hitters of every kind of term, over a set of items."""
+
+    def __init__(self, width: int, depth: int, capacity: int):
+        self.sketches = {kind: CountMinSketch(width, depth) for kind in KINDS}
+        self.top = {kind: SpaceSaving(capacity) for kind in KINDS}
+        self.items = 0
+
+    def add(self, kind: str, keys: List[str], columns: np.ndarray) -> None:
+        self.sketches[kind].add(keys, columns)
+        for key in keys:
+            self.top[kind].add(key)
+
+    def counts(self, kind: str, keys: List[str]) -> np.ndarray:
+        """Best estimate of each key's count: the lower of the sketch and the summary."""
+        estimates = self.sketches[kind].estimate(keys)
+        tracked = np.array([self.top[kind].counts.get(key, np.iinfo(np.int64).max) for key in keys], dtype=np.int64)
+        return np.minimum(estimates, tracked)
+
+class TrendTracker:
+    """
+    Streaming hashtag, term and domain counts over fetched posts and tweets.
+
+    Every item updates a summary of everything seen and the summary of the
+    time window it was created in (count-min sketches and space-saving
+    top-k counters, so memory is bounded whatever the stream size). The IDs
+    of the latest items are kept to skip items fetched twice. Top
+    terms come from the overall summary; rising terms are those whose share
+    of the latest window is well above their share of the earlier ones.
+    """
+
+    def __init__(self, window: Optional[int] = None, windows: Optional[int] = None, width: Optional[int] = None,
+                 depth: Optional[int] = None, capacity: Optional[int] = None, seen_capacity: Optional[int] = None):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Window length in seconds
+            windows: Number of windows kept, the latest one included
+            width: Width of the count-min sketches
+            depth: Depth of the count-min sketches
+            capacity: Counters of each space-saving summary
+            seen_capacity: Item IDs remembered to skip duplicates, least recently seen dropped first
+        """
+        self.window = window or settings.TREND_WINDOW
+        self.windows = windows or settings.TREND_WINDOWS
+        self.width = width or settings.TREND_SKETCH_WIDTH
+        self.depth = depth or settings.TREND_SKETCH_DEPTH
+        self.capacity = capacity or settings.TREND_TOP_K_CAPACITY
+        self.seen_capacity = seen_capacity or settings.TREND_SEEN_CAPACITY
+        self.overall = _Summary(self.width, self.depth, self.capacity)
+        self._windows: Dict[int, _Summary] = {}
+        self._latest: Optional[int] = None
+        self._seen: 'OrderedDict[str, None]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _window_of(self, index: int) -> Optional[_Summary]:
+        if self._latest is None or index > self._latest:
+            self._latest = index
+            for old in [i for i in self._windows if i <= index - self.windows]:
+                del self._windows[old]
+        if index <= self._latest - self.windows:
+            return None
+        if index not in self._windows:
+            self._windows[index] = _Summary(self.width, self.depth, self.capacity)
+        return self._windows[index]
+
+    def observe(self, text: str, created_at: Optional[float] = None, url: Optional[str] = None,
+                item_id: Optional[str] = None) -> None:
+        """
+        Count the terms of one item.
+
+        Args:
+            text: Tweet text or post title
+            created_at: Creation time in epoch seconds (now if unknown)
+            url: Link of the post, if any
+            item_id: Unique ID: an item seen again (same post in two listings) is not counted twice
+        """
+        if item_id is not None:
+            with self._lock:
+                if item_id in self._seen:
+                    self._seen.move_to_end(item_id)
+                    return
+                self._seen[item_id] = None
+                if len(self._seen) > self.seen_capacity:
+                    self._seen.popitem(last=False)
+        terms = extract_terms(text, url)
+        created_at = created_at if isinstance(created_at, (int, float)) else time.time()
+        index = int(created_at // self.window)
+        # Hashed once, outside the lock, for the overall and the window sketches
+        keys = [key for kind in KINDS for key in terms[kind]]
+        all_columns = self.overall.sketches['term'].columns(keys) if keys else None
+        columns = {}
+        start = 0
+        for kind in KINDS:
+            if terms[kind]:
+                columns[kind] = all_columns[start:start + len(terms[kind])]
+                start += len(terms[kind])
+        with self._lock:
+            window = self._window_of(index)
+            for summary in (self.overall, window):
+                if summary is None:
+                    continue
+                summary.items += 1
+                for kind, kind_columns in columns.items():
+                    summary.add(kind, terms[kind], kind_columns)
+
+    def observe_tweets(self, tweets: Iterable[Any]) -> None:
+        """Count the terms of tweets (records or dicts)."""
+        for tweet in tweets:
+            self.observe(tweet.get('text'), created_at=tweet.get('created_at'), item_id=f"tweet:{tweet.get('id')}")
+
+    def observe_posts(self, posts: Iterable[Any]) -> None:
+        """Count the terms of Reddit post titles, and the domain of link posts."""
+        for post in posts:
+            self.observe(post.get('title'), created_at=post.get('created_utc'),
+                         url=None if post.get('is_self') else post.get('url'), item_id=f"reddit:{post.get('id')}")
+
+    @property
+    def items(self) -> int:
+        return self.overall.items
+
+    def top(self, kind: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Most frequent terms of a kind over everything seen.
+
+        Args:
+            kind: 'hashtag', 'term' or 'domain'
+            k: Number of terms
+
+        Returns:
+            Terms with their estimated number of items, most frequent first
+        """
+        with self._lock:
+            keys = [key for key, _, _ in self.overall.top[kind].top(self.capacity)]
+            counts = self.overall.counts(kind, keys)
+        ranked = sorted(zip(keys, counts.tolist()), key=lambda entry: entry[1], reverse=True)[:k]
+        return [{'term': key, 'count': count} for key, count in ranked]
+
+    def rising(self, kind: str, k: int = 10, min_count: int = 3,
+               min_growth: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Terms of a kind whose share of the latest window grew the most over
+        their share of the earlier windows.
+
+        Args:
+            kind: 'hashtag', 'term' or 'domain'
+            k: Number of terms
+            min_count: Items of the latest window a term must appear in
+            min_growth: Ratio of observed to expected count (settings.TREND_MIN_GROWTH by default)
+
+        Returns:
+            Rising terms with their count, expected count and growth, fastest first
+        """
+        min_growth = settings.TREND_MIN_GROWTH if min_growth is None else min_growth
+        with self._lock:
+            latest = self._windows.get(self._latest) if self._latest is not None else None
+            earlier = [summary for index, summary in self._windows.items() if index < self._latest]
+            earlier_items = sum(summary.items for summary in earlier)
+            if latest is None or not earlier_items:
+                return []
+            keys = [key for key, _, _ in latest.top[kind].top(self.capacity)]
+            if not keys:
+                return []
+            counts = latest.counts(kind, keys)
+            baseline = sum(summary.sketches[kind].estimate(keys) for summary in earlier)
+        expected = baseline * latest.items / earlier_items
+        # +1 smoothing: a term new in the latest window grows from an expected count of 0
+        growth = (counts + 1) / (expected + 1)
+        rising = [
+            {'term': key, 'count': int(count), 'expected': float(round(exp, 1)), 'growth': float(round(ratio, 2))}
+            for key, count, exp, ratio in zip(keys, counts, expected, growth)
+            if count >= min_count and ratio >= min_growth
+        ]
+        rising.sort(key=lambda term: (term['growth'], term['count']), reverse=True)
+        return rising[:k]
+
+def format_trends(tracker: TrendTracker, k: int = 10) -> str:
+    """
+    Render the top and rising hashtags, terms and domains of a tracker.
+
+    Args:
+        tracker: Trend tracker
+        k: Number of terms per list
+
+    Returns:
+        One line per list
+    """
+    if not tracker.items:
+        return "No posts or tweets fetched yet"
+    labels = {'hashtag': "hashtags", 'term': "terms", 'domain': "shared domains"}
+
+    def show(kind: str, term: str) -> str:
+        return f"#{term}" if kind == 'hashtag' else term
+    lines = [f"Trends over {tracker.items} posts and tweets:"]
+    for kind in KINDS:
+        top = tracker.top(kind, k)
+        if top:
+            lines.append(f"Top {labels[kind]}: " + ", ".join(
+                f"{show(kind, entry['term'])} ({entry['count']})" for entry in top))
+    hours = tracker.window / 3600
+    for kind in KINDS:
+        rising = tracker.rising(kind, k)
+        if rising:
+            lines.append(f"Rising {labels[kind]} (last {hours:.0f}h vs before): " + ", ".join(
+                f"{show(kind, entry['term'])} ({entry['count']}, x{entry['growth']:.1f})" for entry in rising))
+    return "\n".join(lines)
+
+def current_trends() -> Optional[TrendTracker]:
+    """Trend tracker of the current run (created on first use), or None outside a run."""
+    report = current_report()
+    if report is None:
+        return None
+    tracker, _ = report.memoized('trends', TrendTracker)
+    return tracker
+
+def observe_tweets(tweets: Iterable[Any]) -> None:
+    """Feed fetched tweets to the current run's trend tracker."""
+    tracker = current_trends()
+    if tracker is None:
+        return
+    try:
+        tracker.observe_tweets(tweets)
+    except Exception as e:
+        # Trend tracking must not break the fetch that feeds it
+        logger.warning(f"Failed to track trends: {str(e)}")
+
+def observe_posts(posts: Iterable[Any]) -> None:
+    """Feed fetched Reddit posts to the current run's trend tracker."""
+    tracker = current_trends()
+    if tracker is None:
+        return
+    try:
+        tracker.observe_posts(posts)
+    except Exception as e:
+        logger.warning(f"Failed to track trends: {str(e)}")
@@ -5,6 +5,13 @@ from typing import Dict, Any
 # Load environment variables from .env file
 load_dotenv()
 
+def _model_route(task: str, models: str, slo: float) -> Dict[str, Any]:
+    """Route of a task class: models in order of preference and latency SLO in seconds."""
+    return {
+        'models': [m.strip() for m in os.getenv(f'MODEL_ROUTE_{task.upper()}', models).split(',') if m.strip()],
+        'slo': float(os.getenv(f'MODEL_SLO_{task.upper()}', slo))
+    }
+
 class Settings:
     """Application settings loaded from environment variables."""
     
@@ -25,6 +32,95 @@ class Settings:
     TWITTER_ACCESS_TOKEN: str = os.getenv('TWITTER_ACCESS_TOKEN', '')
     TWITTER_ACCESS_TOKEN_SECRET: str = os.getenv('TWITTER_ACCESS_TOKEN_SECRET', '')
     
+    # Local data storage
+    DATA_DIR: str = os.getenv('INSOCIA_DATA_DIR', os.path.join(os.getcwd(), '.insocia'))
+    
+    # Reddit cache TTLs in seconds, per data class
+    REDDIT_CACHE_TTLS: Dict[str, int] = {
+        'about': int(os.getenv('REDDIT_CACHE_TTL_ABOUT', 6 * 3600)),
+        'rules': int(os.getenv('REDDIT_CACHE_TTL_RULES', 24 * 3600)),
+        'hot': int(os.getenv('REDDIT_CACHE_TTL_HOT', 5 * 60)),
+        'new': int(os.getenv('REDDIT_CACHE_TTL_NEW', 2 * 60)),
+        'comments': int(os.getenv('REDDIT_CACHE_TTL_COMMENTS', 7 * 24 * 3600))
+    }
+    REDDIT_CACHE_MAX_ENTRIES: int = int(os.getenv('REDDIT_CACHE_MAX_ENTRIES', 1024))
+    REDDIT_MAX_WORKERS: int = int(os.getenv('REDDIT_MAX_WORKERS', 8))
+    
+    # Comment trees: default depth, comment count and time (seconds) budgets of a fetch,
+    # and age in seconds after which a cached tree is checked against the post's comment count
+    REDDIT_COMMENTS_MAX_DEPTH: int = int(os.getenv('REDDIT_COMMENTS_MAX_DEPTH', 6))
+    REDDIT_COMMENTS_MAX_NODES: int = int(os.getenv('REDDIT_COMMENTS_MAX_NODES', 500))
+    REDDIT_COMMENTS_TIME_BUDGET: float = float(os.getenv('REDDIT_COMMENTS_TIME_BUDGET', 20))
+    REDDIT_COMMENTS_REVALIDATE_AFTER: int = int(os.getenv('REDDIT_COMMENTS_REVALIDATE_AFTER', 10 * 60))
+    
+    # Async fan-out: outbound calls in flight per gather, and threads for blocking clients (praw)
+    ASYNC_MAX_CONCURRENCY: int = int(os.getenv('ASYNC_MAX_CONCURRENCY', 32))
+    ASYNC_MAX_THREADS: int = int(os.getenv('ASYNC_MAX_THREADS', 32))
+    
+    # Time budget of an analysis run, and default timeouts of outbound calls, in seconds
+    RUN_BUDGET: float = float(os.getenv('RUN_BUDGET', 600))
+    WEB_TIMEOUT: float = float(os.getenv('WEB_TIMEOUT', 10))
+    API_TIMEOUT: float = float(os.getenv('API_TIMEOUT', 16))
+    
+    # Circuit breakers per dependency: failure rate over a window of calls
+    # that opens the circuit, and seconds it stays open before probing
+    CIRCUIT_FAILURE_RATE: float = float(os.getenv('CIRCUIT_FAILURE_RATE', 0.5))
+    CIRCUIT_MIN_CALLS: int = int(os.getenv('CIRCUIT_MIN_CALLS', 5))
+    CIRCUIT_WINDOW: float = float(os.getenv('CIRCUIT_WINDOW', 60))
+    CIRCUIT_COOLDOWN: float = float(os.getenv('CIRCUIT_COOLDOWN', 30))
+    
+    # Agent memory compaction: prompt size in tokens above which old steps are
+    # truncated, latest steps kept whole, and size of a truncated step
+    MEMORY_COMPACTION_THRESHOLD: int = int(os.getenv('MEMORY_COMPACTION_THRESHOLD', 24000))
+    MEMORY_KEEP_RECENT_STEPS: int = int(os.getenv('MEMORY_KEEP_RECENT_STEPS', 2))
+    MEMORY_COMPACTED_STEP_TOKENS: int = int(os.getenv('MEMORY_COMPACTED_STEP_TOKENS', 400))
+    
+    # Publish queue: attempts per job, retry delays and worker polling in seconds, and
+    # how long a job stays reserved by a worker before another may take it over
+    PUBLISH_MAX_ATTEMPTS: int = int(os.getenv('PUBLISH_MAX_ATTEMPTS', 5))
+    PUBLISH_RETRY_DELAY: float = float(os.getenv('PUBLISH_RETRY_DELAY', 30))
+    PUBLISH_MAX_RETRY_DELAY: float = float(os.getenv('PUBLISH_MAX_RETRY_DELAY', 900))
+    PUBLISH_POLL_INTERVAL: float = float(os.getenv('PUBLISH_POLL_INTERVAL', 2))
+    PUBLISH_LEASE: float = float(os.getenv('PUBLISH_LEASE', 1800))
+    
+    # Engagement monitor: seconds between two polls of every source, Reddit items fetched
+    # per poll (Twitter mentions are all read), most subreddit comments read to catch up with
+    # the previous poll (Reddit listings stop near 1000), and how many days our published posts and tweets are watched for comments
+    MONITOR_POLL_INTERVAL: float = float(os.getenv('MONITOR_POLL_INTERVAL', 60))
+    MONITOR_FETCH_LIMIT: int = int(os.getenv('MONITOR_FETCH_LIMIT', 100))
+    MONITOR_CATCH_UP_LIMIT: int = int(os.getenv('MONITOR_CATCH_UP_LIMIT', 1000))
+    MONITOR_WATCH_DAYS: float = float(os.getenv('MONITOR_WATCH_DAYS', 14))
+    
+    # Key pages of the analyzed website fetched in the background while the orchestrator plans
+    PREFETCH_KEY_PAGES: int = int(os.getenv('PREFETCH_KEY_PAGES', 4))
+    
+    # Twitter user profiles cache TTL in seconds
+    TWITTER_USER_CACHE_TTL: int = int(os.getenv('TWITTER_USER_CACHE_TTL', 6 * 3600))
+    
+    # Analytics cache TTLs in seconds
+    POSTING_TIMES_CACHE_TTL: int = int(os.getenv('POSTING_TIMES_CACHE_TTL', 12 * 3600))
+    
+    # Trend detection over fetched posts and tweets: window length in seconds, windows
+    # kept for comparison, count-min sketch size, terms tracked per space-saving summary,
+    # growth over the previous windows for a term to count as rising, and item IDs kept to skip duplicates
+    TREND_WINDOW: int = int(os.getenv('TREND_WINDOW', 24 * 3600))
+    TREND_WINDOWS: int = int(os.getenv('TREND_WINDOWS', 7))
+    TREND_SKETCH_WIDTH: int = int(os.getenv('TREND_SKETCH_WIDTH', 2048))
+    TREND_SKETCH_DEPTH: int = int(os.getenv('TREND_SKETCH_DEPTH', 4))
+    TREND_TOP_K_CAPACITY: int = int(os.getenv('TREND_TOP_K_CAPACITY', 200))
+    TREND_MIN_GROWTH: float = float(os.getenv('TREND_MIN_GROWTH', 2.0))
+    TREND_SEEN_CAPACITY: int = int(os.getenv('TREND_SEEN_CAPACITY', 50000))
+    
+    # Model routes per task class (MODEL_ROUTE_<TASK>=model1,model2 and MODEL_SLO_<TASK>=seconds)
+    MODEL_ROUTES: Dict[str, Dict[str, Any]] = {
+        'summarize': _model_route('summarize', 'claude-3-5-haiku-latest,claude-3-haiku-20240307', 10.0),
+        'classify': _model_route('classify', 'claude-3-5-haiku-latest,claude-3-haiku-20240307', 5.0),
+        'draft': _model_route('draft', 'claude-3-5-sonnet-latest,claude-3-5-haiku-latest', 30.0),
+        'plan': _model_route('plan', 'claude-3-5-sonnet-latest,claude-3-opus-20240229', 60.0)
+    }
+    # Seconds a model is avoided after a timeout or overload
+    MODEL_COOLDOWN: float = float(os.getenv('MODEL_COOLDOWN', 60))
+    
     @classmethod
     def validate(cls) -> None:
         """Validate that all required environment variables are set."""
@@ -57,6 +153,11 @@ class Settings:
             'password': cls.REDDIT_PASSWORD
         }
     
+    @classmethod
+    def data_path(cls, filename: str) -> str:
+        """Get the path of a file in the local data directory."""
+        return os.path.join(cls.DATA_DIR, filename)
+    
     @classmethod
     def get_twitter_config(cls) -> Dict[str, str]:
         """Get Twitter configuration as a dictionary."""
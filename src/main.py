@@ -1,5 +1,8 @@
+import argparse
 import logging
-from src.agents.orchestrator_agent import OrchestratorAgent
+import os
+import signal
+from datetime import datetime, timezone
 
 # Configuration du logging
 logging.basicConfig(
@@ -8,19 +11,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
-    """Fonction principale pour exécuter l'agent orchestrateur."""
+def analyze(url: str, resume_id: str = None):
+    """Exécute l'agent orchestrateur sur une URL, ou reprend une analyse interrompue."""
+    # Import différé: l'export ne doit pas charger les agents ni les modèles
+    from src.agents.orchestrator_agent import OrchestratorAgent
+
     try:
         # Initialisation de l'orchestrateur
         orchestrator = OrchestratorAgent()
-        
-        # URL de l'entreprise à analyser
-        url = "https://example.com/"
-        logger.info(f"Démarrage de l'analyse de l'entreprise: {url}")
-        
+
+        if resume_id:
+            logger.info(f"Reprise de l'analyse: {resume_id}")
+        else:
+            logger.info(f"Démarrage de l'analyse de l'entreprise: {url}")
+
         # Exécution de l'analyse
-        analysis_result = orchestrator.run_app(url)
-        
+        analysis_result = orchestrator.run_app(url, resume_id=resume_id)
+
         # Affichage des résultats
         if analysis_result['status'] == 'success':
             logger.info("Analyse terminée avec succès")
@@ -29,10 +36,108 @@ def main():
             print(analysis_result['result'])
         else:
             logger.error(f"Échec de l'analyse: {analysis_result['error']}")
-        
+            # Point de reprise conservé: seules les étapes restantes seront refaites
+            from src.services.storage_service import get_data_store
+            if get_data_store().get_checkpoint(analysis_result['run_id']):
+                print(f"\nReprise possible: python -m src.main analyze --resume {analysis_result['run_id']}")
+
     except Exception as e:
         logger.error(f"Une erreur est survenue: {str(e)}")
         raise
 
+def parse_date(value: str) -> datetime:
+    """Lit une date ISO (YYYY-MM-DD ou date-heure), en UTC si aucun fuseau n'est donné."""
+    try:
+        date = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Date invalide: {value}")
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+def export(datasets, output_dir: str, format: str, since=None, until=None, batch_size: int = 10000):
+    """Exporte les analyses et les données collectées vers des fichiers JSONL ou Parquet."""
+    from src.services.export_service import ExportService
+
+    service = ExportService()
+    for dataset in datasets:
+        path = os.path.join(output_dir, f"{dataset}.{format}")
+        count = service.export(dataset, path, format=format, since=since, until=until, batch_size=batch_size)
+        print(f"{dataset}: {count} lignes -> {path}")
+
+def publish_worker():
+    """Publie les posts, commentaires et tweets mis en file par les agents, jusqu'à SIGTERM ou Ctrl+C."""
+    from src.services.publish_queue import PublishScheduler
+
+    scheduler = PublishScheduler()
+    # Arrêt propre: la publication en cours se termine avant l'arrêt
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+    logger.info("Publication arrêtée")
+
+def monitor():
+    """Suit les commentaires, réponses et mentions de nos publications, jusqu'à SIGTERM ou Ctrl+C."""
+    from src.services.engagement_monitor import EngagementMonitor
+
+    engagement_monitor = EngagementMonitor()
+    signal.signal(signal.SIGTERM, lambda signum, frame: engagement_monitor.stop())
+    try:
+        engagement_monitor.run()
+    except KeyboardInterrupt:
+        engagement_monitor.stop()
+    logger.info("Suivi de l'engagement arrêté")
+
+def publish_status(status: str = None, limit: int = 20):
+    """Affiche l'état de la file de publication."""
+    from src.services.publish_queue import get_publish_queue
+
+    queue = get_publish_queue()
+    print(queue.stats())
+    for job in queue.list(status=status, limit=limit):
+        after = f" après {job['depends_on']}" if job['depends_on'] else ""
+        error = f" - {job['error']}" if job['error'] else ""
+        print(f"#{job['id']} {job['action']}{after}: {job['status']} ({job['attempts']} essais){error}")
+
+def main(argv=None):
+    """Fonction principale: analyse (par défaut) ou export des données."""
+    from src.services.export_service import DATASETS, FORMATS
+
+    parser = argparse.ArgumentParser(description="InSocia")
+    subparsers = parser.add_subparsers(dest='command')
+
+    analyze_parser = subparsers.add_parser('analyze', help="Analyser une entreprise")
+    analyze_parser.add_argument('url', nargs='?')
+    analyze_parser.add_argument('--resume', metavar='RUN_ID', help="Reprendre une analyse interrompue")
+
+    export_parser = subparsers.add_parser('export', help="Exporter les analyses et les données collectées")
+    export_parser.add_argument('--datasets', nargs='+', choices=list(DATASETS), default=list(DATASETS))
+    export_parser.add_argument('--format', choices=FORMATS, default='jsonl')
+    export_parser.add_argument('--since', type=parse_date, help="Date de début incluse (ISO, UTC par défaut)")
+    export_parser.add_argument('--until', type=parse_date, help="Date de fin exclue (ISO, UTC par défaut)")
+    export_parser.add_argument('--output-dir', default='exports')
+    export_parser.add_argument('--batch-size', type=int, default=10000)
+
+    subparsers.add_parser('publish-worker', help="Publier les contenus mis en file par les agents")
+
+    subparsers.add_parser('monitor', help="Suivre les commentaires et mentions de nos publications")
+
+    queue_parser = subparsers.add_parser('publish-queue', help="Afficher la file de publication")
+    queue_parser.add_argument('--status', choices=['pending', 'in_progress', 'done', 'failed'])
+    queue_parser.add_argument('--limit', type=int, default=20)
+
+    args = parser.parse_args(argv)
+    if args.command == 'export':
+        export(args.datasets, args.output_dir, args.format, args.since, args.until, args.batch_size)
+    elif args.command == 'publish-worker':
+        publish_worker()
+    elif args.command == 'monitor':
+        monitor()
+    elif args.command == 'publish-queue':
+        publish_status(args.status, args.limit)
+    else:
+        resume_id = getattr(args, 'resume', None)
+        analyze(getattr(args, 'url', None) or (None if resume_id else "https://example.com/"), resume_id)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
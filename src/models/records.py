@@ -0,0 +1,322 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+import numpy as np
+
+R = TypeVar('R', bound='Record')
+
+def _epoch(value: Any) -> Optional[float]:
+    """Convert an epoch, datetime or ISO string to epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    return float(value)
+
+def _iso(value: Optional[float]) -> Optional[str]:
+    """Convert epoch seconds to an ISO-8601 UTC string."""
+    return None if value is None else datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+
+class Record:
+    """
+    Base class of the slotted record types.
+
+    Records also answer dict-style reads (record['id'], record.get('score'))
+    so code written against the former service dicts keeps working.
+    """
+
+    __slots__ = ()
+
+    # Fields stored as NumPy arrays in the columnar form, and the subset
+    # restored as integers when converting back
+    NUMERIC_FIELDS: Tuple[str, ...] = ()
+    INTEGER_FIELDS: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        # Slots are declared in field order
+        return cls.__slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable dict of the record."""
+        return {name: getattr(self, name) for name in self.field_names()}
+
+    @classmethod
+    def from_dict(cls: Type[R], data: Dict[str, Any]) -> R:
+        """Build a record from a dict, missing fields defaulting to None."""
+        return cls(**{name: data.get(name) for name in cls.field_names()})
+
+def to_columns(records: Sequence[Record]) -> Dict[str, Any]:
+    """
+    Convert records of one type to columns.
+
+    Args:
+        records: Records of a single type
+
+    Returns:
+        Dict mapping field names to NumPy arrays (numeric fields, missing
+        values as NaN) or lists (other fields)
+    """
+    if not records:
+        return {}
+    record_type = type(records[0])
+    columns = {}
+    for name in record_type.field_names():
+        if name in record_type.NUMERIC_FIELDS:
+            columns[name] = np.fromiter(
+                (np.nan if getattr(r, name) is None else getattr(r, name) for r in records),
+                dtype=float,
+                count=len(records)
+            )
+        else:
+            columns[name] = [getattr(r, name) for r in records]
+    return columns
+
+def from_columns(record_type: Type[R], columns: Dict[str, Any]) -> List[R]:
+    """
+    Convert columns back to records.
+
+    Args:
+        record_type: Record class to build
+        columns: Output of to_columns()
+
+    Returns:
+        List of records
+    """
+    if not columns:
+        return []
+    names = record_type.field_names()
+    count = len(next(iter(columns.values())))
+    values = []
+    for name in names:
+        column = columns.get(name, [None] * count)
+        if name in record_type.NUMERIC_FIELDS:
+            cast = int if name in record_type.INTEGER_FIELDS else float
+            column = [None if np.isnan(v) else cast(v) for v in column]
+        values.append(column)
+    return [record_type(*row) for row in zip(*values)]
+
+@dataclass(frozen=True)
+class Tweet(Record):
+    """A tweet with its public metrics."""
+
+    __slots__ = ('id', 'text', 'created_at', 'author_id', 'conversation_id',
+                 'like_count', 'retweet_count', 'reply_count', 'quote_count')
+    NUMERIC_FIELDS = ('created_at', 'like_count', 'retweet_count', 'reply_count', 'quote_count')
+    INTEGER_FIELDS = ('like_count', 'retweet_count', 'reply_count', 'quote_count')
+
+    id: str
+    text: str
+    created_at: Optional[float]
+    author_id: Optional[str]
+    conversation_id: Optional[str]
+    like_count: Optional[int]
+    retweet_count: Optional[int]
+    reply_count: Optional[int]
+    quote_count: Optional[int]
+
+    @property
+    def metrics(self) -> Dict[str, Optional[int]]:
+        return {
+            'like_count': self.like_count,
+            'retweet_count': self.retweet_count,
+            'reply_count': self.reply_count,
+            'quote_count': self.quote_count
+        }
+
+    @classmethod
+    def from_api(cls, tweet: Any) -> 'Tweet':
+        """Build a tweet from a tweepy v2 Tweet object."""
+        metrics = tweet.public_metrics or {}
+        return cls(
+            id=str(tweet.id),
+            text=tweet.text,
+            created_at=_epoch(tweet.created_at),
+            author_id=None if tweet.author_id is None else str(tweet.author_id),
+            conversation_id=None if tweet.conversation_id is None else str(tweet.conversation_id),
+            like_count=metrics.get('like_count'),
+            retweet_count=metrics.get('retweet_count'),
+            reply_count=metrics.get('reply_count'),
+            quote_count=metrics.get('quote_count')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'text': self.text,
+            'created_at': _iso(self.created_at),
+            'author_id': self.author_id,
+            'conversation_id': self.conversation_id,
+            'metrics': self.metrics
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Tweet':
+        metrics = data.get('metrics') or data.get('public_metrics') or {}
+        return cls(
+            id=str(data['id']),
+            text=data.get('text'),
+            created_at=_epoch(data.get('created_at')),
+            author_id=None if data.get('author_id') is None else str(data['author_id']),
+            conversation_id=None if data.get('conversation_id') is None else str(data['conversation_id']),
+            like_count=metrics.get('like_count'),
+            retweet_count=metrics.get('retweet_count'),
+            reply_count=metrics.get('reply_count'),
+            quote_count=metrics.get('quote_count')
+        )
+
+@dataclass(frozen=True)
+class RedditPost(Record):
+    """A Reddit submission."""
+
+    __slots__ = ('id', 'subreddit', 'author', 'title', 'selftext', 'url', 'score', 'num_comments', 'is_self',
+                 'created_utc')
+    NUMERIC_FIELDS = ('score', 'num_comments', 'created_utc')
+    INTEGER_FIELDS = ('score', 'num_comments')
+
+    id: str
+    subreddit: Optional[str]
+    author: Optional[str]
+    title: str
+    selftext: Optional[str]
+    url: Optional[str]
+    score: Optional[int]
+    num_comments: Optional[int]
+    is_self: Optional[bool]
+    created_utc: Optional[float]
+
+    @classmethod
+    def from_api(cls, post: Any) -> 'RedditPost':
+        """Build a post from a praw Submission (author None once the account is deleted)."""
+        return cls(
+            id=post.id,
+            subreddit=post.subreddit.display_name,
+            author=None if post.author is None else str(post.author),
+            title=post.title,
+            selftext=post.selftext,
+            url=post.url,
+            score=post.score,
+            num_comments=post.num_comments,
+            is_self=post.is_self,
+            created_utc=post.created_utc
+        )
+
+@dataclass(frozen=True)
+class RedditComment(Record):
+    """A Reddit comment, flattened out of its thread."""
+
+    __slots__ = ('id', 'parent_id', 'author', 'body', 'score', 'depth', 'created_utc')
+    NUMERIC_FIELDS = ('score', 'depth', 'created_utc')
+    INTEGER_FIELDS = ('score', 'depth')
+
+    id: str
+    parent_id: Optional[str]
+    author: Optional[str]
+    body: str
+    score: Optional[int]
+    depth: int
+    created_utc: Optional[float]
+
+    @classmethod
+    def from_api(cls, comment: Any, depth: int) -> 'RedditComment':
+        """Build a comment from a praw Comment (parent_id None for a top-level comment)."""
+        parent_id = comment.parent_id
+        return cls(
+            id=comment.id,
+            parent_id=parent_id[3:] if parent_id and parent_id.startswith('t1_') else None,
+            author=comment.author.name if comment.author else None,
+            body=comment.body,
+            score=comment.score,
+            depth=depth,
+            created_utc=comment.created_utc
+        )
+
+@dataclass(frozen=True)
+class SubredditProfile(Record):
+    """The 'about' data and rules of a subreddit."""
+
+    __slots__ = ('name', 'description', 'subscribers', 'created_utc', 'rules')
+    NUMERIC_FIELDS = ('subscribers', 'created_utc')
+    INTEGER_FIELDS = ('subscribers',)
+
+    name: str
+    description: Optional[str]
+    subscribers: Optional[int]
+    created_utc: Optional[float]
+    rules: Tuple[Tuple[str, str], ...]
+
+    @classmethod
+    def from_parts(cls, about: Dict[str, Any], rules: Iterable[Dict[str, str]]) -> 'SubredditProfile':
+        """Build a profile from the 'about' dict and rule dicts returned by RedditService."""
+        return cls(
+            name=about.get('name'),
+            description=about.get('description'),
+            subscribers=about.get('subscribers'),
+            created_utc=about.get('created_utc'),
+            rules=tuple((rule['short_name'], rule.get('description') or '') for rule in rules)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data['rules'] = [{'short_name': name, 'description': description} for name, description in self.rules]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SubredditProfile':
+        return cls.from_parts(data, data.get('rules') or [])
+
+@dataclass(frozen=True)
+class PageSnapshot(Record):
+    """A scraped web page."""
+
+    __slots__ = ('url', 'status_code', 'title', 'description', 'keywords', 'content', 'links')
+    NUMERIC_FIELDS = ('status_code',)
+    INTEGER_FIELDS = ('status_code',)
+
+    url: str
+    status_code: Optional[int]
+    title: Optional[str]
+    description: Optional[str]
+    keywords: Optional[str]
+    content: str
+    links: Tuple[str, ...]
+
+    @property
+    def meta_info(self) -> Dict[str, Optional[str]]:
+        return {'title': self.title, 'description': self.description, 'keywords': self.keywords}
+
+    @property
+    def content_summary(self) -> str:
+        return self.content[:500] + '...' if len(self.content) > 500 else self.content
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data['links'] = list(self.links)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PageSnapshot':
+        return cls(
+            url=data['url'],
+            status_code=data.get('status_code'),
+            title=data.get('title'),
+            description=data.get('description'),
+            keywords=data.get('keywords'),
+            content=data.get('content') or '',
+            links=tuple(data.get('links') or ())
+        )
@@ -0,0 +1,203 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.config.settings import settings
+from src.services.publish_queue import PublishQueue, get_publish_queue
+from src.services.storage_service import DataStore, get_data_store
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Dict[str, Any]], None]
+
+def log_event(event: Dict[str, Any]) -> None:
+    """Default handler: log the event."""
+    target = f" on {event['target_id']}" if event.get('target_id') else ""
+    logger.info(f"New {event['platform']} {event['kind']}{target} by {event.get('author')}: {event.get('url')}")
+
+def _strip_kind(fullname: Optional[str]) -> Optional[str]:
+    """'t3_abc' -> 'abc'."""
+    return fullname.split('_', 1)[1] if fullname and '_' in fullname else fullname
+
+class EngagementMonitor:
+    """
+    Follows the comments, replies and mentions of everything we published.
+
+    One loop polls a fixed set of sources, each a single request whatever
+    the number of posts watched: the Reddit inbox (replies to our posts
+    and comments, mentions, messages), the latest comments of the
+    subreddits we posted in (as one multireddit, for replies deeper in our
+    threads, newer than the last one seen), and the Twitter mentions of our
+    account, newer than the last one seen. Events are deduplicated and stored in the data store, and
+    new ones are passed to a handler on a separate thread. Events the
+    handler did not get to are handed to it again on the next start.
+    """
+
+    def __init__(self, reddit_service: Optional[Any] = None, twitter_service: Optional[Any] = None,
+                 store: Optional[DataStore] = None, publish_queue: Optional[PublishQueue] = None,
+                 handler: Optional[EventHandler] = None, poll_interval: Optional[float] = None):
+        """
+        Initialize the monitor.
+
+        Args:
+            reddit_service: Reddit service (a new RedditService by default)
+            twitter_service: Twitter service (a new TwitterService by default)
+            store: Data store of the events (the shared one by default)
+            publish_queue: Queue whose published jobs are watched (the shared one by default)
+            handler: Called with every new event (logs it by default)
+            poll_interval: Seconds between two polls of every source
+        """
+        if reddit_service is None:
+            from src.services.reddit_service import RedditService
+            reddit_service = RedditService()
+        if twitter_service is None:
+            from src.services.twitter_service import TwitterService
+            twitter_service = TwitterService()
+        self.reddit = reddit_service
+        self.twitter = twitter_service
+        self.store = store or get_data_store()
+        self.publish_queue = publish_queue or get_publish_queue()
+        self.handler = handler or log_event
+        self.poll_interval = settings.MONITOR_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.reddit_username = (settings.get_reddit_config().get('username') or '').lower()
+        self.events: 'queue.Queue[Dict[str, Any]]' = queue.Queue()
+        # Newest subreddit comment read by the previous poll
+        self._last_comment_id: Optional[str] = None
+        self._stop = threading.Event()
+
+    def tracked(self) -> Dict[str, Set[str]]:
+        """IDs of the posts, comments and tweets we published within the watch window, and their subreddits."""
+        since = time.time() - settings.MONITOR_WATCH_DAYS * 86400
+        tracked: Dict[str, Set[str]] = {'reddit_posts': set(), 'reddit_comments': set(),
+                                        'subreddits': set(), 'tweets': set()}
+        for job in self.publish_queue.published('reddit', since):
+            if job['action'] == 'reddit_post':
+                tracked['reddit_posts'].add(str(job['result']['id']))
+                tracked['subreddits'].add(job['payload']['subreddit'])
+            else:
+                tracked['reddit_comments'].add(str(job['result']['id']))
+        for job in self.publish_queue.published('twitter', since):
+            tracked['tweets'].add(str(job['result']['id']))
+        return tracked
+
+    def _reddit_event(self, item: Dict[str, Any], tracked: Dict[str, Set[str]]) -> Dict[str, Any]:
+        post_id, parent_id = _strip_kind(item['link_id']), _strip_kind(item['parent_id'])
+        if parent_id in tracked['reddit_comments']:
+            target = parent_id
+        elif post_id in tracked['reddit_posts']:
+            target = post_id
+        else:
+            target = None
+        return {
+            'platform': 'reddit',
+            # Same ID for a comment seen in the inbox and in the subreddit's comments
+            'id': f"{'t1' if item['kind'] == 'comment' else 't4'}_{item['id']}",
+            'kind': item['kind'],
+            'author': item['author'],
+            'text': item['body'],
+            'url': item['permalink'],
+            'target_id': target,
+            'created_utc': item['created_utc']
+        }
+
+    def poll_reddit_inbox(self, tracked: Dict[str, Set[str]]) -> List[Dict[str, Any]]:
+        """Replies, mentions and messages in the Reddit inbox."""
+        inbox = self.reddit.get_inbox(limit=settings.MONITOR_FETCH_LIMIT)
+        return [self._reddit_event(item, tracked) for item in inbox]
+
+    def poll_reddit_comments(self, tracked: Dict[str, Set[str]]) -> List[Dict[str, Any]]:
+        """Comments of others anywhere in the threads of our posts."""
+        if not tracked['reddit_posts']:
+            return []
+        # After the first poll, page back to the newest comment already read rather than
+        # stopping at one page: a busy subreddit may get more than a page between two polls
+        if self._last_comment_id is None:
+            comments = self.reddit.get_new_comments(sorted(tracked['subreddits']), limit=settings.MONITOR_FETCH_LIMIT)
+        else:
+            comments = self.reddit.get_new_comments(sorted(tracked['subreddits']),
+                                                    limit=settings.MONITOR_CATCH_UP_LIMIT,
+                                                    after_id=self._last_comment_id)
+        if comments:
+            self._last_comment_id = comments[0]['id']
+        return [
+            self._reddit_event(comment, tracked) for comment in comments
+            if _strip_kind(comment['link_id']) in tracked['reddit_posts']
+            and (comment['author'] or '').lower() != self.reddit_username
+        ]
+
+    def poll_twitter_mentions(self, tracked: Dict[str, Set[str]]) -> List[Dict[str, Any]]:
+        """Mentions of our account, replies to our tweets included."""
+        events = []
+        own_id = self.twitter.get_own_user_id()
+        # Uncapped: the next poll resumes after the newest mention, so any left unread would be lost.
+        # The walk only grows with the mentions received since the last poll.
+        for tweet in self.twitter.iter_mentions(max_tweets=None):
+            if tweet.author_id == own_id:
+                continue
+            in_thread = tweet.conversation_id in tracked['tweets']
+            events.append({
+                'platform': 'twitter',
+                'id': tweet.id,
+                'kind': 'reply' if in_thread else 'mention',
+                'author': tweet.author_id,
+                'text': tweet.text,
+                'url': f"https://twitter.com/i/web/status/{tweet.id}",
+                # Thread of ours the reply belongs to
+                'target_id': tweet.conversation_id if in_thread else None,
+                'created_utc': tweet.created_at
+            })
+        return events
+
+    def poll_once(self) -> List[Dict[str, Any]]:
+        """
+        Poll every source once, store the events and queue the new ones.
+
+        Returns:
+            The new events
+        """
+        tracked = self.tracked()
+        new = []
+        for source in (self.poll_reddit_inbox, self.poll_reddit_comments, self.poll_twitter_mentions):
+            try:
+                events = source(tracked)
+            except Exception as e:
+                # One failing platform must not stop the others
+                logger.warning(f"Engagement monitor: {source.__name__} failed: {str(e)}")
+                continue
+            for event in self.store.save_engagement_events(events):
+                self.events.put(event)
+                new.append(event)
+        if new:
+            logger.info(f"Engagement monitor: {len(new)} new events")
+        return new
+
+    def _handle_events(self) -> None:
+        while not (self._stop.is_set() and self.events.empty()):
+            try:
+                event = self.events.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                self.handler(event)
+                self.store.mark_event_handled(event['platform'], event['id'])
+            except Exception as e:
+                # Left unhandled: handed to the handler again on the next start
+                logger.error(f"Failed to handle {event['platform']} event {event['id']}: {str(e)}")
+
+    def run(self) -> None:
+        """Poll until stop() is called, handling new events as they come."""
+        for event in self.store.get_unhandled_events():
+            self.events.put(event)
+        worker = threading.Thread(target=self._handle_events, name='engagement-handler', daemon=True)
+        worker.start()
+        logger.info(f"Engagement monitor started, polling every {self.poll_interval:.0f}s")
+        while not self._stop.is_set():
+            self.poll_once()
+            self._stop.wait(self.poll_interval)
+        worker.join()
+
+    def stop(self) -> None:
+        """Stop polling; events already queued are still handled."""
+        self._stop.set()
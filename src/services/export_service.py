@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.services.storage_service import DataStore, get_data_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('jsonl', 'parquet')
+
+def _bool(value: Any) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+def _json(value: Optional[str]) -> Any:
+    return json.loads(value) if value else None
+
+def _shape_reddit_post(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': row['id'],
+        'subreddit': row['subreddit'],
+        'author': row['author'],
+        'title': row['title'],
+        'text': row['text'],
+        'url': row['url'],
+        'score': row['score'],
+        'num_comments': row['num_comments'],
+        'is_self': _bool(row['is_self']),
+        'created_utc': row['created_utc'],
+        'query': row['query'],
+        'fetched_at': row['fetched_at']
+    }
+
+def _shape_tweet(row: Dict[str, Any]) -> Dict[str, Any]:
+    metrics = _json(row['metrics']) or {}
+    return {
+        'id': row['id'],
+        'author_id': row['author'],
+        'text': row['text'],
+        'created_at': row['created_utc'],
+        'like_count': metrics.get('like_count'),
+        'retweet_count': metrics.get('retweet_count'),
+        'reply_count': metrics.get('reply_count'),
+        'quote_count': metrics.get('quote_count'),
+        'query': row['query'],
+        'fetched_at': row['fetched_at']
+    }
+
+def _shape_run(row: Dict[str, Any]) -> Dict[str, Any]:
+    started, finished = row['started_at'], row['finished_at']
+    return {
+        'id': row['id'],
+        'url': row['url'],
+        'status': row['status'],
+        # Agent results are free-form, so they are kept as a JSON string
+        'result': row['result'],
+        'error': row['error'],
+        'started_at': started,
+        'finished_at': finished,
+        'duration': None if started is None else finished - started
+    }
+
+# Dataset name -> (table, time column, row filter, row shaper, Parquet columns)
+DATASETS: Dict[str, tuple] = {
+    'runs': ('runs', 'started_at', None, _shape_run, [
+        ('id', 'string'), ('url', 'string'), ('status', 'string'), ('result', 'string'),
+        ('error', 'string'), ('started_at', 'float64'), ('finished_at', 'float64'), ('duration', 'float64')
+    ]),
+    'reddit_posts': ('posts', 'created_utc', {'platform': 'reddit'}, _shape_reddit_post, [
+        ('id', 'string'), ('subreddit', 'string'), ('author', 'string'), ('title', 'string'),
+        ('text', 'string'), ('url', 'string'), ('score', 'int64'), ('num_comments', 'int64'),
+        ('is_self', 'bool_'), ('created_utc', 'float64'), ('query', 'string'), ('fetched_at', 'float64')
+    ]),
+    'tweets': ('posts', 'created_utc', {'platform': 'twitter'}, _shape_tweet, [
+        ('id', 'string'), ('author_id', 'string'), ('text', 'string'), ('created_at', 'float64'),
+        ('like_count', 'int64'), ('retweet_count', 'int64'), ('reply_count', 'int64'),
+        ('quote_count', 'int64'), ('query', 'string'), ('fetched_at', 'float64')
+    ])
+}
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed and Parquet export can be used."""
+    return pq is not None
+
+class ExportService:
+    """Service streaming stored runs, Reddit posts and tweets to JSONL or Parquet files."""
+
+    def __init__(self, store: Optional[DataStore] = None):
+        """
+        Initialize the export service.
+
+        Args:
+            store: Data store to export from (defaults to the shared store)
+        """
+        self.store = store or get_data_store()
+
+    def iter_rows(
+        self,
+        dataset: str,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        batch_size: int = 10000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream the shaped rows of a dataset in batches.
+
+        Args:
+            dataset: 'runs', 'reddit_posts' or 'tweets'
+            since: Only rows created (runs: started) at or after this time
+            until: Only rows created before this time
+            batch_size: Rows per batch
+
+        Yields:
+            Lists of flat row dicts
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset: {dataset} (expected one of {', '.join(DATASETS)})")
+        table, time_column, where, shape, _ = DATASETS[dataset]
+        for batch in self.store.iter_batches(table, time_column, since, until, where, batch_size):
+            yield [shape(row) for row in batch]
+
+    def export(
+        self,
+        dataset: str,
+        path: str,
+        format: str = 'jsonl',
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        batch_size: int = 10000
+    ) -> int:
+        """
+        Export a dataset to a file, one batch in memory at a time.
+
+        JSONL files get one JSON object per line; Parquet files get one row
+        group per batch. The file is written under a temporary name and
+        moved into place once complete.
+
+        Args:
+            dataset: 'runs', 'reddit_posts' or 'tweets'
+            path: Output file path
+            format: 'jsonl' or 'parquet' (requires pyarrow)
+            since: Only rows created (runs: started) at or after this time
+            until: Only rows created before this time
+            batch_size: Rows per batch (and per Parquet row group)
+
+        Returns:
+            Number of rows exported
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset: {dataset} (expected one of {', '.join(DATASETS)})")
+        if format not in FORMATS:
+            raise ValueError(f"Unknown export format: {format} (expected one of {', '.join(FORMATS)})")
+        if format == 'parquet' and not parquet_available():
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        batches = self.iter_rows(dataset, since, until, batch_size)
+        writer = self._write_jsonl if format == 'jsonl' else self._write_parquet
+
+        tmp_path = f"{path}.tmp"
+        try:
+            count = writer(batches, tmp_path, dataset)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise Exception(f"Failed to export {dataset}: {str(e)}")
+
+        logger.info(f"Exported {count} {dataset} rows to {path}")
+        return count
+
+    def _write_jsonl(self, batches: Iterator[List[Dict[str, Any]]], path: str, dataset: str) -> int:
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for batch in batches:
+                f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in batch)
+                count += len(batch)
+        return count
+
+    def _write_parquet(self, batches: Iterator[List[Dict[str, Any]]], path: str, dataset: str) -> int:
+        schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in DATASETS[dataset][4]])
+        count = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+        return count
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.cancellation import CancelToken
+
+logger = logging.getLogger(__name__)
+
+class Job:
+    """An analysis running in a background thread."""
+
+    def __init__(self, job_id: str, token: CancelToken):
+        self.id = job_id
+        self.token = token
+        self.started_at = time.time()
+        self.result: Optional[Dict[str, Any]] = None
+        self.done = threading.Event()
+        # Dropped as soon as it finishes: nobody is waiting for its result
+        self.forgotten = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.done.is_set():
+            status = 'cancelling' if self.token.cancelled else 'running'
+        else:
+            status = (self.result or {}).get('status', 'error')
+        return {'id': self.id, 'status': status, 'started_at': self.started_at}
+
+class JobManager:
+    """
+    Runs analyses in background threads so they can be cancelled.
+
+    Each job gets a cancel token that the run checks cooperatively; jobs
+    are cancelled one by one (client disconnect, DELETE /jobs/<id>) or all
+    at once (server shutdown).
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, run: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> Job:
+        """
+        Start a job.
+
+        Args:
+            run: Function running the analysis; called with the extra keyword
+                arguments cancel_token and run_id
+            *args, **kwargs: Passed to run
+
+        Returns:
+            The started job
+        """
+        job = Job(uuid.uuid4().hex, CancelToken())
+
+        def target():
+            try:
+                job.result = run(*args, cancel_token=job.token, run_id=job.id, **kwargs)
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {str(e)}")
+                job.result = {'status': 'error', 'run_id': job.id, 'error': str(e)}
+            finally:
+                with self._lock:
+                    job.done.set()
+                    if job.forgotten:
+                        self._jobs.pop(job.id, None)
+
+        with self._lock:
+            self._jobs[job.id] = job
+        threading.Thread(target=target, name=f"job-{job.id[:8]}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str, reason: str = 'cancelled') -> bool:
+        """
+        Request cancellation of a job.
+
+        Args:
+            job_id: ID of the job
+            reason: Why the job is cancelled
+
+        Returns:
+            False if there is no such running job
+        """
+        job = self.get(job_id)
+        if job is None or job.done.is_set():
+            return False
+        logger.info(f"Cancelling job {job_id}: {reason}")
+        job.token.cancel(reason)
+        return True
+
+    def cancel_all(self, reason: str = 'server shutdown', wait: Optional[float] = None) -> int:
+        """
+        Cancel every running job.
+
+        Args:
+            reason: Why the jobs are cancelled
+            wait: Seconds to wait for the jobs to stop
+
+        Returns:
+            Number of jobs cancelled
+        """
+        jobs = [job for job in self.list() if self.cancel(job.id, reason)]
+        deadline = time.monotonic() + (wait or 0)
+        for job in jobs:
+            job.done.wait(max(0.0, deadline - time.monotonic()))
+        return len(jobs)
+
+    def forget(self, job_id: str) -> None:
+        """Drop a job whose result was delivered or is no longer wanted, once it has finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if job.done.is_set():
+                del self._jobs[job_id]
+            else:
+                job.forgotten = True
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Return the job manager shared by the web app."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
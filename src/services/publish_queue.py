@@ -0,0 +1,388 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.settings import settings
+from src.utils.run_context import current_report
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS publish_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    platform TEXT NOT NULL,
+    action TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    depends_on INTEGER REFERENCES publish_jobs (id),
+    run_id TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL,
+    leased_until REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_publish_jobs_ready ON publish_jobs (platform, status, not_before);
+"""
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+# Platform of each publish action
+ACTIONS = {
+    'reddit_post': 'reddit',
+    'reddit_comment': 'reddit',
+    'tweet': 'twitter'
+}
+
+class PermanentPublishError(Exception):
+    """A publish that must not be retried (invalid content, failed parent)."""
+
+def idempotency_key(action: str, payload: Dict[str, Any], depends_on: Optional[int] = None,
+                    run_id: Optional[str] = None) -> str:
+    """Default idempotency key: the same content is published once per run (a retrying agent gets its job back)."""
+    canonical = json.dumps({'action': action, 'payload': payload, 'depends_on': depends_on, 'run_id': run_id},
+                           sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+class PublishQueue:
+    """
+    Durable local queue of outbound posts, tweets and comments.
+
+    Agents enqueue content and return at once; the publish scheduler drains
+    the queue in another process. A job may depend on an earlier one (next
+    tweet of a thread, reply to a queued comment): it is only published once
+    that job is, and fails if it failed.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the queue.
+
+        Args:
+            path: Path of the SQLite file (':memory:' for a transient queue)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        # Autocommit: claims run in explicit IMMEDIATE transactions, safe across processes
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def enqueue(self, action: str, payload: Dict[str, Any], depends_on: Optional[int] = None,
+                key: Optional[str] = None, delay: float = 0) -> Dict[str, Any]:
+        """
+        Add a job to the queue; a job with the same idempotency key is returned
+        instead, or queued again if it failed.
+
+        Args:
+            action: 'reddit_post', 'reddit_comment' or 'tweet'
+            payload: Content of the publish
+            depends_on: ID of the job that must be published first
+            key: Idempotency key (derived from the content and the current run by default)
+            delay: Seconds before the job may be published
+
+        Returns:
+            The job
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown publish action: {action}")
+        report = current_report()
+        run_id = report.run_id if report is not None else None
+        key = key or idempotency_key(action, payload, depends_on, run_id)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # A failed job is queued again under its ID, so jobs depending on it still point to it
+                self._conn.execute(
+                    """
+                    UPDATE publish_jobs SET status = ?, attempts = 0, not_before = ?, leased_until = NULL,
+                                            result = NULL, error = NULL, run_id = ?, updated_at = ?
+                    WHERE idempotency_key = ? AND status = ?
+                    """,
+                    (PENDING, now + delay, run_id, now, key, FAILED)
+                )
+                self._conn.execute(
+                    """
+                    INSERT OR IGNORE INTO publish_jobs (idempotency_key, platform, action, payload, depends_on,
+                                                        run_id, status, not_before, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, ACTIONS[action], action, json.dumps(payload), depends_on, run_id, PENDING,
+                     now + delay, now, now)
+                )
+                row = self._conn.execute("SELECT * FROM publish_jobs WHERE idempotency_key = ?", (key,)).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return _decode(row)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM publish_jobs WHERE id = ?", (job_id,)).fetchone()
+        return _decode(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Latest jobs, optionally with a given status."""
+        sql = "SELECT * FROM publish_jobs"
+        params: List[Any] = []
+        if status is not None:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [_decode(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def published(self, platform: str, since: float = 0) -> List[Dict[str, Any]]:
+        """Jobs of a platform published after a given time (epoch seconds)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM publish_jobs WHERE platform = ? AND status = ? AND updated_at >= ? ORDER BY id",
+                (platform, DONE, since)
+            ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM publish_jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def claim(self, platform: str, lease: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest job of a platform that is ready to publish.
+
+        A job is ready once its delay has passed and the job it depends on
+        is published. Jobs left in progress by a crashed worker are taken
+        again once their lease expires.
+
+        Args:
+            platform: 'reddit' or 'twitter'
+            lease: Seconds the job stays reserved (defaults to settings.PUBLISH_LEASE)
+
+        Returns:
+            The job, with the job it depends on under 'parent', or None
+        """
+        now = time.time()
+        lease = settings.PUBLISH_LEASE if lease is None else lease
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """
+                    SELECT j.* FROM publish_jobs j
+                    LEFT JOIN publish_jobs p ON p.id = j.depends_on
+                    WHERE j.platform = ? AND j.not_before <= ?
+                      AND (j.status = ? OR (j.status = ? AND j.leased_until < ?))
+                      AND (j.depends_on IS NULL OR p.status IN (?, ?))
+                    ORDER BY j.id LIMIT 1
+                    """,
+                    (platform, now, PENDING, IN_PROGRESS, now, DONE, FAILED)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE publish_jobs SET status = ?, leased_until = ?, attempts = attempts + 1, "
+                        "updated_at = ? WHERE id = ?",
+                        (IN_PROGRESS, now + lease, now, row['id'])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = _decode(row)
+        job['attempts'] += 1
+        job['parent'] = self.get(job['depends_on']) if job['depends_on'] else None
+        return job
+
+    def _update(self, job_id: int, **columns: Any) -> None:
+        columns['updated_at'] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self._lock:
+            self._conn.execute(f"UPDATE publish_jobs SET {assignments} WHERE id = ?", (*columns.values(), job_id))
+
+    def complete(self, job_id: int, result: Dict[str, Any]) -> None:
+        """Mark a job published."""
+        self._update(job_id, status=DONE, result=json.dumps(result, default=str), error=None, leased_until=None)
+
+    def fail(self, job_id: int, error: str, retry_in: Optional[float] = None) -> None:
+        """
+        Record a failed publish.
+
+        Args:
+            job_id: ID of the job
+            error: Error message
+            retry_in: Seconds before the next attempt (None: the job failed for good)
+        """
+        if retry_in is None:
+            self._update(job_id, status=FAILED, error=error, leased_until=None)
+        else:
+            self._update(job_id, status=PENDING, error=error, leased_until=None, not_before=time.time() + retry_in)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+Publisher = Callable[[Dict[str, Any], Optional[Dict[str, Any]]], Dict[str, Any]]
+
+def default_publishers() -> Dict[str, Publisher]:
+    """Publishers of each action, calling the Reddit and Twitter services."""
+    # Deferred: only the publish worker needs the API clients
+    from src.services.reddit_service import RedditService
+    from src.services.twitter_service import TwitterService
+
+    reddit: List[RedditService] = []
+    twitter: List[TwitterService] = []
+
+    def reddit_service() -> RedditService:
+        if not reddit:
+            reddit.append(RedditService())
+        return reddit[0]
+
+    def twitter_service() -> TwitterService:
+        if not twitter:
+            twitter.append(TwitterService())
+        return twitter[0]
+
+    def reddit_post(payload: Dict[str, Any], parent: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return reddit_service().create_post(payload['subreddit'], payload['title'], payload.get('content') or '',
+                                            url=payload.get('url'))
+
+    def reddit_comment(payload: Dict[str, Any], parent: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        post_url, parent_comment_id = payload.get('post_url'), payload.get('parent_comment_id')
+        if parent is not None:
+            # Reply to a post or comment that was itself queued
+            if parent['action'] == 'reddit_post':
+                post_url = parent['result']['permalink']
+            else:
+                parent_comment_id = parent['result']['id']
+        return reddit_service().create_comment(payload['text'], post_url=post_url,
+                                               parent_comment_id=parent_comment_id)
+
+    def tweet(payload: Dict[str, Any], parent: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Next tweet of a thread: a reply to the previous one
+        reply_to = parent['result']['id'] if parent is not None else payload.get('in_reply_to_tweet_id')
+        return twitter_service().create_tweet(payload['text'], in_reply_to_tweet_id=reply_to)
+
+    return {'reddit_post': reddit_post, 'reddit_comment': reddit_comment, 'tweet': tweet}
+
+class PublishScheduler:
+    """
+    Drains the publish queue, one worker thread per platform.
+
+    Each worker publishes its platform's jobs in order, as fast as the
+    services' rate limiters allow, so Reddit and Twitter are drained in
+    parallel. Failed publishes are retried with exponential backoff up to
+    settings.PUBLISH_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, queue: Optional[PublishQueue] = None, publishers: Optional[Dict[str, Publisher]] = None,
+                 poll_interval: Optional[float] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            queue: Queue to drain (the shared one by default)
+            publishers: Publisher of each action (the Reddit and Twitter services by default)
+            poll_interval: Seconds between two looks at an empty queue
+        """
+        self.queue = queue or get_publish_queue()
+        self.publishers = publishers or default_publishers()
+        self.poll_interval = settings.PUBLISH_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._stop = threading.Event()
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds before the next attempt of a job that failed `attempts` times."""
+        return min(settings.PUBLISH_RETRY_DELAY * 2 ** (attempts - 1), settings.PUBLISH_MAX_RETRY_DELAY)
+
+    def publish_next(self, platform: str) -> bool:
+        """
+        Publish the next ready job of a platform.
+
+        Args:
+            platform: 'reddit' or 'twitter'
+
+        Returns:
+            False if no job was ready
+        """
+        job = self.queue.claim(platform)
+        if job is None:
+            return False
+        parent = job['parent']
+        try:
+            if parent is not None and parent['status'] == FAILED:
+                raise PermanentPublishError(f"Job {parent['id']} it depends on failed")
+            result = self.publishers[job['action']](job['payload'], parent)
+        except Exception as e:
+            if isinstance(e, (PermanentPublishError, ValueError)) or job['attempts'] >= settings.PUBLISH_MAX_ATTEMPTS:
+                logger.error(f"Publish job {job['id']} ({job['action']}) failed: {str(e)}")
+                self.queue.fail(job['id'], str(e))
+            else:
+                delay = self.retry_delay(job['attempts'])
+                logger.warning(f"Publish job {job['id']} ({job['action']}) failed, retry in {delay:.0f}s: {str(e)}")
+                self.queue.fail(job['id'], str(e), retry_in=delay)
+            return True
+        logger.info(f"Published job {job['id']} ({job['action']})")
+        self.queue.complete(job['id'], result)
+        return True
+
+    def _work(self, platform: str) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self.publish_next(platform):
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Publish worker for {platform} failed: {str(e)}")
+                self._stop.wait(self.poll_interval)
+
+    def run(self) -> None:
+        """Drain the queue until stop() is called."""
+        workers = [
+            threading.Thread(target=self._work, args=(platform,), name=f"publish-{platform}", daemon=True)
+            for platform in sorted(set(ACTIONS.values()))
+        ]
+        for worker in workers:
+            worker.start()
+        logger.info(f"Publish scheduler started: {self.queue.stats()}")
+        for worker in workers:
+            worker.join()
+
+    def stop(self) -> None:
+        """Stop the workers once their current publish is done."""
+        self._stop.set()
+
+_publish_queue: Optional[PublishQueue] = None
+_publish_queue_lock = threading.Lock()
+
+def get_publish_queue() -> PublishQueue:
+    """Return the publish queue shared by the agents and the scheduler."""
+    global _publish_queue
+    with _publish_queue_lock:
+        if _publish_queue is None:
+            _publish_queue = PublishQueue(settings.data_path('publish_queue.db'))
+        return _publish_queue
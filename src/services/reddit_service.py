@@ -1,7 +1,103 @@
+import logging
 import praw
-from typing import Optional, List, Dict, Any
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional, List, Dict, Any, Iterable, Set, Tuple
+from praw.models import MoreComments
+from src.analytics.trends import observe_posts
 from src.config.settings import settings
-from src.utils.decorators import rate_limit, log_execution_time
+from src.models.records import RedditComment, RedditPost, SubredditProfile
+from src.services.storage_service import get_data_store
+from src.utils.aio import in_current_context, run_blocking
+from src.utils.cache import TieredCache
+from src.utils.circuit_breaker import CircuitBreakerSession
+from src.utils.deadline import remaining_time
+from src.utils.decorators import get_rate_limiter, rate_limit, log_execution_time
+
+logger = logging.getLogger(__name__)
+
+# Reddit accepts 'sub1+sub2+...' listings; keep the URL well under its length limit.
+MULTIREDDIT_CHUNK_SIZE = 50
+# /api/info returns at most 100 subreddits per request.
+INFO_CHUNK_SIZE = 100
+
+# Shared across service instances and agent tools so that repeated analyses
+# of the same subreddit within (and across) runs hit the cache.
+reddit_cache = TieredCache(
+    settings.data_path('reddit_cache.db'),
+    ttls=settings.REDDIT_CACHE_TTLS,
+    max_entries=settings.REDDIT_CACHE_MAX_ENTRIES
+)
+
+def extract_submission_id(url: str) -> Optional[str]:
+    """Extract the ID of a post from a Reddit URL."""
+    patterns = [
+        r'reddit\.com/r/\w+/comments/([a-zA-Z0-9]+)',
+        r'redd\.it/([a-zA-Z0-9]+)',
+        r'/comments/([a-zA-Z0-9]+)'
+    ]
+    
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+    
+    return None
+
+def _walk_comments(items: Iterable[Any], max_depth: int, comments: Dict[str, RedditComment],
+                   stubs: List[Tuple[int, Any]]) -> None:
+    """
+    Flatten praw comments and their loaded replies into `comments`, and
+    collect the 'more comments' stubs met on the way into `stubs`.
+    Nothing deeper than max_depth is kept (top-level comments are depth 0).
+    """
+    pending = deque(items)
+    while pending:
+        item = pending.popleft()
+        parent_id = item.parent_id or ''
+        parent = comments.get(parent_id[3:]) if parent_id.startswith('t1_') else None
+        if parent is not None:
+            depth = parent.depth + 1
+        elif parent_id.startswith('t1_'):
+            # Parent not loaded (thread continued elsewhere): trust Reddit's depth
+            depth = vars(item).get('depth') or 0
+        else:
+            depth = 0
+        if depth >= max_depth:
+            continue
+        if isinstance(item, MoreComments):
+            stubs.append((depth, item))
+            continue
+        comments[item.id] = RedditComment.from_api(item, depth)
+        pending.extend(item.replies)
+
+def _rank_comments(comments: Iterable[RedditComment], max_depth: int, max_comments: int) -> List[RedditComment]:
+    """Best-scored comments first, within the depth and count budgets."""
+    kept = [comment for comment in comments if comment.depth < max_depth]
+    kept.sort(key=lambda comment: comment.score or 0, reverse=True)
+    return kept[:max_comments]
+
+def _comment_to_dict(item: Any) -> Dict[str, Any]:
+    """Convert a praw Comment or inbox Message to a dict."""
+    # vars(): a missing attribute of a lazy praw object would cost one more API call
+    data = vars(item)
+    is_comment = data.get('was_comment') or 'link_id' in data
+    # Inbox comments come with a link to their context, other comments with a permalink
+    permalink = data.get('context') or data.get('permalink')
+    return {
+        'id': item.id,
+        'kind': 'comment' if is_comment else 'message',
+        'author': item.author.name if item.author else None,
+        'body': item.body,
+        'subreddit': data['subreddit'].display_name if data.get('subreddit') else None,
+        # 't3_' prefix: a post; 't1_': a comment
+        'link_id': data.get('link_id'),
+        'parent_id': data.get('parent_id'),
+        'permalink': f"https://reddit.com{permalink}" if permalink else None,
+        'created_utc': item.created_utc
+    }
 
 class RedditService:
     """Service for interacting with Reddit API."""
@@ -14,12 +110,16 @@ class RedditService:
             client_secret=config['client_secret'],
             user_agent=config['user_agent'],
             username=config['username'],
-            password=config['password']
+            password=config['password'],
+            timeout=int(settings.API_TIMEOUT),
+            # prawcore's requests are capped by the current request's deadline
+            # and fail fast while Reddit is failing
+            requestor_kwargs={'session': CircuitBreakerSession('reddit')}
         )
     
-    @rate_limit(calls=30, period=60)  # Reddit's rate limit
+    @rate_limit(calls=30, period=60, key='reddit')  # Reddit's rate limit
     @log_execution_time
-    def create_post(self, subreddit: str, title: str, content: str) -> Dict[str, Any]:
+    def create_post(self, subreddit: str, title: str, content: str, url: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a post in a subreddit.
         
@@ -27,26 +127,325 @@ class RedditService:
             subreddit: Name of the subreddit
             title: Post title
             content: Post content
+            url: Link of a link post (a text post if omitted)
             
         Returns:
             Dict containing post information
         """
         try:
             subreddit_instance = self.reddit.subreddit(subreddit)
-            post = subreddit_instance.submit(
-                title=title,
-                selftext=content
-            )
+            if url:
+                post = subreddit_instance.submit(title=title, url=url)
+            else:
+                post = subreddit_instance.submit(
+                    title=title,
+                    selftext=content
+                )
             return {
                 'id': post.id,
                 'title': post.title,
                 'url': post.url,
+                'permalink': f"https://reddit.com{post.permalink}",
                 'created_utc': post.created_utc
             }
         except Exception as e:
             raise Exception(f"Failed to create Reddit post: {str(e)}")
     
-    @rate_limit(calls=30, period=60)
+    @rate_limit(calls=30, period=60, key='reddit')
+    @log_execution_time
+    def create_comment(self, text: str, post_url: Optional[str] = None,
+                       parent_comment_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Comment on a post, or reply to a comment.
+        
+        Args:
+            text: Comment text
+            post_url: URL of the post to comment on
+            parent_comment_id: ID of the comment to reply to (takes precedence over post_url)
+            
+        Returns:
+            Dict containing comment information
+        """
+        try:
+            if parent_comment_id:
+                comment = self.reddit.comment(id=parent_comment_id).reply(text)
+            else:
+                submission_id = extract_submission_id(post_url or '')
+                if not submission_id:
+                    raise ValueError(f"No Reddit post ID in URL: {post_url}")
+                comment = self.reddit.submission(id=submission_id).reply(text)
+            return {
+                'id': comment.id,
+                'permalink': f"https://reddit.com{comment.permalink}",
+                'created_utc': comment.created_utc
+            }
+        except ValueError:
+            # Not worth retrying
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to create Reddit comment: {str(e)}")
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def get_inbox(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get the latest items of the account's inbox: replies to its posts and
+        comments, username mentions and private messages, in one request.
+        
+        Args:
+            limit: Maximum number of items (one request up to 100)
+            
+        Returns:
+            List of comment and message dicts, newest first
+        """
+        try:
+            return [_comment_to_dict(item) for item in self.reddit.inbox.all(limit=limit)]
+        except Exception as e:
+            raise Exception(f"Failed to get Reddit inbox: {str(e)}")
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def get_new_comments(self, subreddits: List[str], limit: int = 100,
+                         after_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the latest comments of several subreddits, one request per 100.
+        With after_id, pages are followed back to that comment so that none
+        posted since is missed, and a warning is logged if limit is reached
+        (or the listing runs out) first.
+        
+        Args:
+            subreddits: Names of the subreddits (fetched as one 'a+b' multireddit)
+            limit: Maximum number of comments
+            after_id: ID of the newest comment seen before; only newer ones are returned
+            
+        Returns:
+            List of comment dicts, newest first
+        """
+        try:
+            multireddit = self.reddit.subreddit('+'.join(sorted(set(subreddits))))
+            limiter = get_rate_limiter('reddit', 30, 60)
+            comments = []
+            caught_up = after_id is None
+            for index, comment in enumerate(multireddit.comments(limit=limit)):
+                # Comment IDs are base 36 and increase over time, on every subreddit
+                if after_id is not None and int(comment.id, 36) <= int(after_id, 36):
+                    caught_up = True
+                    break
+                # praw fetches listings in pages of 100; every extra page is one more API call
+                if index and index % 100 == 0:
+                    limiter.acquire()
+                comments.append(_comment_to_dict(comment))
+        except Exception as e:
+            raise Exception(f"Failed to get Reddit comments: {str(e)}")
+        if not caught_up:
+            logger.warning(f"Comments posted after {after_id} in r/{'+'.join(sorted(set(subreddits)))} "
+                           f"may be missing: {len(comments)} newer ones read without reaching it")
+        return comments
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def _fetch_comment_forest(self, submission_id: str) -> Tuple[int, List[Any]]:
+        """Fetch a post's comment count and the first comments of its thread, best first (one request)."""
+        submission = self.reddit.submission(id=submission_id)
+        submission.comment_sort = 'top'
+        forest = list(submission.comments)
+        return submission.num_comments, forest
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def _fetch_more_comments(self, more: Any) -> List[Any]:
+        """Expand one 'load more comments' or 'continue this thread' stub (one request)."""
+        return list(more.comments())
+    
+    def _fetch_comment_tree(self, submission_id: str, max_depth: int, max_comments: int, time_budget: float,
+                            cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fetch a comment tree, expanding 'more comments' stubs concurrently
+        (shallowest and biggest first) until the tree is complete or a
+        budget runs out. With a cached tree, stubs whose comments are all
+        known are not expanded again (unless the cached tree was cut below
+        them), and nothing is expanded if the tree was complete and the
+        post's comment count did not change.
+        """
+        started = time.monotonic()
+        remaining = remaining_time()
+        if remaining is not None:
+            time_budget = min(time_budget, remaining)
+        
+        num_comments, forest = self._fetch_comment_forest(submission_id)
+        requests = 1
+        comments: Dict[str, RedditComment] = {}
+        known: Set[str] = set()
+        reopened: Set[str] = set()
+        unchanged = False
+        if cached is not None and cached['max_depth'] >= max_depth:
+            # Never fetch shallower than the cached tree, or it would be stored as deep but not expanded as such
+            max_depth = cached['max_depth']
+            for row in cached['comments']:
+                comment = RedditComment.from_dict(row)
+                comments[comment.id] = comment
+            known = set(comments)
+            unchanged = cached['complete'] and cached['num_comments'] == num_comments
+            # Known stubs above the comments whose replies were cut must be expanded again
+            for comment_id in cached.get('cut_below', []):
+                while comment_id is not None and comment_id not in reopened:
+                    reopened.add(comment_id)
+                    parent = comments.get(comment_id)
+                    comment_id = parent.parent_id if parent is not None else None
+        elif cached is not None:
+            # Deeper than the cached tree: its stubs were expanded without the replies now wanted
+            for row in cached['comments']:
+                comment = RedditComment.from_dict(row)
+                comments[comment.id] = comment
+        
+        stubs: List[Tuple[int, Any]] = []
+        # Comments of the first page replace their cached version: their scores are fresher
+        _walk_comments(forest, max_depth, comments, stubs)
+        if unchanged:
+            stubs = []
+        complete = True
+        cut: List[Any] = []
+        
+        executor = ThreadPoolExecutor(max_workers=settings.REDDIT_MAX_WORKERS)
+        running: Dict[Any, Any] = {}
+        try:
+            while stubs or running:
+                stubs.sort(key=lambda stub: (stub[0], -stub[1].count))
+                while stubs and len(running) < settings.REDDIT_MAX_WORKERS and len(comments) < max_comments:
+                    _, more = stubs.pop(0)
+                    if more.children and known.issuperset(more.children) and reopened.isdisjoint(more.children):
+                        continue
+                    running[executor.submit(in_current_context(self._fetch_more_comments), more)] = more
+                time_left = time_budget - (time.monotonic() - started)
+                if not running or time_left <= 0:
+                    break
+                done, _ = wait(running, timeout=time_left, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    more = running.pop(future)
+                    requests += 1
+                    try:
+                        _walk_comments(future.result(), max_depth, comments, stubs)
+                    except Exception as e:
+                        complete = False
+                        cut.append(more)
+                        logger.warning(f"Failed to expand comments of {submission_id}: {str(e)}")
+        finally:
+            # Stubs still being expanded when a budget ran out finish in the background, unused
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if stubs or running:
+            complete = False
+            logger.info(f"Comment tree of {submission_id} cut at {len(comments)} comments "
+                        f"({len(stubs) + len(running)} stubs left)")
+        cut.extend(more for _, more in stubs)
+        cut.extend(running.values())
+        cut_below = {more.parent_id[3:] for more in cut if (more.parent_id or '').startswith('t1_')}
+        if not complete and cached is not None:
+            # Cuts below stubs not expanded again this time are still there
+            cut_below.update(cached.get('cut_below', []))
+        return {
+            'num_comments': num_comments,
+            'fetched_at': time.time(),
+            'max_depth': max_depth,
+            'complete': complete,
+            # Comments with replies left unexpanded (top-level stubs are always in the first page)
+            'cut_below': sorted(cut_below),
+            'requests': requests,
+            'comments': [comment.to_dict() for comment in comments.values()]
+        }
+    
+    @log_execution_time
+    def get_comment_tree(self, submission_id: str, max_depth: Optional[int] = None,
+                         max_comments: Optional[int] = None, time_budget: Optional[float] = None) -> List[RedditComment]:
+        """
+        Get the comments of a post, flattened and ranked by score.
+        
+        The thread is fetched best comments first, then its 'load more
+        comments' stubs are expanded concurrently within the shared Reddit
+        rate limit, until the depth, comment count or time budget runs out.
+        Trees are cached by post; after settings.REDDIT_COMMENTS_REVALIDATE_AFTER
+        seconds, a cached tree is revalidated with one request and only the
+        comments it is missing are fetched.
+        
+        Args:
+            submission_id: ID of the post (or its URL)
+            max_depth: Number of reply levels kept (1: top-level comments only)
+            max_comments: Maximum number of comments
+            time_budget: Seconds spent expanding stubs (capped by the current request's deadline)
+            
+        Returns:
+            List of comments, highest score first
+        """
+        max_depth = settings.REDDIT_COMMENTS_MAX_DEPTH if max_depth is None else max_depth
+        max_comments = settings.REDDIT_COMMENTS_MAX_NODES if max_comments is None else max_comments
+        time_budget = settings.REDDIT_COMMENTS_TIME_BUDGET if time_budget is None else time_budget
+        submission_id = extract_submission_id(submission_id) or submission_id
+        try:
+            cached = reddit_cache.get('comments', submission_id)
+            if (cached is not None and cached['max_depth'] >= max_depth
+                    and (cached['complete'] or len(cached['comments']) >= max_comments)
+                    and time.time() - cached['fetched_at'] < settings.REDDIT_COMMENTS_REVALIDATE_AFTER):
+                return _rank_comments((RedditComment.from_dict(row) for row in cached['comments']),
+                                      max_depth, max_comments)
+            
+            tree = self._fetch_comment_tree(submission_id, max_depth, max_comments, time_budget, cached)
+            reddit_cache.set('comments', submission_id, tree, cost=tree['requests'])
+            return _rank_comments((RedditComment.from_dict(row) for row in tree['comments']),
+                                  max_depth, max_comments)
+        except Exception as e:
+            raise Exception(f"Failed to get comment tree: {str(e)}")
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def _fetch_about(self, subreddit: str) -> Dict[str, Any]:
+        """Fetch the 'about' data of a subreddit from the API."""
+        subreddit_instance = self.reddit.subreddit(subreddit)
+        about = {
+            'name': subreddit_instance.display_name,
+            'description': subreddit_instance.description,
+            'subscribers': subreddit_instance.subscribers,
+            'created_utc': subreddit_instance.created_utc
+        }
+        get_data_store().save_subreddit(subreddit, about=about)
+        return about
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def _fetch_rules(self, subreddit: str) -> List[Dict[str, str]]:
+        """Fetch the rules of a subreddit from the API."""
+        rules = [
+            {'short_name': rule.short_name, 'description': rule.description}
+            for rule in self.reddit.subreddit(subreddit).rules
+        ]
+        get_data_store().save_subreddit(subreddit, rules=rules)
+        return rules
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def _fetch_listing(self, subreddit: str, sort: str, limit: int) -> List[RedditPost]:
+        """Fetch a 'hot' or 'new' listing of a subreddit (or 'a+b' multireddit) from the API."""
+        listing = getattr(self.reddit.subreddit(subreddit), sort)
+        limiter = get_rate_limiter('reddit', 30, 60)
+        posts = []
+        for index, post in enumerate(listing(limit=limit)):
+            # praw fetches listings in pages of 100; every extra page is one more API call
+            if index and index % 100 == 0:
+                limiter.acquire()
+            posts.append(RedditPost.from_api(post))
+        get_data_store().save_reddit_posts(posts)
+        return posts
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    def _fetch_about_batch(self, subreddits: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch the 'about' data of up to 100 subreddits in a single API call."""
+        about = {}
+        for subreddit_instance in self.reddit.info(subreddits=subreddits):
+            about[subreddit_instance.display_name.lower()] = {
+                'name': subreddit_instance.display_name,
+                'description': subreddit_instance.description,
+                'subscribers': subreddit_instance.subscribers,
+                'created_utc': subreddit_instance.created_utc
+            }
+        store = get_data_store()
+        for name, info in about.items():
+            store.save_subreddit(name, about=info)
+        return about
+    
     @log_execution_time
     def get_subreddit_info(self, subreddit: str) -> Dict[str, Any]:
         """
@@ -59,42 +458,276 @@ class RedditService:
             Dict containing subreddit information
         """
         try:
-            subreddit_instance = self.reddit.subreddit(subreddit)
+            profile = self.get_subreddit_profile(subreddit)
             return {
-                'name': subreddit_instance.display_name,
-                'description': subreddit_instance.description,
-                'subscribers': subreddit_instance.subscribers,
-                'created_utc': subreddit_instance.created_utc,
-                'rules': [rule.short_name for rule in subreddit_instance.rules]
+                'name': profile.name,
+                'description': profile.description,
+                'subscribers': profile.subscribers,
+                'created_utc': profile.created_utc,
+                'rules': [short_name for short_name, _ in profile.rules]
             }
         except Exception as e:
             raise Exception(f"Failed to get subreddit info: {str(e)}")
     
-    @rate_limit(calls=30, period=60)
+    def get_subreddit_rules(self, subreddit: str) -> List[Dict[str, str]]:
+        """
+        Get the rules of a subreddit.
+        
+        Args:
+            subreddit: Name of the subreddit
+            
+        Returns:
+            List of rules with their short name and description
+        """
+        return reddit_cache.get_or_fetch('rules', subreddit, lambda: self._fetch_rules(subreddit))
+    
+    def get_listing(self, subreddit: str, sort: str = 'hot', limit: int = 10) -> List[RedditPost]:
+        """
+        Get the 'hot' or 'new' posts of a subreddit.
+        
+        Args:
+            subreddit: Name of the subreddit
+            sort: Listing to fetch ('hot' or 'new')
+            limit: Maximum number of posts
+            
+        Returns:
+            List of posts
+        """
+        if sort not in ('hot', 'new'):
+            raise ValueError(f"Unsupported listing: {sort}")
+        rows = reddit_cache.get_or_fetch(
+            sort,
+            f"{subreddit}:{limit}",
+            lambda: [post.to_dict() for post in self._fetch_listing(subreddit, sort, limit)],
+            cost=max(1, -(-limit // 100))  # praw pages listings by 100 items
+        )
+        posts = [RedditPost.from_dict(row) for row in rows]
+        # Cached listings count too: each post is counted once per run
+        observe_posts(posts)
+        return posts
+    
+    def get_subreddit_profile(self, subreddit: str) -> SubredditProfile:
+        """
+        Get the 'about' data and rules of a subreddit as one record.
+        
+        Args:
+            subreddit: Name of the subreddit
+            
+        Returns:
+            Subreddit profile
+        """
+        about = reddit_cache.get_or_fetch('about', subreddit, lambda: self._fetch_about(subreddit))
+        return SubredditProfile.from_parts(about, self.get_subreddit_rules(subreddit))
+    
     @log_execution_time
-    def search_posts(self, subreddit: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_subreddits_batch(self, subreddits: List[str], posts_per_subreddit: int = 10,
+                             include_rules: bool = True) -> List[Dict[str, Any]]:
         """
-        Search for posts in a subreddit.
+        Get the 'about' data, rules and hot posts of many subreddits at once.
+        
+        Hot posts come from combined 'sub1+sub2+...' listings and 'about' data
+        from batched info lookups, so a few API calls cover dozens of
+        subreddits. Rules have no batch endpoint and are fetched concurrently,
+        within the shared Reddit rate limit. Everything goes through the cache.
+        
+        Args:
+            subreddits: Names of the subreddits
+            posts_per_subreddit: Number of hot posts to keep per subreddit
+            include_rules: Whether to fetch the rules of each subreddit
+            
+        Returns:
+            List of dicts with 'name', 'about', 'rules' and 'hot_posts' keys,
+            in the order of the input names
+        """
+        names = list(dict.fromkeys(name.strip() for name in subreddits if name and name.strip()))
+        
+        about = {}
+        missing = []
+        for name in names:
+            cached = reddit_cache.get('about', name)
+            if cached is not None:
+                about[name.lower()] = cached
+            else:
+                missing.append(name)
+        for start in range(0, len(missing), INFO_CHUNK_SIZE):
+            fetched = self._fetch_about_batch(missing[start:start + INFO_CHUNK_SIZE])
+            for name, info in fetched.items():
+                reddit_cache.set('about', name, info)
+            about.update(fetched)
+        
+        # Same cache entries as get_listing(name, 'hot', posts_per_subreddit)
+        hot_posts = {}
+        missing = []
+        for name in names:
+            cached = reddit_cache.get('hot', f"{name}:{posts_per_subreddit}")
+            if cached is not None:
+                hot_posts[name.lower()] = [RedditPost.from_dict(row) for row in cached]
+            else:
+                missing.append(name)
+        for start in range(0, len(missing), MULTIREDDIT_CHUNK_SIZE):
+            chunk = missing[start:start + MULTIREDDIT_CHUNK_SIZE]
+            limit = posts_per_subreddit * len(chunk)
+            grouped = {name.lower(): [] for name in chunk}
+            for post in self._fetch_listing('+'.join(chunk), 'hot', limit):
+                posts = grouped.get(post['subreddit'].lower())
+                if posts is not None and len(posts) < posts_per_subreddit:
+                    posts.append(post)
+            for name in chunk:
+                # Large subreddits dominate combined listings: top up every short one from its own
+                # listing, so a partial list is neither returned nor cached as the subreddit's hot posts
+                if len(grouped[name.lower()]) < posts_per_subreddit and name.lower() in about:
+                    grouped[name.lower()] = self.get_listing(name, 'hot', limit=posts_per_subreddit)
+                else:
+                    reddit_cache.set('hot', f"{name}:{posts_per_subreddit}",
+                                     [post.to_dict() for post in grouped[name.lower()]])
+            hot_posts.update(grouped)
+        
+        rules = {}
+        if include_rules:
+            existing = [name for name in names if name.lower() in about]
+            with ThreadPoolExecutor(max_workers=settings.REDDIT_MAX_WORKERS) as executor:
+                for name, subreddit_rules in zip(existing, executor.map(in_current_context(self._rules_or_empty), existing)):
+                    rules[name.lower()] = subreddit_rules
+        
+        observe_posts(post for posts in hot_posts.values() for post in posts)
+        return [{
+            'name': name,
+            'about': about.get(name.lower()),
+            'rules': rules.get(name.lower(), []),
+            'hot_posts': hot_posts.get(name.lower(), [])
+        } for name in names]
+    
+    def _rules_or_empty(self, subreddit: str) -> List[Dict[str, str]]:
+        """Get the rules of a subreddit, or an empty list if they are not accessible."""
+        try:
+            return self.get_subreddit_rules(subreddit)
+        except Exception:
+            return []
+    
+    def invalidate_subreddit(self, subreddit: str) -> None:
+        """
+        Drop every cached entry of a subreddit.
         
         Args:
             subreddit: Name of the subreddit
+        """
+        reddit_cache.invalidate('about', subreddit)
+        reddit_cache.invalidate('rules', subreddit)
+        for sort in ('hot', 'new'):
+            reddit_cache.invalidate(sort, prefix=f"{subreddit}:")
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get the Reddit cache statistics, including the API calls it saved.
+        
+        Returns:
+            Dict containing cache statistics
+        """
+        return reddit_cache.stats()
+    
+    @rate_limit(calls=30, period=60, key='reddit')
+    @log_execution_time
+    def search_posts(self, subreddit: str, query: str, limit: int = 10, sort: str = 'relevance') -> List[RedditPost]:
+        """
+        Search for posts in a subreddit.
+        
+        Args:
+            subreddit: Name of the subreddit ('all' to search every subreddit)
             query: Search query
             limit: Maximum number of results
+            sort: Result order ('relevance', 'hot', 'top', 'new' or 'comments')
             
         Returns:
-            List of post information dictionaries
+            List of posts
         """
         try:
             subreddit_instance = self.reddit.subreddit(subreddit)
+            limiter = get_rate_limiter('reddit', 30, 60)
             posts = []
-            for post in subreddit_instance.search(query, limit=limit):
-                posts.append({
-                    'id': post.id,
-                    'title': post.title,
-                    'url': post.url,
-                    'score': post.score,
-                    'created_utc': post.created_utc
-                })
+            for index, post in enumerate(subreddit_instance.search(query, sort=sort, limit=limit)):
+                # Every extra page of 100 results is one more API call
+                if index and index % 100 == 0:
+                    limiter.acquire()
+                posts.append(RedditPost.from_api(post))
+            get_data_store().save_reddit_posts(posts, query=query)
+            observe_posts(posts)
             return posts
         except Exception as e:
-            raise Exception(f"Failed to search posts: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to search posts: {str(e)}")
+
+class AsyncRedditService:
+    """
+    Asynchronous variant of RedditService.
+    
+    praw is synchronous, so each call runs in the blocking-call pool; the
+    cache, rate limits and data store are the ones RedditService uses.
+    """
+    
+    def __init__(self, service: Optional[RedditService] = None):
+        """
+        Initialize the async Reddit service.
+        
+        Args:
+            service: Synchronous service to delegate to (one is created if omitted)
+        """
+        self.service = service or RedditService()
+    
+    async def create_post(self, subreddit: str, title: str, content: str, url: Optional[str] = None) -> Dict[str, Any]:
+        """Async RedditService.create_post."""
+        return await run_blocking(self.service.create_post, subreddit, title, content, url=url)
+    
+    async def create_comment(self, text: str, post_url: Optional[str] = None,
+                             parent_comment_id: Optional[str] = None) -> Dict[str, Any]:
+        """Async RedditService.create_comment."""
+        return await run_blocking(self.service.create_comment, text, post_url=post_url,
+                                  parent_comment_id=parent_comment_id)
+    
+    async def get_inbox(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Async RedditService.get_inbox."""
+        return await run_blocking(self.service.get_inbox, limit)
+    
+    async def get_new_comments(self, subreddits: List[str], limit: int = 100,
+                               after_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Async RedditService.get_new_comments."""
+        return await run_blocking(self.service.get_new_comments, subreddits, limit, after_id)
+    
+    async def get_comment_tree(self, submission_id: str, max_depth: Optional[int] = None,
+                               max_comments: Optional[int] = None,
+                               time_budget: Optional[float] = None) -> List[RedditComment]:
+        """Async RedditService.get_comment_tree."""
+        return await run_blocking(self.service.get_comment_tree, submission_id, max_depth=max_depth,
+                                  max_comments=max_comments, time_budget=time_budget)
+    
+    async def get_subreddit_info(self, subreddit: str) -> Dict[str, Any]:
+        """Async RedditService.get_subreddit_info."""
+        return await run_blocking(self.service.get_subreddit_info, subreddit)
+    
+    async def get_subreddit_rules(self, subreddit: str) -> List[Dict[str, str]]:
+        """Async RedditService.get_subreddit_rules."""
+        return await run_blocking(self.service.get_subreddit_rules, subreddit)
+    
+    async def get_listing(self, subreddit: str, sort: str = 'hot', limit: int = 10) -> List[RedditPost]:
+        """Async RedditService.get_listing."""
+        return await run_blocking(self.service.get_listing, subreddit, sort, limit)
+    
+    async def get_subreddit_profile(self, subreddit: str) -> SubredditProfile:
+        """Async RedditService.get_subreddit_profile."""
+        return await run_blocking(self.service.get_subreddit_profile, subreddit)
+    
+    async def get_subreddits_batch(self, subreddits: List[str], posts_per_subreddit: int = 10,
+                                   include_rules: bool = True) -> List[Dict[str, Any]]:
+        """Async RedditService.get_subreddits_batch."""
+        return await run_blocking(self.service.get_subreddits_batch, subreddits, posts_per_subreddit, include_rules)
+    
+    async def search_posts(self, subreddit: str, query: str, limit: int = 10,
+                           sort: str = 'relevance') -> List[RedditPost]:
+        """Async RedditService.search_posts."""
+        return await run_blocking(self.service.search_posts, subreddit, query, limit, sort)
+    
+    def invalidate_subreddit(self, subreddit: str) -> None:
+        """Forget the cached data of a subreddit (no API call)."""
+        self.service.invalidate_subreddit(subreddit)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get the Reddit cache statistics (no API call)."""
+        return self.service.cache_stats()
@@ -0,0 +1,647 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.config.settings import settings
+from src.models.records import _epoch
+from src.utils.fingerprint import content_fingerprint
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    platform TEXT NOT NULL,
+    id TEXT NOT NULL,
+    author TEXT,
+    subreddit TEXT,
+    title TEXT,
+    text TEXT,
+    url TEXT,
+    score INTEGER,
+    num_comments INTEGER,
+    shares INTEGER,
+    is_self INTEGER,
+    created_utc REAL,
+    query TEXT,
+    metrics TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (platform, id)
+);
+CREATE INDEX IF NOT EXISTS idx_posts_platform_created ON posts (platform, created_utc);
+CREATE INDEX IF NOT EXISTS idx_posts_author ON posts (author);
+CREATE INDEX IF NOT EXISTS idx_posts_subreddit_created ON posts (subreddit, created_utc);
+CREATE INDEX IF NOT EXISTS idx_posts_url ON posts (url);
+CREATE INDEX IF NOT EXISTS idx_posts_query ON posts (query);
+
+CREATE TABLE IF NOT EXISTS subreddits (
+    name TEXT PRIMARY KEY,
+    display_name TEXT,
+    description TEXT,
+    subscribers INTEGER,
+    created_utc REAL,
+    rules TEXT,
+    fetched_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS twitter_users (
+    id TEXT PRIMARY KEY,
+    username TEXT,
+    name TEXT,
+    description TEXT,
+    verified INTEGER,
+    followers_count INTEGER,
+    following_count INTEGER,
+    tweet_count INTEGER,
+    listed_count INTEGER,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_twitter_users_username ON twitter_users (username);
+
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    status_code INTEGER,
+    title TEXT,
+    description TEXT,
+    content TEXT,
+    fingerprint TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_fetched ON pages (fetched_at);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    kind TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    url TEXT,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (kind, fingerprint)
+);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    url TEXT,
+    status TEXT,
+    result TEXT,
+    error TEXT,
+    started_at REAL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started_at);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_id TEXT PRIMARY KEY,
+    url TEXT,
+    steps INTEGER,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS engagement_events (
+    platform TEXT NOT NULL,
+    id TEXT NOT NULL,
+    kind TEXT,
+    author TEXT,
+    text TEXT,
+    url TEXT,
+    target_id TEXT,
+    created_utc REAL,
+    handled INTEGER NOT NULL DEFAULT 0,
+    received_at REAL NOT NULL,
+    PRIMARY KEY (platform, id)
+);
+CREATE INDEX IF NOT EXISTS idx_engagement_events_handled ON engagement_events (handled, received_at);
+"""
+
+TABLES = ('posts', 'subreddits', 'twitter_users', 'pages', 'runs', 'analyses')
+
+# Columns added after a table was first released: (table, column, type)
+MIGRATIONS = (
+    ('pages', 'fingerprint', 'TEXT'),
+)
+
+class DataStore:
+    """
+    Local SQLite store for every tweet, Reddit post, subreddit, Twitter user
+    and web page fetched by the services.
+
+    Writes never raise: the store is a write-through side effect of
+    fetching and must not break the fetch that feeds it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            path: Path of the SQLite file (':memory:' for a transient store)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        for table, column, column_type in MIGRATIONS:
+            columns = {row['name'] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _write(self, sql: str, rows: Iterable[tuple]) -> int:
+        try:
+            # Rows are built lazily so malformed records are caught here too
+            rows = list(rows)
+            if not rows:
+                return 0
+            with self._lock:
+                self._conn.executemany(sql, rows)
+                self._conn.commit()
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Failed to write to data store: {str(e)}")
+            return 0
+
+    def _read(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, tuple(params)).fetchall()]
+
+    def save_reddit_posts(self, posts: Iterable[Dict[str, Any]], query: Optional[str] = None) -> int:
+        """
+        Upsert Reddit posts.
+
+        Args:
+            posts: Post dicts as returned by RedditService
+            query: Search query that returned the posts, if any
+
+        Returns:
+            Number of rows written
+        """
+        now = time.time()
+        rows = ((
+            'reddit', str(p['id']), p.get('author'), p.get('subreddit'), p.get('title'), p.get('selftext'),
+            p.get('url'), p.get('score'), p.get('num_comments'), None,
+            None if p.get('is_self') is None else int(p['is_self']),
+            _epoch(p.get('created_utc')), query, None, now
+        ) for p in posts)
+        return self._write(
+            """
+            INSERT INTO posts (platform, id, author, subreddit, title, text, url, score, num_comments,
+                               shares, is_self, created_utc, query, metrics, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (platform, id) DO UPDATE SET
+                author = COALESCE(excluded.author, author),
+                subreddit = COALESCE(excluded.subreddit, subreddit),
+                title = excluded.title,
+                text = COALESCE(excluded.text, text),
+                url = COALESCE(excluded.url, url),
+                score = excluded.score,
+                num_comments = COALESCE(excluded.num_comments, num_comments),
+                is_self = COALESCE(excluded.is_self, is_self),
+                created_utc = excluded.created_utc,
+                query = COALESCE(excluded.query, query),
+                fetched_at = excluded.fetched_at
+            """,
+            rows
+        )
+
+    def save_tweets(self, tweets: Iterable[Dict[str, Any]], query: Optional[str] = None) -> int:
+        """
+        Upsert tweets.
+
+        Args:
+            tweets: Tweet dicts as returned by TwitterService
+            query: Search query that returned the tweets, if any
+
+        Returns:
+            Number of rows written
+        """
+        now = time.time()
+        rows = ((
+            'twitter', str(t['id']), None if t.get('author_id') is None else str(t['author_id']),
+            None, None, t.get('text'), t.get('url'), metrics.get('like_count'), metrics.get('reply_count'),
+            metrics.get('retweet_count'), None, _epoch(t.get('created_at')), query,
+            json.dumps(metrics) if metrics else None, now
+        ) for t in tweets for metrics in [t.get('metrics') or {}])
+        return self._write(
+            """
+            INSERT INTO posts (platform, id, author, subreddit, title, text, url, score, num_comments,
+                               shares, is_self, created_utc, query, metrics, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (platform, id) DO UPDATE SET
+                author = COALESCE(excluded.author, author),
+                text = excluded.text,
+                url = COALESCE(excluded.url, url),
+                score = COALESCE(excluded.score, score),
+                num_comments = COALESCE(excluded.num_comments, num_comments),
+                shares = COALESCE(excluded.shares, shares),
+                created_utc = COALESCE(excluded.created_utc, created_utc),
+                query = COALESCE(excluded.query, query),
+                metrics = COALESCE(excluded.metrics, metrics),
+                fetched_at = excluded.fetched_at
+            """,
+            rows
+        )
+
+    def save_subreddit(self, name: str, about: Optional[Dict[str, Any]] = None,
+                       rules: Optional[List[Dict[str, str]]] = None) -> int:
+        """
+        Upsert a subreddit profile; missing parts keep their stored value.
+
+        Args:
+            name: Name of the subreddit
+            about: 'about' data as returned by RedditService
+            rules: Rules as returned by RedditService
+
+        Returns:
+            Number of rows written
+        """
+        about = about or {}
+        return self._write(
+            """
+            INSERT INTO subreddits (name, display_name, description, subscribers, created_utc, rules, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                display_name = COALESCE(excluded.display_name, display_name),
+                description = COALESCE(excluded.description, description),
+                subscribers = COALESCE(excluded.subscribers, subscribers),
+                created_utc = COALESCE(excluded.created_utc, created_utc),
+                rules = COALESCE(excluded.rules, rules),
+                fetched_at = excluded.fetched_at
+            """,
+            [(
+                name.lower(), about.get('name'), about.get('description'), about.get('subscribers'),
+                _epoch(about.get('created_utc')), None if rules is None else json.dumps(rules), time.time()
+            )]
+        )
+
+    def save_twitter_users(self, users: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upsert Twitter users.
+
+        Args:
+            users: User dicts as returned by TwitterService
+
+        Returns:
+            Number of rows written
+        """
+        now = time.time()
+        rows = ((
+            str(u['id']), u.get('username'), u.get('name'), u.get('description'),
+            None if u.get('verified') is None else int(u['verified']), u.get('followers_count'),
+            u.get('following_count'), u.get('tweet_count'), u.get('listed_count'), now
+        ) for u in users)
+        return self._write(
+            """
+            INSERT OR REPLACE INTO twitter_users (id, username, name, description, verified, followers_count,
+                                                  following_count, tweet_count, listed_count, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows
+        )
+
+    def save_page(self, url: str, content: str, status_code: Optional[int] = None,
+                  title: Optional[str] = None, description: Optional[str] = None,
+                  fingerprint: Optional[str] = None) -> int:
+        """
+        Upsert a scraped web page along with the fingerprint of its content.
+
+        Args:
+            url: Page URL
+            content: Extracted text content
+            status_code: HTTP status code
+            title: Page title
+            description: Meta description
+            fingerprint: Fingerprint of the page (defaults to the fingerprint of its content)
+
+        Returns:
+            Number of rows written
+        """
+        if fingerprint is None:
+            fingerprint = content_fingerprint(content)
+        return self._write(
+            """
+            INSERT INTO pages (url, status_code, title, description, content, fingerprint, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                status_code = COALESCE(excluded.status_code, status_code),
+                title = COALESCE(excluded.title, title),
+                description = COALESCE(excluded.description, description),
+                content = excluded.content,
+                fingerprint = excluded.fingerprint,
+                fetched_at = excluded.fetched_at
+            """,
+            [(url, status_code, title, description, content, fingerprint, time.time())]
+        )
+
+    def save_analysis(self, kind: str, fingerprint: str, content: str, url: Optional[str] = None) -> int:
+        """
+        Store a generated analysis under the fingerprint of its input.
+
+        Args:
+            kind: Kind of analysis, e.g. 'description' or 'profile'
+            fingerprint: Fingerprint of the content the analysis was generated from
+            content: Generated analysis
+            url: Page the analysis is about, if any
+
+        Returns:
+            Number of rows written
+        """
+        return self._write(
+            """
+            INSERT OR REPLACE INTO analyses (kind, fingerprint, url, content, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [(kind, fingerprint, url, content, time.time())]
+        )
+
+    def get_analysis(self, kind: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an analysis previously generated from the same input.
+
+        Args:
+            kind: Kind of analysis
+            fingerprint: Fingerprint of the input content
+
+        Returns:
+            Analysis dict, or None if the input was never analyzed
+        """
+        rows = self._read("SELECT * FROM analyses WHERE kind = ? AND fingerprint = ?", (kind, fingerprint))
+        return rows[0] if rows else None
+
+    def save_run(self, run_id: str, url: str, status: str, result: Any = None, error: Optional[str] = None,
+                 started_at: Optional[Any] = None) -> int:
+        """
+        Upsert the outcome of an analysis run.
+
+        Args:
+            run_id: Unique ID of the run
+            url: Analyzed URL
+            status: 'success', 'partial' (out of time), 'cancelled' or 'error'
+            result: Result of the run (stored as JSON)
+            error: Error message of a failed run
+            started_at: Start time of the run
+
+        Returns:
+            Number of rows written
+        """
+        return self._write(
+            """
+            INSERT OR REPLACE INTO runs (id, url, status, result, error, started_at, finished_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(run_id, url, status, None if result is None else json.dumps(result, default=str), error,
+              _epoch(started_at), time.time())]
+        )
+
+    def save_checkpoint(self, run_id: str, url: str, state: Dict[str, Any], steps: int = 0) -> int:
+        """
+        Upsert the checkpoint of a running analysis.
+
+        Args:
+            run_id: Unique ID of the run
+            url: Analyzed URL
+            state: Agent memory and pinned facts (stored as JSON)
+            steps: Number of completed steps
+
+        Returns:
+            Number of rows written
+        """
+        return self._write(
+            """
+            INSERT OR REPLACE INTO checkpoints (run_id, url, steps, state, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [(run_id, url, steps, json.dumps(state, default=str), time.time())]
+        )
+
+    def get_checkpoint(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the last checkpoint of a run.
+
+        Args:
+            run_id: Unique ID of the run
+
+        Returns:
+            Checkpoint dict with decoded state, or None if the run has none
+        """
+        rows = self._read("SELECT * FROM checkpoints WHERE run_id = ?", (run_id,))
+        if not rows:
+            return None
+        row = rows[0]
+        row['state'] = json.loads(row['state'])
+        return row
+
+    def delete_checkpoint(self, run_id: str) -> int:
+        """Delete the checkpoint of a run once it is no longer needed."""
+        return self._write("DELETE FROM checkpoints WHERE run_id = ?", [(run_id,)])
+
+    def save_engagement_events(self, events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Save comments, replies and mentions seen by the engagement monitor.
+
+        Args:
+            events: Event dicts (platform, id, kind, author, text, url, target_id, created_utc)
+
+        Returns:
+            The events not seen before
+        """
+        new = []
+        try:
+            with self._lock:
+                for event in events:
+                    cursor = self._conn.execute(
+                        """
+                        INSERT OR IGNORE INTO engagement_events
+                            (platform, id, kind, author, text, url, target_id, created_utc, received_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (event['platform'], str(event['id']), event.get('kind'), event.get('author'),
+                         event.get('text'), event.get('url'), event.get('target_id'),
+                         _epoch(event.get('created_utc')), time.time())
+                    )
+                    if cursor.rowcount:
+                        new.append(event)
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Failed to write to data store: {str(e)}")
+            with self._lock:
+                self._conn.rollback()
+            return []
+        return new
+
+    def mark_event_handled(self, platform: str, event_id: str) -> int:
+        """Mark an engagement event handled."""
+        return self._write("UPDATE engagement_events SET handled = 1 WHERE platform = ? AND id = ?",
+                           [(platform, str(event_id))])
+
+    def get_unhandled_events(self, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Engagement events not handled yet, oldest first."""
+        return self._read(
+            "SELECT * FROM engagement_events WHERE handled = 0 ORDER BY received_at LIMIT ?", (limit,)
+        )
+
+    def iter_batches(
+        self,
+        table: str,
+        time_column: str,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        where: Optional[Dict[str, Any]] = None,
+        batch_size: int = 10000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream the raw rows of a table in batches, in insertion order.
+
+        Batches are read by rowid ranges so the lock is only held per batch
+        and the table is never loaded whole.
+
+        Args:
+            table: 'posts', 'runs', 'subreddits', 'twitter_users' or 'pages'
+            time_column: Column filtered by since/until
+            since: Only rows at or after this time
+            until: Only rows before this time
+            where: Extra column equality filters
+            batch_size: Rows per batch
+
+        Yields:
+            Lists of row dicts
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        clauses, params = [], []
+        for column, value in (where or {}).items():
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        if since is not None:
+            clauses.append(f"{time_column} >= ?")
+            params.append(_epoch(since))
+        if until is not None:
+            clauses.append(f"{time_column} < ?")
+            params.append(_epoch(until))
+        filters = "".join(f" AND {clause}" for clause in clauses)
+        sql = f"SELECT rowid AS _rowid, * FROM {table} WHERE rowid > ?{filters} ORDER BY rowid LIMIT ?"
+
+        last_rowid = 0
+        while True:
+            rows = self._read(sql, [last_rowid, *params, batch_size])
+            if not rows:
+                return
+            last_rowid = rows[-1]['_rowid']
+            for row in rows:
+                del row['_rowid']
+            yield rows
+            if len(rows) < batch_size:
+                return
+
+    def query_posts(
+        self,
+        platform: Optional[str] = None,
+        author: Optional[str] = None,
+        subreddit: Optional[str] = None,
+        query: Optional[str] = None,
+        since: Optional[Any] = None,
+        until: Optional[Any] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query stored posts and tweets, newest first.
+
+        Rows are shaped like the service dicts (tweets carry 'metrics' and
+        'created_at', Reddit posts 'created_utc') so analytics can load them
+        directly.
+
+        Args:
+            platform: 'reddit' or 'twitter'
+            author: Author name (Reddit) or author ID (Twitter)
+            subreddit: Name of the subreddit
+            query: Search query that returned the items
+            since: Only items created at or after this time
+            until: Only items created before this time
+            limit: Maximum number of rows
+
+        Returns:
+            List of post and tweet dicts
+        """
+        clauses, params = [], []
+        for column, value in (('platform', platform), ('author', author), ('query', query)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if subreddit is not None:
+            clauses.append("subreddit = ? COLLATE NOCASE")
+            params.append(subreddit)
+        if since is not None:
+            clauses.append("created_utc >= ?")
+            params.append(_epoch(since))
+        if until is not None:
+            clauses.append("created_utc < ?")
+            params.append(_epoch(until))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT * FROM posts{where} ORDER BY created_utc DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = []
+        for row in self._read(sql, params):
+            if row['platform'] == 'twitter':
+                row['author_id'] = row['author']
+                row['created_at'] = row['created_utc']
+                row['metrics'] = json.loads(row['metrics']) if row['metrics'] else {}
+            else:
+                row['selftext'] = row['text']
+                row['is_self'] = None if row['is_self'] is None else bool(row['is_self'])
+            rows.append(row)
+        return rows
+
+    def get_subreddit(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored subreddit profile.
+
+        Args:
+            name: Name of the subreddit
+
+        Returns:
+            Subreddit dict with decoded rules, or None if never fetched
+        """
+        rows = self._read("SELECT * FROM subreddits WHERE name = ?", (name.lower(),))
+        if not rows:
+            return None
+        row = rows[0]
+        row['rules'] = json.loads(row['rules']) if row['rules'] else []
+        return row
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored web page.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Page dict, or None if never fetched
+        """
+        rows = self._read("SELECT * FROM pages WHERE url = ?", (url,))
+        return rows[0] if rows else None
+
+_data_store: Optional[DataStore] = None
+_data_store_lock = threading.Lock()
+
+def get_data_store() -> DataStore:
+    """Return the data store shared by every service."""
+    global _data_store
+    with _data_store_lock:
+        if _data_store is None:
+            _data_store = DataStore(settings.data_path('insocia.db'))
+        return _data_store
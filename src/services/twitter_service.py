@@ -1,8 +1,92 @@
+import asyncio
+import logging
 import tweepy
-from typing import Optional, List, Dict, Any
+from tweepy.asynchronous import AsyncClient
+from typing import Optional, List, Dict, Any, AsyncIterator, Iterator, Tuple
+from src.analytics.trends import observe_tweets
 from src.config.settings import settings
+from src.models.records import Tweet
+from src.services.storage_service import get_data_store
+from src.utils.aio import gather_bounded, run_blocking
+from src.utils.cache import TieredCache
+from src.utils.cancellation import check_cancelled
+from src.utils.circuit_breaker import CircuitBreakerSession, get_circuit_breaker
+from src.utils.deadline import call_timeout
 from src.utils.decorators import rate_limit, log_execution_time
 
+logger = logging.getLogger(__name__)
+
+TWEET_FIELDS = ['created_at', 'public_metrics', 'author_id', 'conversation_id']
+USER_FIELDS = ['description', 'public_metrics', 'verified']
+# The users lookup endpoint accepts up to 100 usernames or IDs per request
+USER_LOOKUP_BATCH_SIZE = 100
+
+# Persistent per-user/per-query state. 'since_id' entries never expire: they
+# are the watermark that lets later fetches request only newer tweets.
+twitter_cache = TieredCache(
+    settings.data_path('twitter_cache.db'),
+    ttls={'since_id': None, 'user': settings.TWITTER_USER_CACHE_TTL}
+)
+
+def _page_params(page_size: range, remaining: Optional[int], since_id: Optional[str],
+                 pagination_token: Optional[str]) -> Dict[str, Any]:
+    """Request parameters of the next page of a paginated walk (remaining None: no cap)."""
+    max_results = page_size.stop - 1 if remaining is None else min(max(page_size.start, remaining), page_size.stop - 1)
+    params: Dict[str, Any] = {'max_results': max_results}
+    if since_id:
+        params['since_id'] = since_id
+    if pagination_token:
+        params['pagination_token'] = pagination_token
+    return params
+
+def _store_page(response: Any, query: Optional[str]) -> List[Tweet]:
+    """Convert a page of API tweets to records, save them and feed them to the trend tracker."""
+    page = [Tweet.from_api(tweet) for tweet in response.data or []]
+    get_data_store().save_tweets(page, query=query)
+    observe_tweets(page)
+    return page
+
+def _reset_since_id(user_id: Optional[Any], query: Optional[str]) -> None:
+    if user_id is not None:
+        twitter_cache.invalidate('since_id', f"user:{user_id}")
+    if query is not None:
+        twitter_cache.invalidate('since_id', f"search:{query}")
+
+def _user_to_dict(user: Any) -> Dict[str, Any]:
+    metrics = user.public_metrics or {}
+    return {
+        'id': user.id,
+        'username': user.username,
+        'name': user.name,
+        'description': user.description,
+        'verified': user.verified,
+        'followers_count': metrics.get('followers_count', 0),
+        'following_count': metrics.get('following_count', 0),
+        'tweet_count': metrics.get('tweet_count', 0),
+        'listed_count': metrics.get('listed_count', 0)
+    }
+
+def _cached_users(keys: List[str], lookup_param: str) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Split user keys into users found in the cache and keys to look up."""
+    users = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        cached = twitter_cache.get('user', f"{lookup_param}:{key}")
+        if cached is not None:
+            users[key] = cached
+        else:
+            missing.append(key)
+    return users, missing
+
+def _cache_users(fetched: List[Dict[str, Any]], lookup_param: str, users: Dict[str, Dict[str, Any]]) -> None:
+    """Cache looked-up users and add them to the result."""
+    for user in fetched:
+        # Cache under both keys so later lookups by either hit
+        twitter_cache.set('user', f"usernames:{user['username']}", user)
+        twitter_cache.set('user', f"ids:{user['id']}", user)
+        key = user['username'].lower() if lookup_param == 'usernames' else str(user['id'])
+        users[key] = user
+
 class TwitterService:
     """Service for interacting with Twitter API."""
     
@@ -19,7 +103,7 @@ class TwitterService:
             config['access_token'],
             config['access_token_secret']
         )
-        self.api = tweepy.API(auth)
+        self.api = tweepy.API(auth, timeout=settings.API_TIMEOUT)
         
         # Initialize API v2 client
         self.client = tweepy.Client(
@@ -29,21 +113,26 @@ class TwitterService:
             access_token=config['access_token'],
             access_token_secret=config['access_token_secret']
         )
+        # tweepy sets no timeout on its requests; cap them by the current request's
+        # deadline, and fail fast while Twitter is failing
+        self.api.session = CircuitBreakerSession('twitter', timeout=settings.API_TIMEOUT)
+        self.client.session = CircuitBreakerSession('twitter', timeout=settings.API_TIMEOUT)
     
-    @rate_limit(calls=50, period=900)  # Twitter's rate limit
+    @rate_limit(calls=50, period=900, key='twitter_create')  # Twitter's rate limit
     @log_execution_time
-    def create_tweet(self, text: str) -> Dict[str, Any]:
+    def create_tweet(self, text: str, in_reply_to_tweet_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a new tweet.
         
         Args:
             text: Tweet content
+            in_reply_to_tweet_id: ID of the tweet to reply to (e.g. previous tweet of a thread)
             
         Returns:
             Dict containing tweet information
         """
         try:
-            response = self.client.create_tweet(text=text)
+            response = self.client.create_tweet(text=text, in_reply_to_tweet_id=in_reply_to_tweet_id)
             tweet = response.data
             return {
                 'id': tweet['id'],
@@ -53,9 +142,135 @@ class TwitterService:
         except Exception as e:
             raise Exception(f"Failed to create tweet: {str(e)}")
     
-    @rate_limit(calls=50, period=900)
+    @rate_limit(calls=900, period=900, key='twitter_timeline')  # 900 requests per 15 minutes
+    def _fetch_timeline_page(self, user_id: Any, **params: Any) -> Any:
+        """Fetch one page of a user timeline."""
+        return self.client.get_users_tweets(id=user_id, tweet_fields=TWEET_FIELDS, **params)
+    
+    @rate_limit(calls=180, period=900, key='twitter_search')  # 180 requests per 15 minutes
+    def _fetch_search_page(self, query: str, **params: Any) -> Any:
+        """Fetch one page of recent search results."""
+        return self.client.search_recent_tweets(query=query, tweet_fields=TWEET_FIELDS, **params)
+    
+    @rate_limit(calls=180, period=900, key='twitter_mentions')  # 180 requests per 15 minutes
+    def _fetch_mentions_page(self, user_id: Any, **params: Any) -> Any:
+        """Fetch one page of the tweets mentioning a user."""
+        return self.client.get_users_mentions(id=user_id, tweet_fields=TWEET_FIELDS, **params)
+    
+    def _paginate(self, fetch_page: Any, target: Any, state_key: str, max_tweets: Optional[int],
+                  page_size: range, since_id: Optional[str], incremental: bool,
+                  query: Optional[str] = None) -> Iterator[Tweet]:
+        """
+        Follow pagination_token across pages, newest tweets first, and
+        record the newest tweet ID once the walk is complete. With max_tweets
+        None, pages are followed until the walk is exhausted.
+        """
+        if since_id is None and incremental:
+            since_id = twitter_cache.get('since_id', state_key)
+        
+        newest_id = None
+        pagination_token = None
+        yielded = 0
+        while max_tweets is None or yielded < max_tweets:
+            remaining = None if max_tweets is None else max_tweets - yielded
+            params = _page_params(page_size, remaining, since_id, pagination_token)
+            response = fetch_page(target, **params)
+            meta = response.meta or {}
+            if newest_id is None:
+                newest_id = meta.get('newest_id')
+            
+            page = _store_page(response, query)
+            for tweet in page:
+                yield tweet
+                yielded += 1
+                if max_tweets is not None and yielded >= max_tweets:
+                    break
+            
+            pagination_token = meta.get('next_token')
+            if not pagination_token:
+                break
+        
+        # Tweets beyond the cap are not revisited: the next incremental
+        # fetch starts after the newest tweet seen here.
+        if newest_id and incremental:
+            twitter_cache.set('since_id', state_key, str(newest_id))
+    
+    def iter_user_timeline(self, user_id: Any, max_tweets: int = 100, since_id: Optional[str] = None,
+                           incremental: bool = True) -> Iterator[Tweet]:
+        """
+        Lazily stream the tweets of a user, newest first, across pages.
+        
+        Args:
+            user_id: Twitter user ID
+            max_tweets: Maximum number of tweets to yield
+            since_id: Only yield tweets newer than this ID
+            incremental: Without an explicit since_id, resume after the
+                newest tweet seen by the previous fetch of this user
+            
+        Returns:
+            Iterator of tweets
+        """
+        return self._paginate(self._fetch_timeline_page, user_id, f"user:{user_id}",
+                              max_tweets, range(5, 101), since_id, incremental)
+    
+    def iter_search(self, query: str, max_tweets: int = 100, since_id: Optional[str] = None,
+                    incremental: bool = True) -> Iterator[Tweet]:
+        """
+        Lazily stream recent tweets matching a query, newest first, across pages.
+        
+        Args:
+            query: Search query
+            max_tweets: Maximum number of tweets to yield
+            since_id: Only yield tweets newer than this ID
+            incremental: Without an explicit since_id, resume after the
+                newest tweet seen by the previous fetch of this query
+            
+        Returns:
+            Iterator of tweets
+        """
+        return self._paginate(self._fetch_search_page, query, f"search:{query}",
+                              max_tweets, range(10, 101), since_id, incremental, query=query)
+    
+    def get_own_user_id(self) -> str:
+        """ID of the authenticated account, looked up once."""
+        if getattr(self, '_own_user_id', None) is None:
+            self._own_user_id = str(self.client.get_me().data.id)
+        return self._own_user_id
+    
+    def iter_mentions(self, user_id: Optional[Any] = None, max_tweets: Optional[int] = 100,
+                      since_id: Optional[str] = None, incremental: bool = True) -> Iterator[Tweet]:
+        """
+        Lazily stream the tweets mentioning a user, newest first, across pages.
+        Replies to any of the user's tweets mention the user, so this one
+        endpoint covers the replies to all of them.
+        
+        Args:
+            user_id: Twitter user ID (the authenticated account by default)
+            max_tweets: Maximum number of tweets to yield (None: every mention
+                since the previous fetch, none of them skipped)
+            since_id: Only yield tweets newer than this ID
+            incremental: Without an explicit since_id, resume after the
+                newest mention seen by the previous fetch
+            
+        Returns:
+            Iterator of tweets
+        """
+        user_id = user_id or self.get_own_user_id()
+        return self._paginate(self._fetch_mentions_page, user_id, f"mentions:{user_id}",
+                              max_tweets, range(5, 101), since_id, incremental)
+    
+    def reset_since_id(self, user_id: Optional[Any] = None, query: Optional[str] = None) -> None:
+        """
+        Forget the incremental watermark of a user or query.
+        
+        Args:
+            user_id: Twitter user ID
+            query: Search query
+        """
+        _reset_since_id(user_id, query)
+    
     @log_execution_time
-    def search_tweets(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    def search_tweets(self, query: str, max_results: int = 10) -> List[Tweet]:
         """
         Search for tweets.
         
@@ -64,25 +279,63 @@ class TwitterService:
             max_results: Maximum number of results
             
         Returns:
-            List of tweet information dictionaries
+            List of tweets
         """
         try:
-            tweets = []
-            for tweet in self.client.search_recent_tweets(
-                query=query,
-                max_results=max_results
-            ).data or []:
-                tweets.append({
-                    'id': tweet.id,
-                    'text': tweet.text,
-                    'created_at': tweet.created_at
-                })
-            return tweets
+            return list(self.iter_search(query, max_tweets=max_results, incremental=False))
         except Exception as e:
             raise Exception(f"Failed to search tweets: {str(e)}")
     
-    @rate_limit(calls=50, period=900)
+    @rate_limit(calls=900, period=900, key='twitter_users')  # 900 requests per 15 minutes
+    def _fetch_users(self, **params: Any) -> List[Dict[str, Any]]:
+        """Look up to 100 users in a single request, by usernames or by ids."""
+        response = self.client.get_users(user_fields=USER_FIELDS, **params)
+        users = [_user_to_dict(user) for user in response.data or []]
+        get_data_store().save_twitter_users(users)
+        return users
+    
+    def _resolve_users(self, keys: List[str], lookup_param: str) -> Dict[str, Dict[str, Any]]:
+        """Resolve users from the cache first, then in batches of 100 from the API."""
+        users, missing = _cached_users(keys, lookup_param)
+        for start in range(0, len(missing), USER_LOOKUP_BATCH_SIZE):
+            chunk = missing[start:start + USER_LOOKUP_BATCH_SIZE]
+            _cache_users(self._fetch_users(**{lookup_param: chunk}), lookup_param, users)
+        return users
+    
+    @log_execution_time
+    def get_users(self, usernames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve many usernames, using the local user cache and batched lookups.
+        
+        Args:
+            usernames: Twitter usernames (with or without @)
+            
+        Returns:
+            Dict mapping lowercase usernames to user information; unknown
+            users are left out
+        """
+        try:
+            return self._resolve_users([name.lstrip('@').lower() for name in usernames if name], 'usernames')
+        except Exception as e:
+            raise Exception(f"Failed to look up users: {str(e)}")
+    
     @log_execution_time
+    def get_users_by_ids(self, user_ids: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve many user IDs, using the local user cache and batched lookups.
+        
+        Args:
+            user_ids: Twitter user IDs
+            
+        Returns:
+            Dict mapping user IDs (as strings) to user information; unknown
+            users are left out
+        """
+        try:
+            return self._resolve_users([str(user_id) for user_id in user_ids if user_id], 'ids')
+        except Exception as e:
+            raise Exception(f"Failed to look up users: {str(e)}")
+    
     def get_user_info(self, username: str) -> Dict[str, Any]:
         """
         Get information about a Twitter user.
@@ -93,15 +346,185 @@ class TwitterService:
         Returns:
             Dict containing user information
         """
+        user = self.get_users([username]).get(username.lstrip('@').lower())
+        if user is None:
+            raise Exception(f"Failed to get user info: user @{username} not found")
+        return user
+
+class AsyncTwitterService:
+    """
+    Asynchronous variant of TwitterService, built on tweepy's AsyncClient.
+    
+    Rate limits, incremental since_id watermarks, the user cache and the data
+    store are shared with TwitterService. Every request is bounded by the
+    current request's deadline and goes through the Twitter circuit breaker.
+    """
+    
+    def __init__(self):
+        """Initialize async Twitter service with configuration from settings."""
+        config = settings.get_twitter_config()
+        self.client = AsyncClient(
+            bearer_token=config['bearer_token'],
+            consumer_key=config['api_key'],
+            consumer_secret=config['api_secret'],
+            access_token=config['access_token'],
+            access_token_secret=config['access_token_secret']
+        )
+    
+    async def _call(self, what: str, request: Any, **params: Any) -> Any:
+        """Make an API request through the Twitter circuit breaker, within the current request's deadline."""
+        check_cancelled(what)
+        timeout = call_timeout(settings.API_TIMEOUT, what)
+        breaker = get_circuit_breaker('twitter')
+        breaker.before_call()
         try:
-            user = self.client.get_user(username=username).data
+            response = await asyncio.wait_for(request(**params), timeout)
+        except Exception as e:
+            breaker.record_error(e)
+            raise
+        breaker.record_success()
+        return response
+    
+    @rate_limit(calls=50, period=900, key='twitter_create')
+    @log_execution_time
+    async def create_tweet(self, text: str, in_reply_to_tweet_id: Optional[str] = None) -> Dict[str, Any]:
+        """Async TwitterService.create_tweet."""
+        try:
+            response = await self._call('create tweet', self.client.create_tweet, text=text,
+                                        in_reply_to_tweet_id=in_reply_to_tweet_id)
+            tweet = response.data
             return {
-                'id': user.id,
-                'username': user.username,
-                'name': user.name,
-                'description': user.description,
-                'followers_count': user.public_metrics['followers_count'],
-                'following_count': user.public_metrics['following_count']
+                'id': tweet['id'],
+                'text': tweet['text'],
+                'created_at': tweet.get('created_at')
             }
         except Exception as e:
-            raise Exception(f"Failed to get user info: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to create tweet: {str(e)}")
+    
+    @rate_limit(calls=900, period=900, key='twitter_timeline')
+    async def _fetch_timeline_page(self, user_id: Any, **params: Any) -> Any:
+        """Fetch one page of a user timeline."""
+        return await self._call('timeline page', self.client.get_users_tweets,
+                                id=user_id, tweet_fields=TWEET_FIELDS, **params)
+    
+    @rate_limit(calls=180, period=900, key='twitter_search')
+    async def _fetch_search_page(self, query: str, **params: Any) -> Any:
+        """Fetch one page of recent search results."""
+        return await self._call('search page', self.client.search_recent_tweets,
+                                query=query, tweet_fields=TWEET_FIELDS, **params)
+    
+    @rate_limit(calls=180, period=900, key='twitter_mentions')
+    async def _fetch_mentions_page(self, user_id: Any, **params: Any) -> Any:
+        """Fetch one page of the tweets mentioning a user."""
+        return await self._call('mentions page', self.client.get_users_mentions,
+                                id=user_id, tweet_fields=TWEET_FIELDS, **params)
+    
+    async def _paginate(self, fetch_page: Any, target: Any, state_key: str, max_tweets: Optional[int],
+                        page_size: range, since_id: Optional[str], incremental: bool,
+                        query: Optional[str] = None) -> AsyncIterator[Tweet]:
+        """Async TwitterService._paginate."""
+        if since_id is None and incremental:
+            since_id = twitter_cache.get('since_id', state_key)
+        
+        newest_id = None
+        pagination_token = None
+        yielded = 0
+        while max_tweets is None or yielded < max_tweets:
+            remaining = None if max_tweets is None else max_tweets - yielded
+            params = _page_params(page_size, remaining, since_id, pagination_token)
+            response = await fetch_page(target, **params)
+            meta = response.meta or {}
+            if newest_id is None:
+                newest_id = meta.get('newest_id')
+            
+            page = await run_blocking(_store_page, response, query)
+            for tweet in page:
+                yield tweet
+                yielded += 1
+                if max_tweets is not None and yielded >= max_tweets:
+                    break
+            
+            pagination_token = meta.get('next_token')
+            if not pagination_token:
+                break
+        
+        if newest_id and incremental:
+            twitter_cache.set('since_id', state_key, str(newest_id))
+    
+    def iter_user_timeline(self, user_id: Any, max_tweets: int = 100, since_id: Optional[str] = None,
+                           incremental: bool = True) -> AsyncIterator[Tweet]:
+        """Async TwitterService.iter_user_timeline (use with 'async for')."""
+        return self._paginate(self._fetch_timeline_page, user_id, f"user:{user_id}",
+                              max_tweets, range(5, 101), since_id, incremental)
+    
+    def iter_search(self, query: str, max_tweets: int = 100, since_id: Optional[str] = None,
+                    incremental: bool = True) -> AsyncIterator[Tweet]:
+        """Async TwitterService.iter_search (use with 'async for')."""
+        return self._paginate(self._fetch_search_page, query, f"search:{query}",
+                              max_tweets, range(10, 101), since_id, incremental, query=query)
+    
+    async def iter_mentions(self, user_id: Optional[Any] = None, max_tweets: Optional[int] = 100,
+                            since_id: Optional[str] = None, incremental: bool = True) -> AsyncIterator[Tweet]:
+        """Async TwitterService.iter_mentions (use with 'async for')."""
+        if user_id is None:
+            if getattr(self, '_own_user_id', None) is None:
+                response = await self._call('get me', self.client.get_me)
+                self._own_user_id = str(response.data.id)
+            user_id = self._own_user_id
+        async for tweet in self._paginate(self._fetch_mentions_page, user_id, f"mentions:{user_id}",
+                                          max_tweets, range(5, 101), since_id, incremental):
+            yield tweet
+    
+    def reset_since_id(self, user_id: Optional[Any] = None, query: Optional[str] = None) -> None:
+        """Forget the incremental watermark of a user or query (no API call)."""
+        _reset_since_id(user_id, query)
+    
+    @log_execution_time
+    async def search_tweets(self, query: str, max_results: int = 10) -> List[Tweet]:
+        """Async TwitterService.search_tweets."""
+        try:
+            return [tweet async for tweet in self.iter_search(query, max_tweets=max_results, incremental=False)]
+        except Exception as e:
+            raise Exception(f"Failed to search tweets: {str(e)}")
+    
+    @rate_limit(calls=900, period=900, key='twitter_users')
+    async def _fetch_users(self, **params: Any) -> List[Dict[str, Any]]:
+        """Look up to 100 users in a single request, by usernames or by ids."""
+        response = await self._call('users lookup', self.client.get_users, user_fields=USER_FIELDS, **params)
+        users = [_user_to_dict(user) for user in response.data or []]
+        await run_blocking(get_data_store().save_twitter_users, users)
+        return users
+    
+    async def _resolve_users(self, keys: List[str], lookup_param: str) -> Dict[str, Dict[str, Any]]:
+        """Resolve users from the cache first, then in concurrent batches of 100 from the API."""
+        users, missing = _cached_users(keys, lookup_param)
+        batches = await gather_bounded(
+            lambda chunk=missing[start:start + USER_LOOKUP_BATCH_SIZE]: self._fetch_users(**{lookup_param: chunk})
+            for start in range(0, len(missing), USER_LOOKUP_BATCH_SIZE)
+        )
+        for fetched in batches:
+            _cache_users(fetched, lookup_param, users)
+        return users
+    
+    @log_execution_time
+    async def get_users(self, usernames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Async TwitterService.get_users."""
+        try:
+            return await self._resolve_users([name.lstrip('@').lower() for name in usernames if name], 'usernames')
+        except Exception as e:
+            raise Exception(f"Failed to look up users: {str(e)}")
+    
+    @log_execution_time
+    async def get_users_by_ids(self, user_ids: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """Async TwitterService.get_users_by_ids."""
+        try:
+            return await self._resolve_users([str(user_id) for user_id in user_ids if user_id], 'ids')
+        except Exception as e:
+            raise Exception(f"Failed to look up users: {str(e)}")
+    
+    async def get_user_info(self, username: str) -> Dict[str, Any]:
+        """Async TwitterService.get_user_info."""
+        user = (await self.get_users([username])).get(username.lstrip('@').lower())
+        if user is None:
+            raise Exception(f"Failed to get user info: user @{username} not found")
+        return user
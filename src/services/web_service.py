@@ -1,21 +1,81 @@
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from typing import Optional, Dict, Any, List
+from src.config.settings import settings
+from src.models.records import PageSnapshot
+from src.services.storage_service import get_data_store
+from src.utils.aio import run_blocking
+from src.utils.content_extractor import Extraction, get_content_extractor
+from src.utils.cancellation import check_cancelled
+from src.utils.circuit_breaker import CircuitBreakerSession, get_circuit_breaker, host_dependency
+from src.utils.deadline import call_timeout
 from src.utils.decorators import rate_limit, log_execution_time
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+def _build_snapshot(url: str, html: str, status_code: int) -> PageSnapshot:
+    """Parse a fetched page into a snapshot and store it."""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Extract meta information
+    meta_info = {
+        'title': soup.title.string if soup.title else None,
+        'description': soup.find('meta', {'name': 'description'})['content'] if soup.find('meta', {'name': 'description'}) else None,
+        'keywords': soup.find('meta', {'name': 'keywords'})['content'] if soup.find('meta', {'name': 'keywords'}) else None
+    }
+    
+    # Extract main content, without navigation, banners and site-wide template blocks
+    extraction = get_content_extractor().extract(html, url)
+    content_text = extraction.text
+    
+    # Extract links
+    links = [a['href'] for a in soup.find_all('a', href=True)]
+    
+    # Plain str copies so the snapshot does not keep the parsed tree alive
+    page = PageSnapshot(
+        url=url,
+        status_code=status_code,
+        title=None if meta_info['title'] is None else str(meta_info['title']),
+        description=meta_info['description'],
+        keywords=meta_info['keywords'],
+        content=str(content_text),
+        links=tuple(links[:10])  # Limit to first 10 links
+    )
+    
+    get_data_store().save_page(
+        url,
+        page.content,
+        status_code=page.status_code,
+        title=page.title,
+        description=page.description,
+        fingerprint=extraction.fingerprint
+    )
+    return page
+
+def _extract_content(url: str, html: str, status_code: int) -> Extraction:
+    """Extract the main content of a fetched page and store it."""
+    # Main content only: navigation, banners and footers are dropped
+    extraction = get_content_extractor().extract(html, url)
+    get_data_store().save_page(url, extraction.text, status_code=status_code, fingerprint=extraction.fingerprint)
+    return extraction
+
+def _extract_text(url: str, html: str, status_code: int) -> str:
+    """Extract the main text of a fetched page and store it."""
+    return _extract_content(url, html, status_code).text
+
 class WebService:
     """Service for web scraping and analysis."""
     
     def __init__(self):
         """Initialize Web service."""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Every call times out, never outlives the current request's deadline,
+        # and fails fast while its host is failing
+        self.session = CircuitBreakerSession(timeout=settings.WEB_TIMEOUT)
+        self.session.headers.update({'User-Agent': USER_AGENT})
     
-    @rate_limit(calls=10, period=60)  # Conservative rate limit
+    @rate_limit(calls=10, period=60, key='web_analyze')  # Conservative rate limit
     @log_execution_time
-    def analyze_website(self, url: str) -> Dict[str, Any]:
+    def analyze_website(self, url: str) -> PageSnapshot:
         """
         Analyze a website and extract relevant information.
         
@@ -23,39 +83,17 @@ class WebService:
             url: Website URL
             
         Returns:
-            Dict containing website analysis
+            Page snapshot, which also exposes 'meta_info' and 'content_summary'
         """
         try:
             response = self.session.get(url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract meta information
-            meta_info = {
-                'title': soup.title.string if soup.title else None,
-                'description': soup.find('meta', {'name': 'description'})['content'] if soup.find('meta', {'name': 'description'}) else None,
-                'keywords': soup.find('meta', {'name': 'keywords'})['content'] if soup.find('meta', {'name': 'keywords'}) else None
-            }
-            
-            # Extract main content
-            main_content = soup.find('main') or soup.find('article') or soup.find('div', {'class': 'content'})
-            content_text = main_content.get_text() if main_content else soup.get_text()
-            
-            # Extract links
-            links = [a['href'] for a in soup.find_all('a', href=True)]
-            
-            return {
-                'url': url,
-                'meta_info': meta_info,
-                'content_summary': content_text[:500] + '...' if len(content_text) > 500 else content_text,
-                'links': links[:10],  # Limit to first 10 links
-                'status_code': response.status_code
-            }
+            return _build_snapshot(url, response.text, response.status_code)
         except Exception as e:
             raise Exception(f"Failed to analyze website: {str(e)}")
     
-    @rate_limit(calls=10, period=60)
+    @rate_limit(calls=10, period=60, key='web_extract')
     @log_execution_time
     def extract_text_content(self, url: str) -> str:
         """
@@ -71,27 +109,11 @@ class WebService:
             response = self.session.get(url)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text()
-            
-            # Break into lines and remove leading and trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            # Drop blank lines
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            return text
+            return _extract_text(url, response.text, response.status_code)
         except Exception as e:
             raise Exception(f"Failed to extract text content: {str(e)}")
     
-    @rate_limit(calls=10, period=60)
+    @rate_limit(calls=10, period=60, key='web_status')
     @log_execution_time
     def check_website_status(self, url: str) -> Dict[str, Any]:
         """
@@ -113,4 +135,124 @@ class WebService:
                 'final_url': response.url
             }
         except Exception as e:
-            raise Exception(f"Failed to check website status: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Failed to check website status: {str(e)}") 
+
+class AsyncWebService:
+    """
+    Asynchronous variant of WebService, built on httpx.
+    
+    Fetches run concurrently on the event loop; HTML parsing and storage run
+    in the blocking-call pool. Rate limits are shared with WebService.
+    """
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the async Web service.
+        
+        Args:
+            client: httpx client to use (one is created if omitted)
+        """
+        self.client = client or httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            follow_redirects=True,
+            timeout=settings.WEB_TIMEOUT,
+            limits=httpx.Limits(max_connections=settings.ASYNC_MAX_CONCURRENCY)
+        )
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.aclose()
+    
+    async def __aenter__(self) -> 'AsyncWebService':
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+    
+    async def _request(self, method: str, url: str) -> httpx.Response:
+        """Send a request through the host's circuit breaker, within the current request's deadline."""
+        check_cancelled(f"{method} {url}")
+        timeout = call_timeout(settings.WEB_TIMEOUT, f"{method} {url}")
+        breaker = get_circuit_breaker(host_dependency(url))
+        breaker.before_call()
+        try:
+            response = await self.client.request(method, url, timeout=timeout)
+        except Exception as e:
+            breaker.record_error(e)
+            raise
+        breaker.record_status(response.status_code)
+        return response
+    
+    @rate_limit(calls=10, period=60, key='web_analyze')
+    @log_execution_time
+    async def analyze_website(self, url: str) -> PageSnapshot:
+        """
+        Analyze a website and extract relevant information.
+        
+        Args:
+            url: Website URL
+            
+        Returns:
+            Page snapshot, which also exposes 'meta_info' and 'content_summary'
+        """
+        try:
+            response = await self._request('GET', url)
+            response.raise_for_status()
+            return await run_blocking(_build_snapshot, url, response.text, response.status_code)
+        except Exception as e:
+            raise Exception(f"Failed to analyze website: {str(e)}")
+    
+    @rate_limit(calls=10, period=60, key='web_extract')
+    @log_execution_time
+    async def extract_content(self, url: str) -> Extraction:
+        """
+        Extract the main content of a webpage, with its fingerprint.
+        
+        Args:
+            url: Website URL
+            
+        Returns:
+            Extraction of the page
+        """
+        try:
+            response = await self._request('GET', url)
+            response.raise_for_status()
+            return await run_blocking(_extract_content, url, response.text, response.status_code)
+        except Exception as e:
+            raise Exception(f"Failed to extract text content: {str(e)}")
+    
+    async def extract_text_content(self, url: str) -> str:
+        """
+        Extract main text content from a webpage.
+        
+        Args:
+            url: Website URL
+            
+        Returns:
+            Extracted text content
+        """
+        return (await self.extract_content(url)).text
+    
+    @rate_limit(calls=10, period=60, key='web_status')
+    @log_execution_time
+    async def check_website_status(self, url: str) -> Dict[str, Any]:
+        """
+        Check the status and basic information of a website.
+        
+        Args:
+            url: Website URL
+            
+        Returns:
+            Dict containing website status information
+        """
+        try:
+            response = await self._request('HEAD', url)
+            return {
+                'url': url,
+                'status_code': response.status_code,
+                'content_type': response.headers.get('content-type'),
+                'server': response.headers.get('server'),
+                'final_url': str(response.url)
+            }
+        except Exception as e:
+            raise Exception(f"Failed to check website status: {str(e)}")
@@ -0,0 +1,86 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, TypeVar, Union
+
+from src.config.settings import settings
+
+T = TypeVar('T')
+
+async def gather_bounded(
+    tasks: Iterable[Union[Awaitable[T], Callable[[], Awaitable[T]]]],
+    limit: Optional[int] = None,
+    return_exceptions: bool = False
+) -> List[T]:
+    """
+    Like asyncio.gather, with at most `limit` awaitables running at once.
+
+    Pass zero-argument callables (e.g. lambda: service.get(x)) rather than
+    coroutines to also defer creating each coroutine until a slot is free.
+
+    Args:
+        tasks: Awaitables, or callables returning awaitables
+        limit: Maximum number in flight (defaults to settings.ASYNC_MAX_CONCURRENCY)
+        return_exceptions: Return exceptions in the results instead of raising the first one
+
+    Returns:
+        Results in the order of the tasks
+    """
+    semaphore = asyncio.Semaphore(limit or settings.ASYNC_MAX_CONCURRENCY)
+
+    async def run(task):
+        async with semaphore:
+            return await (task() if callable(task) else task)
+
+    return await asyncio.gather(*(run(task) for task in tasks), return_exceptions=return_exceptions)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.ASYNC_MAX_THREADS, thread_name_prefix='blocking-io')
+        return _executor
+
+def in_current_context(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap a function to run in a copy of the caller's context on any thread.
+
+    Thread pools do not carry context variables (the current run report and
+    deadline); wrap functions before submitting them.
+
+    Args:
+        func: Function to wrap
+
+    Returns:
+        Wrapped function
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        # A context can only be entered by one thread at a time
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking call (praw, SQLite, HTML parsing) off the event loop.
+
+    Uses a dedicated pool sized by settings.ASYNC_MAX_THREADS rather than the
+    loop's default executor, and carries over the caller's context (e.g. the
+    current run report).
+
+    Args:
+        func: Blocking callable
+        *args, **kwargs: Passed to func
+
+    Returns:
+        Result of func
+    """
+    call = functools.partial(in_current_context(func), *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TieredCache:
+    """
+    Two-level cache: an in-memory LRU in front of a persistent SQLite store.
+
+    Entries are grouped by data class (e.g. 'rules', 'hot'), each with its own
+    TTL in seconds. A TTL of None means entries of that class never expire.
+    Every entry remembers how many API calls it took to produce, so the cache
+    can report how much rate-limit quota it saved.
+    """
+
+    def __init__(self, path: Optional[str], ttls: Dict[str, Optional[int]], max_entries: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite file, or None for a memory-only cache
+            ttls: TTL in seconds for each data class
+            max_entries: Maximum number of entries kept in the memory layer
+        """
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    data_class TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    cost INTEGER NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (data_class, key)
+                )
+                """
+            )
+            self._conn.commit()
+
+    def _counters(self, data_class: str) -> Dict[str, int]:
+        return self._stats.setdefault(data_class, {'hits': 0, 'misses': 0, 'api_calls_saved': 0})
+
+    def _is_fresh(self, data_class: str, stored_at: float) -> bool:
+        ttl = self.ttls.get(data_class)
+        return ttl is None or time.time() - stored_at < ttl
+
+    def _remember(self, entry_key: Tuple[str, str], entry: Tuple[float, int, Any]) -> None:
+        self._memory[entry_key] = entry
+        self._memory.move_to_end(entry_key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, data_class: str, key: str) -> Optional[Tuple[float, int, Any]]:
+        entry_key = (data_class, key)
+        entry = self._memory.get(entry_key)
+        if entry is not None:
+            if self._is_fresh(data_class, entry[0]):
+                self._memory.move_to_end(entry_key)
+                return entry
+            del self._memory[entry_key]
+
+        if self._conn is None:
+            return None
+
+        row = self._conn.execute(
+            "SELECT stored_at, cost, value FROM cache_entries WHERE data_class = ? AND key = ?",
+            (data_class, key)
+        ).fetchone()
+        if row is None or not self._is_fresh(data_class, row[0]):
+            return None
+
+        entry = (row[0], row[1], json.loads(row[2]))
+        self._remember(entry_key, entry)
+        return entry
+
+    def get(self, data_class: str, key: str) -> Optional[Any]:
+        """
+        Get a fresh value from the cache.
+
+        Args:
+            data_class: Data class of the entry
+            key: Entry key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        with self._lock:
+            counters = self._counters(data_class)
+            entry = self._lookup(data_class, key.lower())
+            if entry is None:
+                counters['misses'] += 1
+                return None
+            counters['hits'] += 1
+            counters['api_calls_saved'] += entry[1]
+            return entry[2]
+
+    def set(self, data_class: str, key: str, value: Any, cost: int = 1) -> None:
+        """
+        Store a value in both cache layers.
+
+        Args:
+            data_class: Data class of the entry
+            key: Entry key
+            value: JSON-serializable value
+            cost: Number of API calls it took to produce the value
+        """
+        if data_class not in self.ttls:
+            raise ValueError(f"Unknown cache data class: {data_class}")
+
+        entry_key = (data_class, key.lower())
+        stored_at = time.time()
+        with self._lock:
+            self._remember(entry_key, (stored_at, cost, value))
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (data_class, key, stored_at, cost, value) VALUES (?, ?, ?, ?, ?)",
+                    (entry_key[0], entry_key[1], stored_at, cost, json.dumps(value, default=str))
+                )
+                self._conn.commit()
+
+    def get_or_fetch(self, data_class: str, key: str, fetch: Callable[[], Any], cost: int = 1) -> Any:
+        """
+        Return the cached value or compute, store and return it.
+
+        Args:
+            data_class: Data class of the entry
+            key: Entry key
+            fetch: Callable producing the value on a miss
+            cost: Number of API calls made by fetch
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        value = self.get(data_class, key)
+        if value is not None:
+            return value
+        value = fetch()
+        self.set(data_class, key, value, cost=cost)
+        return value
+
+    def invalidate(self, data_class: Optional[str] = None, key: Optional[str] = None,
+                   prefix: Optional[str] = None) -> None:
+        """
+        Drop entries from both cache layers.
+
+        Args:
+            data_class: Only drop entries of this data class (all classes if None)
+            key: Only drop entries with this key (all keys if None)
+            prefix: Only drop entries whose key starts with this prefix
+        """
+        key = key.lower() if key is not None else None
+        prefix = prefix.lower() if prefix is not None else None
+        with self._lock:
+            for entry_key in list(self._memory):
+                if ((data_class is None or entry_key[0] == data_class)
+                        and (key is None or entry_key[1] == key)
+                        and (prefix is None or entry_key[1].startswith(prefix))):
+                    del self._memory[entry_key]
+
+            if self._conn is not None:
+                clauses, params = [], []
+                if data_class is not None:
+                    clauses.append("data_class = ?")
+                    params.append(data_class)
+                if key is not None:
+                    clauses.append("key = ?")
+                    params.append(key)
+                if prefix is not None:
+                    clauses.append("substr(key, 1, ?) = ?")
+                    params.extend([len(prefix), prefix])
+                where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+                self._conn.execute(f"DELETE FROM cache_entries{where}", params)
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the rate-limit quota saved.
+
+        Returns:
+            Dict with per data class counters and totals
+        """
+        with self._lock:
+            per_class = {name: dict(counters) for name, counters in self._stats.items()}
+        return {
+            'by_class': per_class,
+            'hits': sum(c['hits'] for c in per_class.values()),
+            'misses': sum(c['misses'] for c in per_class.values()),
+            'api_calls_saved': sum(c['api_calls_saved'] for c in per_class.values())
+        }
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+class RunCancelled(Exception):
+    """The current run was cancelled (client gone, explicit cancel, server shutdown)."""
+
+class CancelToken:
+    """
+    Cooperative cancellation flag of one run.
+
+    Cancelling never interrupts a call in progress: the run stops at the
+    next check (between agent steps, before outbound calls, during waits).
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = 'cancelled') -> None:
+        """Request cancellation; the first reason given is kept."""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self, what: str = 'call') -> None:
+        """Raise RunCancelled if cancellation was requested."""
+        if self._event.is_set():
+            raise RunCancelled(f"Run cancelled before {what}: {self.reason}")
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to `seconds`, waking up early on cancellation. Returns True if cancelled."""
+        return self._event.wait(seconds)
+
+_current_token: ContextVar[Optional[CancelToken]] = ContextVar('cancel_token', default=None)
+
+@contextmanager
+def cancel_scope(token: Optional[CancelToken] = None) -> Iterator[CancelToken]:
+    """
+    Make a cancel token current for the duration of a run.
+
+    Args:
+        token: Token to use (a new one if omitted)
+
+    Yields:
+        The current token
+    """
+    token = token or CancelToken()
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+def current_token() -> Optional[CancelToken]:
+    """Return the cancel token of the current run, or None outside a run."""
+    return _current_token.get()
+
+def check_cancelled(what: str = 'call') -> None:
+    """Raise RunCancelled if the current run was cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        token.check(what)
+
+def cancellable_sleep(seconds: float, what: str = 'wait') -> None:
+    """
+    Sleep, waking up and raising RunCancelled as soon as the current run is cancelled.
+
+    Args:
+        seconds: Time to sleep
+        what: What is being waited for, for the error message
+    """
+    token = _current_token.get()
+    if token is None:
+        time.sleep(seconds)
+        return
+    if token.wait(seconds):
+        token.check(what)
+
+def backoff_on_cancel(details: Dict[str, Any]) -> None:
+    """on_backoff handler for backoff.on_exception: no retry of a cancelled run."""
+    check_cancelled('retry')
+
+def interrupt_on_cancel(memory_step: Any, agent: Any = None) -> None:
+    """smolagents step callback stopping the agent once the current run is cancelled."""
+    token = _current_token.get()
+    if agent is not None and token is not None and token.cancelled:
+        logger.warning(f"Run cancelled ({token.reason}), stopping agent {getattr(agent, 'name', None) or ''}")
+        agent.interrupt()
@@ -0,0 +1,180 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from smolagents.memory import ActionStep, PlanningStep, TaskStep, ToolCall
+from smolagents.models import ChatMessage, MessageRole
+from smolagents.monitoring import Timing
+
+from src.services.storage_service import get_data_store
+from src.utils.run_context import current_report
+
+logger = logging.getLogger(__name__)
+
+def serialize_steps(steps: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Serialize the completed steps of an agent memory.
+
+    Failed steps and the final answer are left out: a resumed run starts
+    again from the last step that succeeded.
+
+    Args:
+        steps: Agent memory steps
+
+    Returns:
+        JSON-serializable list of steps
+    """
+    serialized = []
+    for step in steps:
+        if isinstance(step, TaskStep):
+            serialized.append({'type': 'task', 'task': step.task})
+        elif isinstance(step, PlanningStep):
+            serialized.append({'type': 'planning', 'plan': step.plan})
+        elif isinstance(step, ActionStep) and step.error is None and not step.is_final_answer:
+            serialized.append({
+                'type': 'action',
+                'step_number': step.step_number,
+                'model_output': step.model_output,
+                'code_action': step.code_action,
+                'observations': step.observations,
+                'tool_calls': [
+                    {'id': call.id, 'name': call.name, 'arguments': call.arguments}
+                    for call in step.tool_calls or []
+                ]
+            })
+    return serialized
+
+def restore_steps(serialized: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Rebuild agent memory steps saved by serialize_steps.
+
+    Args:
+        serialized: Saved steps
+
+    Returns:
+        Memory steps, to put back in agent.memory.steps
+    """
+    steps = []
+    now = time.time()
+    for data in serialized:
+        if data['type'] == 'task':
+            steps.append(TaskStep(task=data['task']))
+        elif data['type'] == 'planning':
+            steps.append(PlanningStep(
+                model_input_messages=[],
+                model_output_message=ChatMessage(role=MessageRole.ASSISTANT, content=data['plan']),
+                plan=data['plan'],
+                timing=Timing(start_time=now, end_time=now)
+            ))
+        elif data['type'] == 'action':
+            steps.append(ActionStep(
+                step_number=data['step_number'],
+                timing=Timing(start_time=now, end_time=now),
+                model_output=data.get('model_output'),
+                code_action=data.get('code_action'),
+                observations=data.get('observations'),
+                tool_calls=[ToolCall(**call) for call in data.get('tool_calls') or []] or None
+            ))
+    return steps
+
+class RunCheckpoint:
+    """
+    Checkpoint of one orchestrator run, saved to the local data store.
+
+    Saved after every step of the orchestrator and of the managed agents it
+    calls: the orchestrator's completed steps (what the LLM already worked
+    out, tool results included in their observations) and the facts pinned
+    on the run report (company profile, chosen subreddits, drafted posts).
+    """
+
+    def __init__(self, run_id: str, url: str, agent: Any, store: Optional[Any] = None):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            run_id: ID of the run
+            url: Analyzed URL
+            agent: Orchestrator agent whose memory is saved
+            store: Data store (the shared one by default)
+        """
+        self.run_id = run_id
+        self.url = url
+        self.agent = agent
+        self.store = store or get_data_store()
+
+    def save(self, memory_step: Optional[Any] = None) -> None:
+        """
+        Save the run state.
+
+        Args:
+            memory_step: Step of the orchestrator just finished, not yet in its memory
+        """
+        steps = list(self.agent.memory.steps)
+        if memory_step is not None and all(step is not memory_step for step in steps):
+            steps.append(memory_step)
+        serialized = serialize_steps(steps)
+        report = current_report()
+        state = {
+            'steps': serialized,
+            'facts': report.pinned_facts() if report is not None else {}
+        }
+        completed = sum(1 for step in serialized if step['type'] == 'action')
+        self.store.save_checkpoint(self.run_id, self.url, state, steps=completed)
+
+    def restore(self, state: Dict[str, Any]) -> int:
+        """
+        Put a saved state back into the agent memory and the current run report.
+
+        Args:
+            state: State of a previous checkpoint
+
+        Returns:
+            Number of completed steps restored
+        """
+        steps = restore_steps(state.get('steps', []))
+        self.agent.memory.steps = steps
+        report = current_report()
+        if report is not None:
+            for name, text in state.get('facts', {}).items():
+                report.pin_fact(name, text)
+        return sum(1 for step in steps if isinstance(step, ActionStep))
+
+    def delete(self) -> None:
+        """Delete the checkpoint once the run succeeded."""
+        self.store.delete_checkpoint(self.run_id)
+
+_current_checkpoint: ContextVar[Optional[RunCheckpoint]] = ContextVar('checkpoint', default=None)
+
+@contextmanager
+def checkpoint_scope(checkpoint: RunCheckpoint) -> Iterator[RunCheckpoint]:
+    """
+    Make a checkpoint current for the duration of a run.
+
+    Args:
+        checkpoint: Checkpoint of the run
+
+    Yields:
+        The current checkpoint
+    """
+    token = _current_checkpoint.set(checkpoint)
+    try:
+        yield checkpoint
+    finally:
+        _current_checkpoint.reset(token)
+
+def current_checkpoint() -> Optional[RunCheckpoint]:
+    """Return the checkpoint of the current run, or None outside a run."""
+    return _current_checkpoint.get()
+
+def checkpoint_step(memory_step: Any, agent: Any = None) -> None:
+    """smolagents step callback saving the current run's checkpoint after each step."""
+    checkpoint = _current_checkpoint.get()
+    if checkpoint is None:
+        return
+    try:
+        checkpoint.save(memory_step if agent is checkpoint.agent else None)
+    except Exception as e:
+        # A missed checkpoint must not fail the run
+        logger.warning(f"Failed to save checkpoint of run {checkpoint.run_id}: {str(e)}")
@@ -0,0 +1,227 @@
+import logging
+import threading
+from time import monotonic
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.config.settings import settings
+from src.utils.cancellation import RunCancelled
+from src.utils.deadline import DeadlineExceeded, DeadlineSession
+from src.utils.run_context import current_report
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+# Statuses and errors that mean the dependency itself is failing, not the request
+FAILURE_STATUSES = {408, 429, 500, 502, 503, 504, 529}
+FAILURE_ERRORS = ('Timeout', 'TimeoutError', 'TimeoutException', 'ConnectionError', 'ConnectError',
+                  'NetworkError', 'ClientConnectionError', 'ServerError', 'TwitterServerError', 'TooManyRequests', 'RateLimitError',
+                  'InternalServerError', 'ServiceUnavailableError', 'OverloadedError', 'APIConnectionError')
+
+class CircuitOpenError(Exception):
+    """A dependency's circuit is open: the call was not made."""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(f"Circuit open for {dependency}: failing dependency, retry in {retry_after:.0f}s")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+def is_dependency_failure(error: Exception) -> bool:
+    """Whether an error means the dependency is down or overloaded (timeouts, 5xx, 429)."""
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded, RunCancelled)):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is not None:
+        return status in FAILURE_STATUSES
+    return any(cls.__name__ in FAILURE_ERRORS for cls in type(error).__mro__)
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one external dependency.
+
+    Closed: calls go through and their outcomes are kept for `window`
+    seconds. Once at least `min_calls` outcomes are recorded and the failure
+    rate reaches `failure_rate`, the circuit opens: calls fail immediately
+    with CircuitOpenError for `cooldown` seconds. Then it is half-open: up
+    to `half_open_max` probe calls go through, and the first outcome closes
+    or reopens it.
+    """
+
+    def __init__(self, name: str, failure_rate: Optional[float] = None, min_calls: Optional[int] = None,
+                 window: Optional[float] = None, cooldown: Optional[float] = None, half_open_max: int = 1):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Dependency name (e.g. 'reddit', 'web:example.com')
+            failure_rate: Failure rate that opens the circuit (defaults to settings.CIRCUIT_FAILURE_RATE)
+            min_calls: Outcomes needed in the window before the rate is considered
+            window: Seconds of outcomes considered
+            cooldown: Seconds the circuit stays open before probing
+            half_open_max: Probe calls allowed at once while half-open
+        """
+        self.name = name
+        self.failure_rate = settings.CIRCUIT_FAILURE_RATE if failure_rate is None else failure_rate
+        self.min_calls = settings.CIRCUIT_MIN_CALLS if min_calls is None else min_calls
+        self.window = settings.CIRCUIT_WINDOW if window is None else window
+        self.cooldown = settings.CIRCUIT_COOLDOWN if cooldown is None else cooldown
+        self.half_open_max = half_open_max
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.cooldown:
+            self._state, self._probes = HALF_OPEN, 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (taking a probe slot if half-open)."""
+        with self._lock:
+            state = self._current_state(monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max:
+                self._probes += 1
+                return True
+            return False
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not be made."""
+        if not self.allow():
+            report = current_report()
+            if report is not None:
+                report.increment('circuit_rejections')
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit is probed again (0 unless open)."""
+        with self._lock:
+            if self._current_state(monotonic()) != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        self._record(True)
+
+    def record_failure(self) -> None:
+        self._record(False)
+
+    def record_status(self, status_code: int) -> None:
+        """Record a call that got an HTTP response."""
+        self._record(status_code not in FAILURE_STATUSES)
+
+    def record_error(self, error: Exception) -> None:
+        """Record a call that raised: a failure if the dependency is at fault, else a success."""
+        if isinstance(error, (DeadlineExceeded, RunCancelled)):
+            # The call was never made: it says nothing about the dependency
+            with self._lock:
+                self._probes = max(0, self._probes - 1)
+            return
+        self._record(not is_dependency_failure(error))
+
+    def _record(self, ok: bool) -> None:
+        with self._lock:
+            now = monotonic()
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if ok:
+                    self._close()
+                else:
+                    self._open(now, "probe failed")
+                return
+            if state == OPEN:
+                return
+            self._outcomes.append((now, ok))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, success in self._outcomes if not success)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open(now, f"{failures}/{len(self._outcomes)} calls failed in {self.window:.0f}s")
+
+    def _open(self, now: float, reason: str) -> None:
+        self._state, self._opened_at, self._probes = OPEN, now, 0
+        self._outcomes.clear()
+        logger.warning(f"Circuit for {self.name} opened ({reason}), failing fast for {self.cooldown:.0f}s")
+
+    def _close(self) -> None:
+        self._state, self._probes = CLOSED, 0
+        self._outcomes.clear()
+        logger.info(f"Circuit for {self.name} closed, dependency recovered")
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {'state': state, 'calls': len(self._outcomes), 'failures': failures}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the circuit breaker shared by every caller of a dependency.
+
+    Args:
+        name: Dependency name ('reddit', 'twitter', 'anthropic', 'web:<host>')
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+def circuit_states(prefix: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """State of every known circuit, optionally only those whose name starts with prefix."""
+    with _breakers_lock:
+        breakers = [b for name, b in _breakers.items() if prefix is None or name.startswith(prefix)]
+    return {breaker.name: breaker.to_dict() for breaker in breakers}
+
+def open_circuits() -> List[str]:
+    """Names of the dependencies currently failing fast."""
+    return [name for name, state in circuit_states().items() if state['state'] == OPEN]
+
+def host_dependency(url: str) -> str:
+    """Dependency name of a scraped host."""
+    return f"web:{urlparse(url).netloc.lower()}"
+
+class CircuitBreakerSession(DeadlineSession):
+    """
+    DeadlineSession whose calls go through a circuit breaker: one per
+    dependency (API clients), or one per host (scrapers).
+    """
+
+    def __init__(self, dependency: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Initialize the session.
+
+        Args:
+            dependency: Dependency name for every call (per-host breakers if omitted)
+            timeout: Timeout of calls made without one
+        """
+        super().__init__(timeout=timeout)
+        self.dependency = dependency
+
+    def request(self, method, url, *args, **kwargs):
+        breaker = get_circuit_breaker(self.dependency or host_dependency(url))
+        breaker.before_call()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception as e:
+            breaker.record_error(e)
+            raise
+        breaker.record_status(response.status_code)
+        return response
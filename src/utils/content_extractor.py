@@ -0,0 +1,245 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup, Comment
+
+from src.utils.fingerprint import content_fingerprint, normalize_text
+from src.utils.run_context import current_report
+
+logger = logging.getLogger(__name__)
+
+# Elements that never hold text, and elements that never hold main content
+NOISE_TAGS = ['script', 'style', 'noscript', 'template']
+BOILERPLATE_TAGS = ['svg', 'canvas', 'iframe', 'form', 'button', 'select', 'nav', 'header', 'footer', 'aside']
+
+# Elements that start a new block of text
+BLOCK_TAGS = {'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'td', 'th',
+              'tr', 'table', 'blockquote', 'pre', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'figcaption', 'body'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# id/class hints, as used by readability
+UNLIKELY = re.compile(
+    r'cookie|consent|gdpr|banner|nav|menu|breadcrumb|footer|masthead|sidebar|widget|social|share|'
+    r'newsletter|subscribe|popup|modal|promo|sponsor|advert|related|skip-link|toolbar',
+    re.I
+)
+LIKELY = re.compile(r'article|content|main|post|entry|story|text|body|blog', re.I)
+
+# Classification thresholds
+MAX_LINK_DENSITY = 0.33
+MIN_CONTENT_WORDS = 12
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text (about four characters per token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+@dataclass
+class Block:
+    tag: str
+    text: str
+    link_chars: int
+
+    @property
+    def words(self) -> int:
+        return len(self.text.split())
+
+    @property
+    def link_density(self) -> float:
+        return self.link_chars / len(self.text) if self.text else 1.0
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha1(normalize_text(self.text).encode('utf-8')).hexdigest()
+
+@dataclass
+class Extraction:
+    """
+    Main content extracted from a page, with the size of the raw text it replaces.
+
+    The fingerprint is taken before template blocks are dropped: which blocks
+    count as template depends on the other pages of the site seen so far, so
+    the text alone would change with the order pages are extracted in.
+    """
+
+    text: str
+    fingerprint: str
+    title: Optional[str]
+    raw_tokens: int
+    tokens: int
+    blocks_kept: int
+    blocks_dropped: int
+    template_blocks: int
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of the raw token count removed."""
+        return 1 - self.tokens / self.raw_tokens if self.raw_tokens else 0.0
+
+class ContentExtractor:
+    """
+    Readability-style extractor of the main content of HTML pages.
+
+    Text is split into blocks at block-level elements. Blocks are kept when
+    they are dense in words and sparse in links, plus short blocks (headings,
+    captions) that sit next to kept blocks. Blocks that recur across pages of
+    the same site (menus, footers, cookie banners) are dropped as template.
+    """
+
+    def __init__(self, template_min_pages: int = 2, max_sites: int = 256):
+        """
+        Initialize the extractor.
+
+        Args:
+            template_min_pages: Other pages of a site a block must appear on to count as template
+            max_sites: Number of sites whose blocks are remembered
+        """
+        self.template_min_pages = template_min_pages
+        self.max_sites = max_sites
+        self._sites: "OrderedDict[str, Dict[str, Set[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def extract(self, html: str, url: Optional[str] = None) -> Extraction:
+        """
+        Extract the main content of a page.
+
+        Args:
+            html: Page HTML
+            url: Page URL, used to learn the site's template blocks
+
+        Returns:
+            Extraction with the clean text and token counts
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        title = soup.title.get_text(strip=True) if soup.title else None
+        for tag in soup(NOISE_TAGS):
+            tag.decompose()
+        for comment in soup.find_all(string=lambda s: isinstance(s, Comment)):
+            comment.extract()
+        raw_tokens = estimate_tokens(' '.join(soup.stripped_strings))
+
+        self._strip_boilerplate(soup)
+        blocks = self._blocks(soup.body or soup)
+        keep = self._classify(blocks)
+        fingerprint = content_fingerprint('\n'.join(block.text for block, kept in zip(blocks, keep) if kept))
+
+        template = self._template_keys(url, blocks)
+        template_blocks = sum(1 for block, kept in zip(blocks, keep) if kept and block.key in template)
+        if template_blocks < sum(keep):
+            # Never let template detection remove the whole page
+            keep = [kept and block.key not in template for block, kept in zip(blocks, keep)]
+        else:
+            template_blocks = 0
+
+        text = '\n'.join(block.text for block, kept in zip(blocks, keep) if kept)
+        extraction = Extraction(
+            text=text,
+            fingerprint=fingerprint,
+            title=title,
+            raw_tokens=raw_tokens,
+            tokens=estimate_tokens(text),
+            blocks_kept=sum(keep),
+            blocks_dropped=len(blocks) - sum(keep),
+            template_blocks=template_blocks
+        )
+        self._report(url, extraction)
+        return extraction
+
+    def _report(self, url: Optional[str], extraction: Extraction) -> None:
+        logger.info(
+            f"Extracted main content of {url or 'page'}: {extraction.raw_tokens} -> {extraction.tokens} tokens "
+            f"({extraction.reduction:.0%} less, {extraction.template_blocks} template blocks dropped)"
+        )
+        report = current_report()
+        if report is not None:
+            report.increment('extraction_raw_tokens', extraction.raw_tokens)
+            report.increment('extraction_tokens', extraction.tokens)
+
+    def _strip_boilerplate(self, soup: BeautifulSoup) -> None:
+        for tag in soup(BOILERPLATE_TAGS):
+            # A <header> inside an article is the article's own header
+            if tag.name == 'header' and tag.find_parent(['article', 'main']):
+                continue
+            tag.decompose()
+        for tag in soup.find_all(True):
+            if tag.decomposed or tag.name in ('html', 'body', 'main', 'article'):
+                continue
+            hints = ' '.join(tag.get('class') or []) + ' ' + (tag.get('id') or '')
+            if UNLIKELY.search(hints) and not LIKELY.search(hints):
+                tag.decompose()
+
+    def _blocks(self, root) -> List[Block]:
+        # Group text nodes by their nearest block-level ancestor, in document order
+        blocks: "OrderedDict[int, Block]" = OrderedDict()
+        for string in root.find_all(string=True):
+            text = ' '.join(string.split())
+            if not text:
+                continue
+            in_link, owner = False, root
+            for ancestor in string.parents:
+                if ancestor.name == 'a':
+                    in_link = True
+                if ancestor.name in BLOCK_TAGS:
+                    owner = ancestor
+                    break
+            block = blocks.get(id(owner))
+            if block is None:
+                blocks[id(owner)] = Block(owner.name, text, len(text) if in_link else 0)
+            else:
+                block.text = f"{block.text} {text}"
+                block.link_chars += len(text) if in_link else 0
+        return list(blocks.values())
+
+    def _classify(self, blocks: List[Block]) -> List[bool]:
+        content = [block.link_density <= MAX_LINK_DENSITY and block.words >= MIN_CONTENT_WORDS for block in blocks]
+        if not any(content):
+            # No dense block (e.g. a landing page of short taglines): keep everything but link lists
+            return [block.link_density <= MAX_LINK_DENSITY for block in blocks]
+
+        keep = list(content)
+        for i, block in enumerate(blocks):
+            if keep[i] or block.link_density > MAX_LINK_DENSITY:
+                continue
+            # Headings introduce the next content block; short blocks between two kept ones belong to them
+            next_content = any(content[i + 1:i + 3])
+            if block.tag in HEADING_TAGS and next_content:
+                keep[i] = True
+            elif 0 < i < len(blocks) - 1 and content[i - 1] and content[i + 1]:
+                keep[i] = True
+        return keep
+
+    def _template_keys(self, url: Optional[str], blocks: List[Block]) -> Set[str]:
+        if not url:
+            return set()
+        parsed = urlparse(url)
+        site, page = parsed.netloc.lower(), parsed.path or '/'
+        keys = {block.key for block in blocks}
+        with self._lock:
+            pages = self._sites.setdefault(site, {})
+            self._sites.move_to_end(site)
+            while len(self._sites) > self.max_sites:
+                self._sites.popitem(last=False)
+            others = [seen for other, seen in pages.items() if other != page]
+            pages[page] = keys
+
+        threshold = max(self.template_min_pages, (len(others) + 1) // 2)
+        if len(others) < threshold:
+            return set()
+        return {key for key in keys if sum(key in seen for seen in others) >= threshold}
+
+_content_extractor: Optional[ContentExtractor] = None
+_content_extractor_lock = threading.Lock()
+
+def get_content_extractor() -> ContentExtractor:
+    """Return the extractor shared by every scraper, so site templates are learned across calls."""
+    global _content_extractor
+    with _content_extractor_lock:
+        if _content_extractor is None:
+            _content_extractor = ContentExtractor()
+        return _content_extractor
@@ -0,0 +1,157 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, Tuple, Union
+
+import requests
+
+from src.utils.cancellation import check_cancelled
+
+logger = logging.getLogger(__name__)
+
+# Shortest timeout worth giving an outbound call; below it the call is not made
+MIN_CALL_TIMEOUT = 0.5
+
+class DeadlineExceeded(TimeoutError):
+    """The time budget of the current request ran out."""
+
+class Deadline:
+    """Point in time by which the current request must be finished."""
+
+    def __init__(self, budget: float):
+        """
+        Initialize the deadline.
+
+        Args:
+            budget: Seconds from now
+        """
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_CALL_TIMEOUT
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar('deadline', default=None)
+
+@contextmanager
+def deadline_scope(budget: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Make a deadline current for the duration of a request.
+
+    A nested scope never extends the deadline of the enclosing one.
+
+    Args:
+        budget: Seconds the request may take (no deadline if None)
+
+    Yields:
+        The current deadline
+    """
+    parent = _current_deadline.get()
+    deadline = parent
+    if budget is not None and (parent is None or budget < parent.remaining()):
+        deadline = Deadline(budget)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the current request, or None if it has none."""
+    return _current_deadline.get()
+
+def remaining_time() -> Optional[float]:
+    """Seconds left in the current request, or None if it has no deadline."""
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+def check_deadline(what: str = 'call') -> None:
+    """
+    Raise DeadlineExceeded if the current request is out of time.
+
+    Args:
+        what: Operation about to start, for the error message
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"Deadline exceeded before {what} ({deadline.budget:.0f}s budget)")
+
+def call_timeout(default: Optional[float], what: str = 'call') -> Optional[float]:
+    """
+    Timeout of an outbound call: its own timeout, capped by the time left.
+
+    Args:
+        default: Timeout the call would use without a deadline
+        what: Operation about to start, for the error message
+
+    Returns:
+        Timeout in seconds (None only if there is neither a default nor a deadline)
+    """
+    check_deadline(what)
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    return remaining if default is None else min(default, remaining)
+
+def check_wait(seconds: float, what: str = 'wait') -> None:
+    """
+    Raise DeadlineExceeded if waiting this long would overrun the deadline.
+
+    Args:
+        seconds: Planned wait (rate limit window, retry delay)
+        what: What is being waited for, for the error message
+    """
+    remaining = remaining_time()
+    if remaining is not None and seconds > remaining:
+        raise DeadlineExceeded(f"Deadline exceeded: {what} needs {seconds:.0f}s, {remaining:.0f}s left")
+
+def backoff_max_time() -> Optional[float]:
+    """max_time for backoff.on_exception: retries stop when the request is out of time."""
+    return remaining_time()
+
+def interrupt_on_deadline(memory_step: Any, agent: Any = None) -> None:
+    """smolagents step callback stopping the agent once the current request is out of time."""
+    deadline = _current_deadline.get()
+    if agent is not None and deadline is not None and deadline.expired:
+        logger.warning(f"Deadline of {deadline.budget:.0f}s exceeded, stopping agent {getattr(agent, 'name', None) or ''}")
+        agent.interrupt()
+
+Timeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+def _cap(timeout: Timeout, remaining: float) -> Timeout:
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return remaining if timeout is None else min(timeout, remaining)
+
+class DeadlineSession(requests.Session):
+    """
+    requests session whose calls always have a timeout, capped by the current
+    deadline, and are not made once the current run is cancelled.
+
+    Used for clients that build their own requests (tweepy, prawcore) so they
+    cannot block past the request budget.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Initialize the session.
+
+        Args:
+            timeout: Timeout of calls made without one
+        """
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        check_cancelled(f"{method} {url}")
+        check_deadline(f"{method} {url}")
+        timeout = kwargs.get('timeout') or self.timeout
+        remaining = remaining_time()
+        kwargs['timeout'] = timeout if remaining is None else _cap(timeout, remaining)
+        return super().request(method, url, *args, **kwargs)
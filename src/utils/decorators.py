@@ -1,41 +1,165 @@
+import asyncio
+import copy
+import inspect
+import json
 import time
 import logging
-from datetime import datetime, timedelta
+import threading
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Optional
+
+from src.utils.cancellation import cancellable_sleep, check_cancelled
+from src.utils.deadline import check_wait
+from src.utils.run_context import current_report
 
 logger = logging.getLogger(__name__)
 
-def rate_limit(calls: int, period: int):
+class RateLimiter:
+    """
+    Thread-safe fixed-window rate limiter, usable from threads and coroutines.
+    
+    Callers reserve a slot in the current window, or in the next window with
+    room if the current one is spent, and wait until that window opens. The
+    lock is never held while waiting.
+    
+    Args:
+        calls: Number of calls allowed in the period
+        period: Time period in seconds
+    """
+    
+    def __init__(self, calls: int, period: int):
+        self.calls = calls
+        self.period = period
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._calls_made = 0
+    
+    def reserve(self) -> float:
+        """Take one call from the budget and return the seconds to wait before making it."""
+        with self._lock:
+            now = time.monotonic()
+            
+            if now - self._window_start >= self.period:
+                self._window_start = now
+                self._calls_made = 0
+                
+            if self._calls_made >= self.calls:
+                # Book into the next window, which may itself be in the future
+                self._window_start += self.period
+                self._calls_made = 0
+                
+            self._calls_made += 1
+            return max(0.0, self._window_start - now)
+    
+    def acquire(self) -> None:
+        """
+        Take one call from the budget, sleeping until the next window if it is spent.
+        
+        Raises DeadlineExceeded instead of sleeping past the current request's
+        deadline, and RunCancelled as soon as the current run is cancelled.
+        """
+        check_cancelled('rate limited call')
+        wait = self.reserve()
+        if wait > 0:
+            check_wait(wait, 'rate limit window')
+            cancellable_sleep(wait, 'rate limited call')
+    
+    async def acquire_async(self) -> None:
+        """Take one call from the budget without blocking the event loop."""
+        check_cancelled('rate limited call')
+        wait = self.reserve()
+        if wait > 0:
+            check_wait(wait, 'rate limit window')
+            await asyncio.sleep(wait)
+            check_cancelled('rate limited call')
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+def get_rate_limiter(key: str, calls: int, period: int) -> RateLimiter:
+    """
+    Get the rate limiter shared by every caller using the same key.
+    
+    Args:
+        key: Name of the shared budget (e.g. 'reddit')
+        calls: Number of calls allowed in the period, used on first creation
+        period: Time period in seconds, used on first creation
+    """
+    with _shared_limiters_lock:
+        if key not in _shared_limiters:
+            _shared_limiters[key] = RateLimiter(calls, period)
+        return _shared_limiters[key]
+
+def rate_limit(calls: int, period: int, key: Optional[str] = None):
     """
     Decorator to implement rate limiting.
     
     Args:
         calls: Number of calls allowed in the period
         period: Time period in seconds
+        key: Share the budget with every function decorated with the same key
     """
     def decorator(func: Callable) -> Callable:
-        last_reset = datetime.now()
-        calls_made = 0
+        limiter = get_rate_limiter(key, calls, period) if key else RateLimiter(calls, period)
+        
+        if inspect.iscoroutinefunction(func):
+            # Coroutines share the budget of the synchronous functions with the same key
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                await limiter.acquire_async()
+                return await func(*args, **kwargs)
+            async_wrapper.limiter = limiter
+            return async_wrapper
         
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            nonlocal last_reset, calls_made
-            now = datetime.now()
-            
-            if now - last_reset > timedelta(seconds=period):
-                last_reset = now
-                calls_made = 0
-                
-            if calls_made >= calls:
-                sleep_time = period - (now - last_reset).total_seconds()
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                last_reset = datetime.now()
-                calls_made = 0
-                
-            calls_made += 1
+            limiter.acquire()
             return func(*args, **kwargs)
+        wrapper.limiter = limiter
+        return wrapper
+    return decorator
+
+def _is_failure(result: Any) -> bool:
+    """Error results returned by tools instead of raising; never reused."""
+    if isinstance(result, dict):
+        return result.get('success') is False
+    return isinstance(result, str) and result.startswith('Error')
+
+def run_memo(bypass: Optional[Callable[[Dict[str, Any]], bool]] = None):
+    """
+    Decorator reusing the result of a tool called again with the same
+    arguments during the current run (no memo outside a run).
+
+    Only for read-only tools: a memoized publish would silently skip the
+    second post. Failed calls (exceptions, error results) are not reused.
+    Hits are counted on the run report as 'tool_memo_hits' and
+    'tool_memo_hits:<tool>'.
+
+    Args:
+        bypass: Called with the call's arguments; True to always call the tool
+            (e.g. incremental fetches that depend on the previous call)
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            report = current_report()
+            if report is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if bypass is not None and bypass(bound.arguments):
+                return func(*args, **kwargs)
+            
+            key = f"{func.__qualname__}:{json.dumps(bound.arguments, sort_keys=True, default=str)}"
+            result, hit = report.memoized(key, lambda: func(*args, **kwargs), keep=lambda r: not _is_failure(r))
+            if hit:
+                report.increment('tool_memo_hits')
+                report.increment(f"tool_memo_hits:{func.__name__}")
+                logger.info(f"Reused the result of {func.__name__} from earlier in the run")
+            # Callers may modify the result they get, the memo keeps its own copy
+            return copy.deepcopy(result)
         return wrapper
     return decorator
 
@@ -46,6 +170,17 @@ def log_execution_time(func: Callable) -> Callable:
     Args:
         func: The function to decorate
     """
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            start_time = time.time()
+            result = await func(*args, **kwargs)
+            logger.info(
+                f"Function {func.__name__} took {time.time() - start_time:.2f} seconds to execute"
+            )
+            return result
+        return async_wrapper
+    
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
         start_time = time.time()
@@ -0,0 +1,37 @@
+import hashlib
+import re
+import unicodedata
+from typing import Optional
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize extracted text so layout changes do not change its fingerprint.
+
+    Unicode compatibility forms are folded, case is ignored and every run of
+    whitespace (indentation, line breaks, non-breaking spaces) becomes a
+    single space.
+
+    Args:
+        text: Extracted text content
+
+    Returns:
+        Normalized text
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return _WHITESPACE.sub(' ', text).strip()
+
+def content_fingerprint(text: Optional[str]) -> Optional[str]:
+    """
+    Fingerprint of a page's extracted text.
+
+    Args:
+        text: Extracted text content
+
+    Returns:
+        SHA-256 hex digest of the normalized text, or None if there is no text
+    """
+    if text is None:
+        return None
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
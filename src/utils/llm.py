@@ -0,0 +1,212 @@
+import copy
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from smolagents import LiteLLMModel
+
+from src.utils.model_router import ModelRouter, get_model_router, litellm_model_id
+from src.utils.run_context import current_report
+
+logger = logging.getLogger(__name__)
+
+# Anthropic accepts at most four cache breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+CACHE_CONTROL = {"type": "ephemeral"}
+
+def cached_system(text: str) -> List[Dict[str, Any]]:
+    """
+    System prompt for the Anthropic Messages API, marked as a cacheable prefix.
+
+    Args:
+        text: Static system instructions
+
+    Returns:
+        System content blocks
+    """
+    return [{"type": "text", "text": text, "cache_control": CACHE_CONTROL}]
+
+def _usage_value(usage: Any, name: str) -> int:
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return int(value or 0)
+
+def record_usage(usage: Any, model_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Record the token usage of an LLM call, including prompt cache reads and writes.
+
+    Works with Anthropic SDK usage objects (input_tokens) and LiteLLM usage
+    objects (prompt_tokens); both carry cache_read_input_tokens and
+    cache_creation_input_tokens for Anthropic models. Counts are added to
+    the current run's report.
+
+    Args:
+        usage: Usage object of the response
+        model_id: Model that served the call
+
+    Returns:
+        Dict of input, output, cache read and cache write token counts
+    """
+    counts = {
+        'input_tokens': _usage_value(usage, 'input_tokens') or _usage_value(usage, 'prompt_tokens'),
+        'output_tokens': _usage_value(usage, 'output_tokens') or _usage_value(usage, 'completion_tokens'),
+        'cache_read_tokens': _usage_value(usage, 'cache_read_input_tokens'),
+        'cache_write_tokens': _usage_value(usage, 'cache_creation_input_tokens')
+    }
+    logger.debug(f"LLM usage ({model_id or 'unknown model'}): {counts}")
+    report = current_report()
+    if report is not None:
+        report.increment('llm_calls')
+        for name, value in counts.items():
+            report.increment(f"llm_{name}", value)
+    return counts
+
+class CachingLiteLLMModel(LiteLLMModel):
+    """
+    LiteLLMModel that marks the static prefix of every request as cacheable
+    with Anthropic prompt caching.
+
+    Cache breakpoints are placed after the tool schemas, after the system
+    prompt (which holds the CodeAgent instructions and tool descriptions),
+    after each registered static task prefix, and on the last message so the
+    next step reads the whole previous conversation from cache. Callers keep
+    variable parts (URL, step memory) after the static prefixes.
+    Non-Anthropic models are left untouched.
+
+    With a task class, each call goes through the model router: the model is
+    chosen per call and the call falls back to the next model on timeout or
+    overload.
+    """
+
+    def __init__(
+        self,
+        model_id: Optional[str] = None,
+        static_prefixes: Optional[Sequence[str]] = None,
+        task_class: Optional[str] = None,
+        latency_slo: Optional[float] = None,
+        router: Optional[ModelRouter] = None,
+        **kwargs
+    ):
+        """
+        Initialize the model.
+
+        Args:
+            model_id: Fixed model to use (routed by task class if omitted)
+            static_prefixes: Static leading parts of task prompts to cache separately
+            task_class: Task class used to route calls ('summarize', 'classify', 'draft', 'plan')
+            latency_slo: Latency SLO in seconds (defaults to the task class's)
+            router: Model router (defaults to the shared router)
+            **kwargs: Passed to LiteLLMModel
+        """
+        self.task_class = None if model_id else task_class
+        self.latency_slo = latency_slo
+        self.router = router or get_model_router()
+        if model_id is None:
+            model_id = litellm_model_id(self.router.select(task_class or 'draft', latency_slo))
+        super().__init__(model_id=model_id, **kwargs)
+        self.static_prefixes = [prefix for prefix in (static_prefixes or []) if prefix]
+        self.usage_totals: Counter = Counter()
+        self._usage_lock = threading.Lock()
+        # Model and timeout of the attempt in progress on this thread
+        self._attempt = threading.local()
+
+    def _prepare_completion_kwargs(self, *args, **kwargs) -> Dict[str, Any]:
+        completion_kwargs = super()._prepare_completion_kwargs(*args, **kwargs)
+        model_id = getattr(self._attempt, 'model_id', None)
+        if model_id:
+            completion_kwargs['model'] = model_id
+            completion_kwargs['timeout'] = self._attempt.timeout
+        if str(completion_kwargs.get('model') or self.model_id).startswith(('anthropic/', 'claude')):
+            completion_kwargs = self._add_cache_breakpoints(completion_kwargs)
+        return completion_kwargs
+
+    def _add_cache_breakpoints(self, completion_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        completion_kwargs = dict(completion_kwargs)
+        messages = [self._as_blocks(message) for message in completion_kwargs['messages']]
+        breakpoints = []
+
+        if completion_kwargs.get('tools'):
+            tools = copy.deepcopy(completion_kwargs['tools'])
+            tools[-1]['cache_control'] = CACHE_CONTROL
+            completion_kwargs['tools'] = tools
+            breakpoints.append(None)
+
+        for message in messages:
+            if message['role'] == 'system' and message['content']:
+                breakpoints.append(message['content'][-1])
+                break
+
+        for message in messages:
+            if message['role'] == 'user':
+                for block in self._split_static_prefix(message):
+                    breakpoints.append(block)
+                break
+
+        if messages and messages[-1]['content']:
+            breakpoints.append(messages[-1]['content'][-1])
+
+        # Keep the breakpoints covering the longest prefixes if there are too many
+        for block in self._unique(breakpoints)[-MAX_CACHE_BREAKPOINTS:]:
+            if block is not None:
+                block['cache_control'] = CACHE_CONTROL
+        completion_kwargs['messages'] = messages
+        return completion_kwargs
+
+    def _as_blocks(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        message = dict(message)
+        content = message.get('content')
+        if isinstance(content, str):
+            message['content'] = [{"type": "text", "text": content}]
+        elif isinstance(content, list):
+            message['content'] = [dict(block) for block in content]
+        else:
+            message['content'] = []
+        return message
+
+    def _split_static_prefix(self, message: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Split the first text block holding a static prefix into [static, variable] blocks
+        for i, block in enumerate(message['content']):
+            if block.get('type') != 'text':
+                continue
+            for prefix in self.static_prefixes:
+                end = block['text'].find(prefix)
+                if end < 0:
+                    continue
+                end += len(prefix)
+                static = {"type": "text", "text": block['text'][:end]}
+                rest = block['text'][end:]
+                message['content'][i:i + 1] = [static] + ([{"type": "text", "text": rest}] if rest else [])
+                return [static]
+        return []
+
+    @staticmethod
+    def _unique(blocks: List[Optional[Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        seen, unique = set(), []
+        for block in blocks:
+            if block is None or id(block) not in seen:
+                unique.append(block)
+                if block is not None:
+                    seen.add(id(block))
+        return unique
+
+    def generate(self, *args, **kwargs):
+        if self.task_class is None:
+            return self._generate_with(None, None, args, kwargs)
+        return self.router.call(
+            self.task_class,
+            lambda model, timeout: self._generate_with(litellm_model_id(model), timeout, args, kwargs),
+            self.latency_slo
+        )
+
+    def _generate_with(self, model_id: Optional[str], timeout: Optional[float], args, kwargs):
+        self._attempt.model_id, self._attempt.timeout = model_id, timeout
+        try:
+            message = super().generate(*args, **kwargs)
+        finally:
+            self._attempt.model_id = self._attempt.timeout = None
+        usage = getattr(message.raw, 'usage', None)
+        if usage is not None:
+            counts = record_usage(usage, model_id or self.model_id)
+            with self._usage_lock:
+                self.usage_totals.update(counts)
+        return message
@@ -0,0 +1,129 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from smolagents.memory import ActionStep
+
+from src.config.settings import settings
+from src.utils.content_extractor import CHARS_PER_TOKEN, estimate_tokens
+from src.utils.run_context import current_report
+
+logger = logging.getLogger(__name__)
+
+COMPACTED_MARKER = "[compacted:"
+PINNED_HEADER = "\n\nPinned facts from earlier steps (verbatim):\n"
+
+def _message_text(message: Any) -> str:
+    content = message.content if hasattr(message, 'content') else message.get('content')
+    if isinstance(content, str):
+        return content
+    return ''.join(block.get('text', '') for block in content or [] if isinstance(block, dict))
+
+def _strip_pinned(text: str) -> str:
+    return text.split(PINNED_HEADER, 1)[0]
+
+class MemoryCompactor:
+    """
+    smolagents step callback bounding the context an agent resends at every step.
+
+    Once the estimated prompt size passes `threshold` tokens, the observations
+    and outputs of all but the `keep_recent` latest steps are truncated to
+    `max_step_tokens` (beginning and end kept). Facts pinned on the run report
+    (company profile, chosen subreddits, drafted posts) are kept verbatim in
+    one block after the compacted steps. Each step's prompt size before and
+    after compaction is recorded on the run report.
+    """
+
+    def __init__(self, threshold: Optional[int] = None, keep_recent: Optional[int] = None,
+                 max_step_tokens: Optional[int] = None):
+        """
+        Initialize the compactor.
+
+        Args:
+            threshold: Prompt size in tokens above which old steps are compacted
+            keep_recent: Number of latest steps never compacted
+            max_step_tokens: Size of a compacted observation or output in tokens
+        """
+        self.threshold = settings.MEMORY_COMPACTION_THRESHOLD if threshold is None else threshold
+        self.keep_recent = settings.MEMORY_KEEP_RECENT_STEPS if keep_recent is None else keep_recent
+        self.max_step_tokens = settings.MEMORY_COMPACTED_STEP_TOKENS if max_step_tokens is None else max_step_tokens
+
+    def __call__(self, memory_step: Any, agent: Any = None) -> None:
+        if agent is None or not isinstance(memory_step, ActionStep):
+            return
+        before = self.context_tokens(agent)
+        after = before
+        if before > self.threshold:
+            self.compact(agent.memory.steps)
+            after = self.context_tokens(agent)
+            logger.info(f"Compacted memory of {agent.name or 'agent'} at step {memory_step.step_number}: "
+                        f"{before} -> {after} tokens")
+
+        report = current_report()
+        if report is not None:
+            usage = memory_step.token_usage
+            report.record_step(
+                agent.name or 'orchestrator',
+                memory_step.step_number,
+                # Tokens actually sent for this step, and estimated size of the next prompt
+                prompt_tokens=usage.input_tokens if usage is not None else None,
+                context_tokens=before,
+                compacted_tokens=after
+            )
+            if after < before:
+                report.increment('memory_compacted_tokens', before - after)
+
+    @staticmethod
+    def context_tokens(agent: Any) -> int:
+        """Estimated size in tokens of the prompt of the agent's next step."""
+        return sum(estimate_tokens(_message_text(message)) for message in agent.write_memory_to_messages())
+
+    def compact(self, steps: List[Any]) -> int:
+        """
+        Truncate the observations and outputs of old action steps.
+
+        Args:
+            steps: Agent memory steps
+
+        Returns:
+            Number of steps compacted
+        """
+        action_steps = [step for step in steps if isinstance(step, ActionStep)]
+        old = action_steps[:-self.keep_recent] if self.keep_recent else action_steps
+        if not old:
+            return 0
+
+        compacted = 0
+        for step in old:
+            for field in ('observations', 'model_output'):
+                text = getattr(step, field)
+                if not isinstance(text, str):
+                    continue
+                shortened = self.truncate(_strip_pinned(text))
+                if shortened != text:
+                    setattr(step, field, shortened)
+                    compacted += 1
+            if step.model_output is not None and step.tool_calls:
+                # The code is already in model_output; do not resend it a second time
+                step.tool_calls = None
+
+        facts = self._pinned_facts()
+        if facts:
+            last = old[-1]
+            last.observations = (last.observations or '') + PINNED_HEADER + '\n\n'.join(
+                f"[{name}]\n{text}" for name, text in facts.items()
+            )
+        return compacted
+
+    def truncate(self, text: str) -> str:
+        """Keep the beginning and end of a text within max_step_tokens."""
+        if COMPACTED_MARKER in text or estimate_tokens(text) <= self.max_step_tokens:
+            return text
+        budget = self.max_step_tokens * CHARS_PER_TOKEN
+        head, tail = text[:budget * 2 // 3], text[-(budget // 3):]
+        omitted = len(text) - len(head) - len(tail)
+        return f"{head}\n{COMPACTED_MARKER} {omitted} characters omitted]\n{tail}"
+
+    @staticmethod
+    def _pinned_facts() -> Dict[str, str]:
+        report = current_report()
+        return report.pinned_facts() if report is not None else {}
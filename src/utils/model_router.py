@@ -0,0 +1,242 @@
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from src.config.settings import settings
+from src.utils.cancellation import check_cancelled
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from src.utils.deadline import DeadlineExceeded, call_timeout
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Per-attempt timeout, as a multiple of the task's latency SLO
+TIMEOUT_FACTOR = 3.0
+# Weight of the newest sample in the latency moving average
+EWMA_ALPHA = 0.3
+
+# HTTP statuses worth retrying on another model: timeout, rate limit, server errors, overload
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = ('Timeout', 'APITimeoutError', 'APIConnectionError', 'RateLimitError',
+                    'InternalServerError', 'ServiceUnavailableError', 'OverloadedError')
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an LLM error is a timeout or overload that another model may not have."""
+    if isinstance(error, TimeoutError):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status in RETRYABLE_STATUSES:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+def litellm_model_id(model: str) -> str:
+    """LiteLLM ID of a configured model ('claude-...' models are served by Anthropic)."""
+    return f"anthropic/{model}" if model.startswith('claude') else model
+
+def model_dependency(model: str) -> str:
+    """Circuit breaker name of the provider serving a model."""
+    model = litellm_model_id(model)
+    return model.split('/', 1)[0] if '/' in model else model
+
+class ModelStats:
+    """Latency and failure history of one model."""
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+        self.failed_at: Optional[float] = None
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.calls += 1
+        if ok:
+            self.latency = latency if self.latency is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+        else:
+            self.failures += 1
+            self.failed_at = time.monotonic()
+
+class ModelRouter:
+    """
+    Chooses a model for each LLM call from its task class.
+
+    Each task class (summarize, classify, draft, plan) has models in order of
+    preference and a latency SLO. Models whose moving-average latency exceeds
+    the SLO, or that recently timed out or were overloaded, are tried after
+    the others; a call that fails that way falls back to the next model.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, Dict[str, Any]]] = None, cooldown: Optional[float] = None):
+        """
+        Initialize the router.
+
+        Args:
+            routes: Task class -> {'models': [...], 'slo': seconds} (defaults to settings.MODEL_ROUTES)
+            cooldown: Seconds a model is avoided after a timeout or overload
+        """
+        self.routes = routes if routes is not None else settings.MODEL_ROUTES
+        self.cooldown = settings.MODEL_COOLDOWN if cooldown is None else cooldown
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def slo(self, task: str) -> float:
+        return self._route(task)['slo']
+
+    def _route(self, task: str) -> Dict[str, Any]:
+        if task not in self.routes:
+            raise ValueError(f"Unknown task class: {task} (expected one of {', '.join(self.routes)})")
+        return self.routes[task]
+
+    def candidates(self, task: str, slo: Optional[float] = None) -> List[str]:
+        """
+        Models to try for a task, best first.
+
+        Args:
+            task: Task class
+            slo: Latency SLO in seconds (defaults to the task's)
+
+        Returns:
+            Model IDs in the order they should be tried
+        """
+        route = self._route(task)
+        slo = route['slo'] if slo is None else slo
+        now = time.monotonic()
+
+        def rank(indexed):
+            index, model = indexed
+            with self._lock:
+                stats = self._stats.get(model)
+                cooling = stats is not None and stats.failed_at is not None and now - stats.failed_at < self.cooldown
+                slow = stats is not None and stats.latency is not None and stats.latency > slo
+            # Preference order within each tier: healthy, over SLO, cooling down
+            return (cooling, slow, index)
+
+        return [model for _, model in sorted(enumerate(route['models']), key=rank)]
+
+    def select(self, task: str, slo: Optional[float] = None) -> str:
+        """Best model for a task right now."""
+        return self.candidates(task, slo)[0]
+
+    def record(self, model: str, latency: float, ok: bool = True) -> None:
+        """
+        Record the outcome of a call.
+
+        Args:
+            model: Model ID
+            latency: Duration of the call in seconds
+            ok: False if the call timed out or the model was overloaded
+        """
+        with self._lock:
+            self._stats.setdefault(model, ModelStats()).record(latency, ok)
+
+    def call(self, task: str, fn: Callable[[str, float], T], slo: Optional[float] = None) -> T:
+        """
+        Run an LLM call, falling back to the next model on timeout or overload.
+        
+        Each attempt's timeout is capped by the time left before the current
+        request's deadline; no attempt starts once it has passed. Models whose
+        provider's circuit is open are skipped without a call.
+
+        Args:
+            task: Task class
+            fn: Callable taking (model ID, timeout in seconds) and making the call
+            slo: Latency SLO in seconds (defaults to the task's)
+
+        Returns:
+            Result of the first successful attempt
+        """
+        slo = self.slo(task) if slo is None else slo
+        last_error: Optional[Exception] = None
+        for model in self.candidates(task, slo):
+            # Never wait for a model past the request's deadline
+            check_cancelled(f"'{task}' LLM call")
+            timeout = call_timeout(slo * TIMEOUT_FACTOR, f"'{task}' LLM call")
+            breaker = get_circuit_breaker(model_dependency(model))
+            try:
+                breaker.before_call()
+            except CircuitOpenError as e:
+                last_error = last_error or e
+                continue
+            start = time.monotonic()
+            try:
+                result = fn(model, timeout)
+            except Exception as e:
+                last_error = self._failed(task, model, breaker, start, e)
+                continue
+            self._succeeded(task, model, breaker, start, slo)
+            return result
+        raise self._exhausted(task, last_error)
+
+    async def call_async(self, task: str, fn: Callable[[str, float], Awaitable[T]], slo: Optional[float] = None) -> T:
+        """
+        Async variant of call(), for async clients.
+
+        Args:
+            task: Task class
+            fn: Callable taking (model ID, timeout in seconds) and returning the call's awaitable
+            slo: Latency SLO in seconds (defaults to the task's)
+
+        Returns:
+            Result of the first successful attempt
+        """
+        slo = self.slo(task) if slo is None else slo
+        last_error: Optional[Exception] = None
+        for model in self.candidates(task, slo):
+            check_cancelled(f"'{task}' LLM call")
+            timeout = call_timeout(slo * TIMEOUT_FACTOR, f"'{task}' LLM call")
+            breaker = get_circuit_breaker(model_dependency(model))
+            try:
+                breaker.before_call()
+            except CircuitOpenError as e:
+                last_error = last_error or e
+                continue
+            start = time.monotonic()
+            try:
+                result = await fn(model, timeout)
+            except Exception as e:
+                last_error = self._failed(task, model, breaker, start, e)
+                continue
+            self._succeeded(task, model, breaker, start, slo)
+            return result
+        raise self._exhausted(task, last_error)
+
+    def _failed(self, task: str, model: str, breaker: CircuitBreaker, start: float, error: Exception) -> Exception:
+        breaker.record_error(error)
+        if isinstance(error, DeadlineExceeded) or not is_retryable(error):
+            raise error
+        self.record(model, time.monotonic() - start, ok=False)
+        logger.warning(f"Model {model} failed for '{task}' ({type(error).__name__}), trying next model")
+        return error
+
+    def _succeeded(self, task: str, model: str, breaker: CircuitBreaker, start: float, slo: float) -> None:
+        breaker.record_success()
+        latency = time.monotonic() - start
+        self.record(model, latency)
+        if latency > slo:
+            logger.info(f"Model {model} took {latency:.1f}s for '{task}' (SLO {slo:.0f}s)")
+
+    def _exhausted(self, task: str, last_error: Optional[Exception]) -> Exception:
+        if isinstance(last_error, CircuitOpenError):
+            # Every provider is failing fast: no model was called
+            return last_error
+        return Exception(f"All models failed for '{task}': {str(last_error)}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latency moving average, calls and failures per model."""
+        with self._lock:
+            return {
+                model: {'latency': s.latency, 'calls': s.calls, 'failures': s.failures}
+                for model, s in self._stats.items()
+            }
+
+_model_router: Optional[ModelRouter] = None
+_model_router_lock = threading.Lock()
+
+def get_model_router() -> ModelRouter:
+    """Return the router shared by every agent and LLM call."""
+    global _model_router
+    with _model_router_lock:
+        if _model_router is None:
+            _model_router = ModelRouter()
+        return _model_router
@@ -0,0 +1,146 @@
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+class RunReport:
+    """
+    What happened during one analysis run, reported alongside its result.
+
+    Sections record whether each piece of the analysis (a page description,
+    the customer profile, ...) was reused from a previous run or recomputed.
+    Pinned facts are structured results (company profile, chosen subreddits,
+    drafted posts) that agent memory compaction must keep verbatim. The memo
+    holds results of read-only tool calls, reused for the rest of the run.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self.counters: Counter = Counter()
+        self.facts: Dict[str, str] = {}
+        self.steps: List[Dict[str, Any]] = []
+        self.memo: Dict[str, Any] = {}
+        self._memo_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def record_section(self, name: str, status: str, detail: Optional[str] = None) -> None:
+        """
+        Record the outcome of a section.
+
+        Args:
+            name: Section name, e.g. 'description:https://example.com'
+            status: 'reused' or 'recomputed'
+            detail: Why the section was reused or recomputed
+        """
+        with self._lock:
+            self.sections[name] = {'status': status, 'detail': detail}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a named counter."""
+        with self._lock:
+            self.counters[name] += amount
+
+    def pin_fact(self, name: str, text: str) -> None:
+        """
+        Pin a structured fact; a later fact with the same name replaces it.
+
+        Args:
+            name: Fact name, e.g. 'company_profile'
+            text: Fact content, kept verbatim
+        """
+        with self._lock:
+            self.facts.pop(name, None)
+            self.facts[name] = text
+
+    def pinned_facts(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.facts)
+
+    def record_step(self, agent: str, step: int, **sizes: int) -> None:
+        """
+        Record the context sizes of an agent step.
+
+        Args:
+            agent: Agent name
+            step: Step number
+            **sizes: Token counts, e.g. prompt_tokens, context_tokens, compacted_tokens
+        """
+        with self._lock:
+            self.steps.append({'agent': agent, 'step': step, **sizes})
+
+    def memoized(self, key: str, compute: Callable[[], Any],
+                 keep: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, bool]:
+        """
+        Compute a value once per run; concurrent callers with the same key wait for the first one.
+
+        Args:
+            key: Memo key
+            compute: Computes the value on a miss
+            keep: Whether a computed value may be reused (all values by default)
+
+        Returns:
+            The value, and whether it came from the memo
+        """
+        with self._lock:
+            if key in self.memo:
+                return self.memo[key], True
+            key_lock = self._memo_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self.memo:
+                    return self.memo[key], True
+            value = compute()
+            if keep is None or keep(value):
+                with self._lock:
+                    self.memo[key] = value
+            return value, False
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'reused': sorted(name for name, s in self.sections.items() if s['status'] == 'reused'),
+                'recomputed': sorted(name for name, s in self.sections.items() if s['status'] == 'recomputed'),
+                'sections': {name: dict(s) for name, s in self.sections.items()},
+                'counters': dict(self.counters),
+                'pinned': list(self.facts),
+                'steps': [dict(step) for step in self.steps]
+            }
+
+_current_report: ContextVar[Optional[RunReport]] = ContextVar('run_report', default=None)
+
+@contextmanager
+def run_scope(run_id: Optional[str] = None) -> Iterator[RunReport]:
+    """
+    Make a new report current for the duration of a run.
+
+    Args:
+        run_id: ID of the run
+
+    Yields:
+        The run's report
+    """
+    report = RunReport(run_id)
+    token = _current_report.set(report)
+    try:
+        yield report
+    finally:
+        _current_report.reset(token)
+
+def current_report() -> Optional[RunReport]:
+    """Return the report of the current run, or None outside a run."""
+    return _current_report.get()
+
+def record_section(name: str, status: str, detail: Optional[str] = None) -> None:
+    """Record a section outcome on the current run's report, if any."""
+    report = current_report()
+    if report is not None:
+        report.record_section(name, status, detail)
+
+def pin_fact(name: str, text: str) -> None:
+    """Pin a structured fact on the current run's report, if any."""
+    report = current_report()
+    if report is not None:
+        report.pin_fact(name, text)
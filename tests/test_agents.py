@@ -1,8 +1,13 @@
 import unittest
 from unittest.mock import Mock, patch
-from src.agents.twitter_agent import twitter_agent
-from src.agents.reddit_agent import reddit_agent
+from src.agents.twitter_agent import twitter_agent, get_user_timeline
+from src.agents.reddit_agent import reddit_agent, analyze_subreddits, _rank_subreddits
 from src.agents.web_agent import web_agent
+from src.models.records import RedditPost, Tweet
+
+def _posts(count, score, num_comments, is_self=True):
+    return [RedditPost.from_dict({'id': f"p{i}", 'title': 'Post', 'score': score, 'num_comments': num_comments,
+                                  'is_self': is_self}) for i in range(count)]
 
 class TestTwitterAgent(unittest.TestCase):
     """Test suite for the Twitter agent."""
@@ -33,6 +38,21 @@ class TestTwitterAgent(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIsInstance(result, list)
 
+    @patch('src.agents.twitter_agent.get_twitter_service')
+    def test_user_timeline_dates(self, mock_service):
+        """Test that timeline tweets are returned with ISO dates rather than epoch seconds."""
+        mock_service.return_value.get_users.return_value = {
+            'acme': {'id': '1', 'username': 'acme', 'name': "Acme", 'description': ""}
+        }
+        mock_service.return_value.iter_user_timeline.return_value = iter([
+            Tweet(id='10', text="Launch day", created_at=1700000000, author_id='1', conversation_id='10',
+                  like_count=3, retweet_count=1, reply_count=0, quote_count=0)
+        ])
+
+        result = get_user_timeline('acme')
+
+        self.assertEqual(result['tweets'][0]['created_at'], "2023-11-14T22:13:20+00:00")
+
 class TestRedditAgent(unittest.TestCase):
     """Test suite for the Reddit agent."""
     
@@ -67,6 +87,41 @@ class TestRedditAgent(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIsInstance(result, dict)
 
+class TestSubredditRanking(unittest.TestCase):
+    """Test suite for the batched subreddit comparison."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.batch = [
+            {'name': 'quiet', 'about': {'subscribers': 1000000}, 'rules': [], 'hot_posts': _posts(10, 1, 0)},
+            {'name': 'lively', 'about': {'subscribers': 50000}, 'rules': [{'short_name': 'No spam'}],
+             'hot_posts': _posts(10, 500, 80, is_self=False) + _posts(2, 500, 80)},
+            {'name': 'gone', 'about': None, 'rules': [], 'hot_posts': []}
+        ]
+
+    def test_rank_subreddits(self):
+        """Test that subreddits are ranked on audience and engagement, missing ones last."""
+        ranked = _rank_subreddits(self.batch)
+
+        self.assertEqual([row['name'] for row in ranked], ['lively', 'quiet', 'gone'])
+        lively = ranked[0]
+        self.assertEqual((lively['avg_score'], lively['avg_comments']), (500, 80))
+        self.assertEqual((lively['self_posts'], lively['posts'], lively['rules']), (2, 12, 1))
+        self.assertEqual((ranked[2]['exists'], ranked[2]['rank_score']), (False, 0))
+
+    @patch('src.agents.reddit_agent.get_reddit_service')
+    def test_analyze_subreddits(self, mock_service):
+        """Test that the comparison table lists ranked subreddits from a single batch call."""
+        mock_service.return_value.get_subreddits_batch.return_value = self.batch
+
+        result = analyze_subreddits(['quiet', 'lively', 'gone'])
+
+        mock_service.return_value.get_subreddits_batch.assert_called_once_with(['quiet', 'lively', 'gone'],
+                                                                               posts_per_subreddit=10)
+        self.assertIn("| 1 | r/lively | 50000 | 500 | 80 | 2/12 | 1 |", result)
+        self.assertIn("| 2 | r/quiet | 1000000 | 1 | 0 | 10/10 | 0 |", result)
+        self.assertIn("Subreddits introuvables ou privés: gone", result)
+
 class TestWebAgent(unittest.TestCase):
     """Test suite for the Web agent."""
     
@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+from contextvars import ContextVar
+from unittest.mock import patch
+
+from src.utils.aio import gather_bounded, run_blocking
+from src.utils.decorators import RateLimiter, rate_limit
+
+request_id: ContextVar[str] = ContextVar('request_id', default='none')
+
+class TestGatherBounded(unittest.IsolatedAsyncioTestCase):
+    """Test suite for bounded concurrent gathering."""
+
+    async def test_limits_concurrency_and_keeps_order(self):
+        """Test that no more than `limit` tasks run at once and results keep the task order."""
+        running, peak = 0, 0
+
+        async def work(i):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (5 - i))
+            running -= 1
+            return i
+
+        results = await gather_bounded((lambda i=i: work(i) for i in range(5)), limit=2)
+
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+        self.assertEqual(peak, 2)
+
+    async def test_return_exceptions(self):
+        """Test that failures are returned in place when return_exceptions is set."""
+        async def fail():
+            raise ValueError("boom")
+
+        async def ok():
+            return 1
+
+        results = await gather_bounded([ok(), fail()], limit=1, return_exceptions=True)
+
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], ValueError)
+
+class TestRunBlocking(unittest.IsolatedAsyncioTestCase):
+    """Test suite for running blocking calls off the event loop."""
+
+    async def test_carries_caller_context(self):
+        """Test that the blocking call sees the caller's context variables."""
+        request_id.set('run-1')
+
+        self.assertEqual(await run_blocking(request_id.get), 'run-1')
+        self.assertEqual(await run_blocking(lambda a, b=0: a + b, 1, b=2), 3)
+
+class TestAsyncRateLimit(unittest.IsolatedAsyncioTestCase):
+    """Test suite for rate limiting of coroutines."""
+
+    async def test_acquire_async_sleeps_when_budget_spent(self):
+        """Test that a spent budget waits with asyncio.sleep, not time.sleep."""
+        limiter = RateLimiter(calls=2, period=60)
+
+        with patch('src.utils.decorators.asyncio.sleep') as mock_sleep, \
+                patch('src.utils.decorators.time.sleep') as mock_time_sleep:
+            await limiter.acquire_async()
+            await limiter.acquire_async()
+            mock_sleep.assert_not_called()
+            await limiter.acquire_async()
+            mock_sleep.assert_called_once()
+            self.assertAlmostEqual(mock_sleep.call_args[0][0], 60, delta=1)
+            mock_time_sleep.assert_not_called()
+
+    async def test_coroutines_share_budget_with_sync_functions(self):
+        """Test that a coroutine and a function with the same key share one budget."""
+        @rate_limit(calls=2, period=60, key='test-async-shared')
+        def sync_call():
+            return 1
+
+        @rate_limit(calls=2, period=60, key='test-async-shared')
+        async def async_call():
+            return 2
+
+        self.assertIs(sync_call.limiter, async_call.limiter)
+        with patch('src.utils.decorators.asyncio.sleep') as mock_sleep:
+            self.assertEqual(sync_call(), 1)
+            self.assertEqual(await async_call(), 2)
+            mock_sleep.assert_not_called()
+            await async_call()
+            mock_sleep.assert_called_once()
+
+    def test_reserve_books_successive_windows(self):
+        """Test that reservations beyond the budget are booked into later windows."""
+        limiter = RateLimiter(calls=1, period=10)
+
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertAlmostEqual(limiter.reserve(), 10, delta=0.5)
+        self.assertAlmostEqual(limiter.reserve(), 20, delta=0.5)
+
+if __name__ == '__main__':
+    unittest.main()
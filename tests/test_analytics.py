@@ -0,0 +1,136 @@
+import time
+import unittest
+from datetime import datetime, timezone
+import numpy as np
+from src.analytics.engagement import EngagementData, format_summary
+from src.analytics.posting_times import PostingTimeCalculator, hour_of_week, posting_windows, format_windows
+from src.analytics.influencers import score_influencers
+
+class TestEngagementData(unittest.TestCase):
+    """Test suite for the vectorized engagement analytics."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.posts = [
+            {'id': str(i), 'title': 'x' * (10 + i), 'score': 10 + i, 'num_comments': 5, 'created_utc': 1700000000 + i}
+            for i in range(20)
+        ]
+        self.posts.append({'id': 'viral', 'title': 'short', 'score': 5000, 'num_comments': 800, 'created_utc': 1700000100})
+
+    def test_from_reddit_posts(self):
+        """Test loading Reddit posts into columns."""
+        data = EngagementData.from_reddit_posts(self.posts)
+
+        self.assertEqual(len(data), 21)
+        self.assertEqual(data.engagement[0], 15)
+        self.assertEqual(data.text_length[1], 11)
+
+    def test_from_tweets(self):
+        """Test loading tweets with public metrics and datetime timestamps."""
+        tweets = [{
+            'id': 1,
+            'text': 'hello',
+            'created_at': datetime(2024, 1, 1, tzinfo=timezone.utc),
+            'metrics': {'like_count': 3, 'retweet_count': 1, 'reply_count': 2, 'quote_count': 0}
+        }]
+        data = EngagementData.from_tweets(tweets)
+
+        self.assertEqual(data.engagement[0], 6)
+        self.assertEqual(data.comments[0], 2)
+        self.assertEqual(data.created_utc[0], datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
+    def test_outliers(self):
+        """Test that the viral post is flagged as an outlier."""
+        outliers = EngagementData.from_reddit_posts(self.posts).outliers()
+
+        self.assertEqual([o['id'] for o in outliers], ['viral'])
+
+    def test_length_correlation(self):
+        """Test correlation between title length and engagement."""
+        data = EngagementData.from_reddit_posts(self.posts[:20])
+        correlation = data.length_correlation()
+
+        self.assertAlmostEqual(correlation['pearson'], 1.0)
+        self.assertAlmostEqual(correlation['spearman'], 1.0)
+
+    def test_summary_and_format(self):
+        """Test the full summary on data and on an empty sample."""
+        summary = EngagementData.from_reddit_posts(self.posts).summary()
+
+        self.assertEqual(summary['items'], 21)
+        self.assertEqual(summary['score_per_comment']['items_with_comments'], 21)
+        self.assertIn('Outliers: 1', format_summary(summary))
+        self.assertEqual(
+            format_summary(EngagementData.from_reddit_posts([]).summary()),
+            "No engagement data available"
+        )
+
+class TestPostingWindows(unittest.TestCase):
+    """Test suite for the best-posting-time computation."""
+
+    def test_hour_of_week(self):
+        """Test mapping timestamps to the UTC hour of the week."""
+        monday_9am = datetime(2024, 1, 1, 9, tzinfo=timezone.utc).timestamp()
+        sunday_23pm = datetime(2024, 1, 7, 23, tzinfo=timezone.utc).timestamp()
+
+        hours = hour_of_week(np.array([monday_9am, sunday_23pm]))
+
+        self.assertEqual(hours.tolist(), [9, 167])
+
+    def test_posting_windows_ranking(self):
+        """Test that the best-performing hour ranks first with higher confidence."""
+        monday_9am = datetime(2024, 1, 1, 9, tzinfo=timezone.utc).timestamp()
+        friday_18pm = datetime(2024, 1, 5, 18, tzinfo=timezone.utc).timestamp()
+        posts = [{'id': f"m{i}", 'score': 200, 'num_comments': 20, 'created_utc': monday_9am + i * 604800} for i in range(10)]
+        posts += [{'id': f"f{i}", 'score': 5, 'num_comments': 1, 'created_utc': friday_18pm + i * 604800} for i in range(3)]
+
+        windows = posting_windows(EngagementData.from_reddit_posts(posts))
+
+        self.assertEqual((windows[0]['day'], windows[0]['hour_utc'], windows[0]['posts']), ('Monday', 9, 10))
+        self.assertEqual((windows[1]['day'], windows[1]['hour_utc']), ('Friday', 18))
+        self.assertGreater(windows[0]['confidence'], windows[1]['confidence'])
+        self.assertIn('| 1 | Monday | 09:00 | 10 |', format_windows(windows))
+
+    def test_immature_reddit_posts_flagged(self):
+        """Test that posts still collecting their score are left out, or flagged when nothing else is left."""
+        now = time.time()
+        fresh = [{'id': f"n{i}", 'score': 1, 'num_comments': 0, 'created_utc': now - i * 600} for i in range(5)]
+        old = [{'id': f"o{i}", 'score': 50, 'num_comments': 5, 'created_utc': now - 3 * 86400} for i in range(2)]
+        calculator = PostingTimeCalculator()
+
+        mixed = calculator._result('r/python', EngagementData.from_reddit_posts(fresh + old), 0, 10)
+        immature = calculator._result('r/python', EngagementData.from_reddit_posts(fresh), 0, 10)
+
+        self.assertEqual((mixed['sample_size'], mixed['immature']), (2, False))
+        self.assertEqual((immature['sample_size'], immature['immature']), (5, True))
+        self.assertIn("Warning", format_windows(immature['windows'], immature=True))
+
+class TestInfluencerScoring(unittest.TestCase):
+    """Test suite for the influencer scoring."""
+
+    def test_ranks_reach_engagement_and_recency(self):
+        """Test that a large, engaging, active author outranks the others."""
+        now = 1700000000.0
+        users = {
+            '1': {'username': 'big', 'followers_count': 100000},
+            '2': {'username': 'small', 'followers_count': 50},
+            '3': {'username': 'stale', 'followers_count': 1000}
+        }
+        metrics = lambda likes: {'like_count': likes, 'retweet_count': 0, 'reply_count': 0, 'quote_count': 0}
+        tweets = [
+            {'id': 1, 'author_id': 1, 'created_at': now - 3600, 'metrics': metrics(500)},
+            {'id': 2, 'author_id': 1, 'created_at': now - 7200, 'metrics': metrics(300)},
+            {'id': 3, 'author_id': 2, 'created_at': now - 3600, 'metrics': metrics(2)},
+            {'id': 4, 'author_id': 3, 'created_at': now - 30 * 86400, 'metrics': metrics(20)},
+            {'id': 5, 'author_id': 99, 'created_at': now, 'metrics': metrics(1)}
+        ]
+
+        ranked = score_influencers(tweets, users, now=now)
+
+        self.assertEqual([a['username'] for a in ranked], ['big', 'stale', 'small'])
+        self.assertEqual(ranked[0]['tweets_in_sample'], 2)
+        self.assertAlmostEqual(ranked[0]['score'], 1.0)
+        self.assertEqual(score_influencers([], users), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from src.utils.cache import TieredCache
+
+class TestTieredCache(unittest.TestCase):
+    """Test suite for the TieredCache class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.db')
+        self.cache = TieredCache(self.path, ttls={'rules': 3600, 'hot': 60}, max_entries=2)
+
+    def tearDown(self):
+        """Clean up temporary files."""
+        self.tmpdir.cleanup()
+
+    def test_get_or_fetch_counts_saved_calls(self):
+        """Test that hits skip the fetch and count the saved API calls."""
+        fetch = Mock(return_value=[{'short_name': 'Be nice'}])
+
+        first = self.cache.get_or_fetch('rules', 'Python', fetch, cost=2)
+        second = self.cache.get_or_fetch('rules', 'python', fetch, cost=2)
+
+        self.assertEqual(first, second)
+        fetch.assert_called_once()
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['api_calls_saved'], 2)
+
+    def test_entries_expire_per_data_class(self):
+        """Test that each data class uses its own TTL."""
+        with patch('src.utils.cache.time.time', return_value=1000.0):
+            self.cache.set('rules', 'python', ['rule'])
+            self.cache.set('hot', 'python:10', ['post'])
+
+        with patch('src.utils.cache.time.time', return_value=1000.0 + 120):
+            self.assertEqual(self.cache.get('rules', 'python'), ['rule'])
+            self.assertIsNone(self.cache.get('hot', 'python:10'))
+
+    def test_persistent_layer_survives_lru_eviction(self):
+        """Test that entries evicted from memory are read back from SQLite."""
+        for name in ('a', 'b', 'c'):
+            self.cache.set('rules', name, [name])
+
+        self.assertEqual(len(self.cache._memory), 2)
+        self.assertEqual(self.cache.get('rules', 'a'), ['a'])
+
+        reopened = TieredCache(self.path, ttls={'rules': 3600, 'hot': 60})
+        self.assertEqual(reopened.get('rules', 'b'), ['b'])
+
+    def test_invalidate(self):
+        """Test explicit invalidation by key and by prefix."""
+        self.cache.set('rules', 'python', ['rule'])
+        self.cache.set('hot', 'python:10', ['post'])
+
+        self.cache.invalidate('rules', 'python')
+        self.cache.invalidate('hot', prefix='python:')
+
+        self.assertIsNone(self.cache.get('rules', 'python'))
+        self.assertIsNone(self.cache.get('hot', 'python:10'))
+
+    def test_unknown_data_class(self):
+        """Test that storing an undeclared data class is rejected."""
+        with self.assertRaises(ValueError):
+            self.cache.set('comments', 'abc', [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.services.job_service import JobManager
+from src.utils.cancellation import (
+    CancelToken, RunCancelled, cancel_scope, cancellable_sleep, check_cancelled, interrupt_on_cancel
+)
+from src.utils.decorators import RateLimiter
+from src.utils.model_router import ModelRouter
+
+class TestCancellation(unittest.TestCase):
+    """Test suite for cooperative cancellation of runs."""
+
+    def test_check_outside_a_run(self):
+        """Test that checks are no-ops without a current token."""
+        check_cancelled()
+
+    def test_cancelled_token_stops_calls(self):
+        """Test that checks raise once the run is cancelled, keeping the first reason."""
+        with cancel_scope() as token:
+            check_cancelled()
+            token.cancel('client disconnected')
+            token.cancel('server shutdown')
+            with self.assertRaises(RunCancelled) as context:
+                check_cancelled('fetch')
+        self.assertIn('client disconnected', str(context.exception))
+
+    def test_sleep_wakes_up_on_cancel(self):
+        """Test that a long wait ends as soon as the run is cancelled."""
+        token = CancelToken()
+        threading.Timer(0.05, token.cancel).start()
+        start = time.monotonic()
+        with cancel_scope(token), self.assertRaises(RunCancelled):
+            cancellable_sleep(30)
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_rate_limiter_stops_cancelled_runs(self):
+        """Test that no rate limited call starts in a cancelled run."""
+        limiter = RateLimiter(calls=10, period=60)
+        with cancel_scope() as token:
+            limiter.acquire()
+            token.cancel()
+            with self.assertRaises(RunCancelled):
+                limiter.acquire()
+
+    def test_model_router_stops_cancelled_runs(self):
+        """Test that no LLM call starts in a cancelled run."""
+        router = ModelRouter(routes={'summarize': {'models': ['a'], 'slo': 5.0}})
+        fn = MagicMock()
+        with cancel_scope() as token:
+            token.cancel()
+            with self.assertRaises(RunCancelled):
+                router.call('summarize', fn)
+        fn.assert_not_called()
+
+    def test_agent_interrupted_once_cancelled(self):
+        """Test that the step callback stops the agent only after cancellation."""
+        agent = MagicMock()
+        with cancel_scope() as token:
+            interrupt_on_cancel(None, agent=agent)
+            agent.interrupt.assert_not_called()
+            token.cancel()
+            interrupt_on_cancel(None, agent=agent)
+        agent.interrupt.assert_called_once()
+
+class TestJobManager(unittest.TestCase):
+    """Test suite for cancellable background jobs."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.manager = JobManager()
+
+    @staticmethod
+    def analysis(url, cancel_token, run_id):
+        with cancel_scope(cancel_token):
+            try:
+                for _ in range(100):
+                    cancellable_sleep(0.05)
+            except RunCancelled:
+                return {'status': 'cancelled', 'run_id': run_id, 'url': url}
+        return {'status': 'success', 'run_id': run_id, 'url': url}
+
+    def test_cancel_job(self):
+        """Test that a cancelled job stops and reports it."""
+        job = self.manager.submit(self.analysis, 'https://example.com')
+        self.assertEqual(job.to_dict()['status'], 'running')
+
+        self.assertTrue(self.manager.cancel(job.id, 'cancelled by client'))
+        self.assertTrue(job.done.wait(5))
+        self.assertEqual(job.result['status'], 'cancelled')
+        self.assertEqual(job.result['run_id'], job.id)
+        self.assertFalse(self.manager.cancel(job.id))
+
+        self.manager.forget(job.id)
+        self.assertIsNone(self.manager.get(job.id))
+
+    def test_forgotten_job_dropped_when_done(self):
+        """Test that a job forgotten while running is dropped once it stops."""
+        job = self.manager.submit(self.analysis, 'https://example.com')
+
+        self.manager.cancel(job.id, 'client disconnected')
+        self.manager.forget(job.id)
+        self.assertTrue(job.done.wait(5))
+
+        self.assertEqual(self.manager.list(), [])
+
+    def test_cancel_one_of_two_concurrent_jobs(self):
+        """Test that cancelling a job interrupts its own agent only, the other job finishing normally."""
+        class Orchestrator:
+            # Stands for OrchestratorAgent: an agent stopped by the interrupt_on_cancel step callback
+            def __init__(self):
+                self.agent = MagicMock(interrupted=False)
+                self.agent.interrupt.side_effect = lambda: setattr(self.agent, 'interrupted', True)
+
+            def run_app(self, url, cancel_token, run_id):
+                with cancel_scope(cancel_token) as token:
+                    for _ in range(20):
+                        interrupt_on_cancel(None, agent=self.agent)
+                        if self.agent.interrupted:
+                            return {'status': 'cancelled' if token.cancelled else 'error', 'run_id': run_id}
+                        time.sleep(0.01)
+                return {'status': 'success', 'run_id': run_id}
+
+        # As in app.py: one orchestrator per job
+        jobs = [self.manager.submit(lambda *args, **kwargs: Orchestrator().run_app(*args, **kwargs),
+                                    f"https://example.com/{i}") for i in range(2)]
+        self.manager.cancel(jobs[0].id, 'client disconnected')
+
+        self.assertTrue(all(job.done.wait(5) for job in jobs))
+        self.assertEqual([job.result['status'] for job in jobs], ['cancelled', 'success'])
+
+    def test_cancel_all_on_shutdown(self):
+        """Test that every running job is cancelled and awaited."""
+        jobs = [self.manager.submit(self.analysis, f"https://example.com/{i}") for i in range(3)]
+
+        self.assertEqual(self.manager.cancel_all(wait=5), 3)
+        self.assertTrue(all(job.done.is_set() for job in jobs))
+        self.assertTrue(all(job.token.reason == 'server shutdown' for job in jobs))
+
+    def test_failing_job(self):
+        """Test that a job raising an error finishes with an error result."""
+        def run(cancel_token, run_id):
+            raise ValueError("boom")
+
+        job = self.manager.submit(run)
+        self.assertTrue(job.done.wait(5))
+        self.assertEqual(job.result['status'], 'error')
+        self.assertEqual(job.to_dict()['status'], 'error')
+
+if __name__ == '__main__':
+    unittest.main()
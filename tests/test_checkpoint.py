@@ -0,0 +1,94 @@
+import unittest
+from types import SimpleNamespace
+
+from smolagents.memory import ActionStep, PlanningStep, TaskStep, ToolCall
+from smolagents.models import ChatMessage, MessageRole
+from smolagents.monitoring import Timing
+
+from src.services.storage_service import DataStore
+from src.utils.checkpoint import RunCheckpoint, checkpoint_scope, checkpoint_step
+from src.utils.run_context import pin_fact, run_scope
+
+class TestRunCheckpoint(unittest.TestCase):
+    """Test suite for checkpointing and resuming runs."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.store = DataStore(':memory:')
+        self.steps = [
+            TaskStep(task="Analyze https://example.com"),
+            PlanningStep(
+                model_input_messages=[],
+                model_output_message=ChatMessage(role=MessageRole.ASSISTANT, content="1. Describe 2. Post"),
+                plan="1. Describe 2. Post",
+                timing=Timing(start_time=0, end_time=1)
+            ),
+            ActionStep(
+                step_number=1,
+                timing=Timing(start_time=0, end_time=1),
+                model_output="Thought: describe\ncode",
+                code_action="URLDescriptionAgent(task='https://example.com')",
+                observations="A SaaS for developers",
+                tool_calls=[ToolCall(name='python_interpreter', arguments='code', id='call_1')]
+            )
+        ]
+        self.agent = SimpleNamespace(memory=SimpleNamespace(steps=list(self.steps)))
+
+    def failed_step(self):
+        return ActionStep(step_number=2, timing=Timing(start_time=0), observations="partial",
+                          error=Exception("Reddit is down"))
+
+    def test_save_and_restore(self):
+        """Test that completed steps and pinned facts are restored, failed steps dropped."""
+        with run_scope():
+            pin_fact('company_profile', "CTOs of SaaS companies")
+            with checkpoint_scope(RunCheckpoint('run-1', 'https://example.com', self.agent, self.store)):
+                checkpoint_step(self.failed_step(), agent=self.agent)
+
+        saved = self.store.get_checkpoint('run-1')
+        self.assertEqual(saved['url'], 'https://example.com')
+        self.assertEqual(saved['steps'], 1)
+
+        agent = SimpleNamespace(memory=SimpleNamespace(steps=[]))
+        with run_scope() as report:
+            completed = RunCheckpoint('run-2', saved['url'], agent, self.store).restore(saved['state'])
+            facts = report.pinned_facts()
+
+        self.assertEqual(completed, 1)
+        self.assertEqual(facts, {'company_profile': "CTOs of SaaS companies"})
+        self.assertEqual([type(step) for step in agent.memory.steps], [TaskStep, PlanningStep, ActionStep])
+        step = agent.memory.steps[-1]
+        self.assertEqual(step.observations, "A SaaS for developers")
+        self.assertEqual(step.tool_calls[0].id, 'call_1')
+        # Restored steps can be sent to the model again
+        self.assertEqual(agent.memory.steps[1].to_messages()[0].content[0]['text'], "1. Describe 2. Post")
+        self.assertTrue(step.to_messages())
+
+    def test_orchestrator_step_not_yet_in_memory(self):
+        """Test that the step just finished by the orchestrator is saved."""
+        step = ActionStep(step_number=2, timing=Timing(start_time=0, end_time=1), observations="Posted")
+        with run_scope(), checkpoint_scope(RunCheckpoint('run-1', 'https://example.com', self.agent, self.store)):
+            checkpoint_step(step, agent=self.agent)
+            self.assertEqual(self.store.get_checkpoint('run-1')['steps'], 2)
+            # The step is added to the memory after the callbacks; steps of a managed
+            # agent called at the next step are not part of the orchestrator's memory
+            self.agent.memory.steps.append(step)
+            checkpoint_step(ActionStep(step_number=1, timing=Timing(start_time=0)), agent=SimpleNamespace())
+
+        self.assertEqual(self.store.get_checkpoint('run-1')['steps'], 2)
+
+    def test_no_checkpoint_outside_a_run(self):
+        """Test that the callback does nothing without a current checkpoint."""
+        checkpoint_step(self.steps[-1], agent=self.agent)
+
+    def test_delete(self):
+        """Test that a finished run's checkpoint is deleted."""
+        checkpoint = RunCheckpoint('run-1', 'https://example.com', self.agent, self.store)
+        checkpoint.save()
+        self.assertIsNotNone(self.store.get_checkpoint('run-1'))
+
+        checkpoint.delete()
+        self.assertIsNone(self.store.get_checkpoint('run-1'))
+
+if __name__ == '__main__':
+    unittest.main()
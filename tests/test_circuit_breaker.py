@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.utils.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerSession, CircuitOpenError,
+    get_circuit_breaker, is_dependency_failure
+)
+from src.utils.model_router import ModelRouter
+
+class ServerError(Exception):
+    status_code = 503
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test suite for per-dependency circuit breakers."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.breaker = CircuitBreaker('test', failure_rate=0.5, min_calls=4, window=60, cooldown=30)
+
+    def test_opens_at_failure_rate(self):
+        """Test that the circuit opens once enough calls fail, then fails fast."""
+        for ok in (True, False, True):
+            self.breaker._record(ok)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breaker.before_call()
+        self.assertEqual(context.exception.dependency, 'test')
+        self.assertGreater(context.exception.retry_after, 0)
+
+    def test_half_open_probe(self):
+        """Test that one probe goes through after the cooldown and its outcome decides the state."""
+        for _ in range(4):
+            self.breaker.record_failure()
+        with patch('src.utils.circuit_breaker.monotonic', return_value=self.breaker._opened_at + 31):
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+            self.assertTrue(self.breaker.allow())
+            # Only one probe at a time
+            self.assertFalse(self.breaker.allow())
+            self.breaker.record_failure()
+            self.assertEqual(self.breaker.state, OPEN)
+
+        with patch('src.utils.circuit_breaker.monotonic', return_value=self.breaker._opened_at + 31):
+            self.breaker.before_call()
+            self.breaker.record_success()
+            self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_client_errors_do_not_count(self):
+        """Test that errors caused by the request itself never open the circuit."""
+        for _ in range(10):
+            self.breaker.record_error(ValueError("bad request"))
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(is_dependency_failure(ServerError()))
+        self.assertTrue(is_dependency_failure(TimeoutError()))
+        self.assertFalse(is_dependency_failure(CircuitOpenError('x', 1)))
+
+    def test_session_breaks_per_host(self):
+        """Test that scraping sessions keep one circuit per host."""
+        session = CircuitBreakerSession(timeout=5)
+        with patch('requests.Session.request', return_value=MagicMock(status_code=503)):
+            for _ in range(5):
+                session.get('https://down.example.com/page')
+            with self.assertRaises(CircuitOpenError):
+                session.get('https://down.example.com/other')
+        with patch('requests.Session.request', return_value=MagicMock(status_code=200)):
+            self.assertEqual(session.get('https://up.example.com/').status_code, 200)
+        self.assertEqual(get_circuit_breaker('web:up.example.com').state, CLOSED)
+
+    def test_router_skips_open_provider(self):
+        """Test that the model router fails fast when every provider's circuit is open."""
+        router = ModelRouter(routes={'classify': {'models': ['deadprovider/a', 'deadprovider/b'], 'slo': 5.0}})
+        breaker = get_circuit_breaker('deadprovider')
+        for _ in range(5):
+            breaker.record_failure()
+        fn = MagicMock()
+
+        with self.assertRaises(CircuitOpenError):
+            router.call('classify', fn)
+        fn.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from src.utils.content_extractor import ContentExtractor
+
+def make_page(body):
+    return f"""<html><head><title>Acme</title><script>var tracking = 1;</script></head><body>
+    <div class="cookie-banner">We use cookies to improve your experience on this site, accept them all to continue.</div>
+    <nav><a href="/">Home</a> <a href="/pricing">Pricing</a></nav>
+    <div class="links"><a href="/about">About us</a> <a href="/blog">Blog</a> <a href="/careers">Careers</a></div>
+    <div id="content">
+        <h2>What we do</h2>
+        <p>{body}</p>
+        <p>Trusted by teams who ship every week, from early startups to large engineering organizations.</p>
+    </div>
+    <footer>Acme Inc. <a href="/terms">Terms</a></footer>
+    </body></html>"""
+
+class TestContentExtractor(unittest.TestCase):
+    """Test suite for the main-content extractor."""
+
+    def test_boilerplate_is_dropped(self):
+        """Test that navigation, banners, link lists and footers are removed."""
+        extraction = ContentExtractor().extract(
+            make_page("Acme builds reusable rockets that land on their own and fly again within a day."))
+
+        self.assertIn("Acme builds reusable rockets", extraction.text)
+        self.assertTrue(extraction.text.startswith("What we do"))
+        for junk in ("cookies", "Pricing", "Careers", "Terms", "tracking"):
+            self.assertNotIn(junk, extraction.text)
+        self.assertEqual(extraction.title, "Acme")
+        self.assertLess(extraction.tokens, extraction.raw_tokens)
+        self.assertGreater(extraction.reduction, 0.3)
+
+    def test_template_blocks_learned_across_pages(self):
+        """Test that blocks repeated on other pages of the site are dropped."""
+        extractor = ContentExtractor(template_min_pages=2)
+        for path in ('/a', '/b'):
+            extractor.extract(make_page(f"Page {path} explains one specific rocket feature in enough words to count as content."),
+                              f"https://acme.com{path}")
+
+        extraction = extractor.extract(
+            make_page("Page /c explains one specific rocket feature in enough words to count as content."), "https://acme.com/c")
+        other_site = ContentExtractor().extract(make_page("Another site with its own paragraph of decent length."),
+                                                "https://other.com/")
+
+        self.assertIn("Page /c explains", extraction.text)
+        self.assertNotIn("Trusted by teams", extraction.text)
+        self.assertEqual(extraction.template_blocks, 2)
+        self.assertIn("Trusted by teams", other_site.text)
+
+    def test_fingerprint_independent_of_pages_seen(self):
+        """Test that a page's fingerprint does not change once other pages taught the site's template."""
+        extractor = ContentExtractor(template_min_pages=2)
+        landing = make_page("Acme builds reusable rockets that land on their own and fly again within a day.")
+        first = extractor.extract(landing, "https://acme.com/")
+        for path in ('/pricing', '/about'):
+            extractor.extract(make_page(f"Page {path} explains one specific rocket feature in enough words to count."),
+                              f"https://acme.com{path}")
+
+        second = extractor.extract(landing, "https://acme.com/")
+
+        self.assertNotEqual(second.text, first.text)
+        self.assertEqual(second.fingerprint, first.fingerprint)
+
+    def test_pages_without_dense_text(self):
+        """Test that short landing pages keep their taglines."""
+        extraction = ContentExtractor().extract(
+            "<html><body><h1>Rockets, reusable.</h1><p>Fly more.</p><ul><li><a href='/'>Home</a></li></ul></body></html>")
+
+        self.assertEqual(extraction.text, "Rockets, reusable.\nFly more.")
+
+if __name__ == '__main__':
+    unittest.main()
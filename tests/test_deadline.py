@@ -0,0 +1,102 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from src.utils.aio import in_current_context
+from src.utils.deadline import (
+    DeadlineExceeded, DeadlineSession, call_timeout, check_deadline, deadline_scope,
+    interrupt_on_deadline, remaining_time
+)
+from src.utils.decorators import RateLimiter
+from src.utils.model_router import ModelRouter
+
+class TestDeadline(unittest.TestCase):
+    """Test suite for request deadline propagation."""
+
+    def test_no_deadline(self):
+        """Test that calls keep their own timeout outside a deadline scope."""
+        self.assertIsNone(remaining_time())
+        self.assertEqual(call_timeout(10), 10)
+        check_deadline()
+
+    def test_call_timeout_is_capped_by_remaining_time(self):
+        """Test that timeouts never exceed the time left."""
+        with deadline_scope(5):
+            self.assertLessEqual(call_timeout(10), 5)
+            self.assertEqual(call_timeout(1), 1)
+            self.assertLessEqual(call_timeout(None), 5)
+
+    def test_nested_scope_never_extends(self):
+        """Test that an inner budget cannot outlive the outer one."""
+        with deadline_scope(5):
+            with deadline_scope(60):
+                self.assertLessEqual(remaining_time(), 5)
+            with deadline_scope(1):
+                self.assertLessEqual(remaining_time(), 1)
+        self.assertIsNone(remaining_time())
+
+    def test_expired_deadline_raises(self):
+        """Test that no call starts once the deadline has passed."""
+        with deadline_scope(0):
+            with self.assertRaises(DeadlineExceeded):
+                call_timeout(10)
+            with self.assertRaises(TimeoutError):
+                check_deadline('fetch')
+
+    def test_rate_limit_wait_past_deadline_raises(self):
+        """Test that a rate limit wait longer than the time left fails instead of sleeping."""
+        limiter = RateLimiter(calls=1, period=60)
+        with deadline_scope(5), patch('src.utils.decorators.time.sleep') as mock_sleep:
+            limiter.acquire()
+            with self.assertRaises(DeadlineExceeded):
+                limiter.acquire()
+            mock_sleep.assert_not_called()
+
+    def test_deadline_reaches_thread_pools(self):
+        """Test that wrapped functions see the caller's deadline on pool threads."""
+        with deadline_scope(5), ThreadPoolExecutor(max_workers=2) as executor:
+            remaining = list(executor.map(in_current_context(lambda _: remaining_time()), range(3)))
+        self.assertTrue(all(r is not None and r <= 5 for r in remaining))
+
+    def test_session_caps_timeout(self):
+        """Test that the requests session always sends a timeout within the deadline."""
+        session = DeadlineSession(timeout=30)
+        with patch('requests.Session.request') as mock_request:
+            session.request('GET', 'https://example.com')
+            self.assertEqual(mock_request.call_args.kwargs['timeout'], 30)
+            with deadline_scope(5):
+                session.request('GET', 'https://example.com', timeout=(3, 10))
+            connect, read = mock_request.call_args.kwargs['timeout']
+            self.assertEqual(connect, 3)
+            self.assertLessEqual(read, 5)
+
+    def test_agent_interrupted_once_expired(self):
+        """Test that the step callback stops the agent only after the deadline."""
+        agent = MagicMock()
+        with deadline_scope(60):
+            interrupt_on_deadline(None, agent=agent)
+        agent.interrupt.assert_not_called()
+        with deadline_scope(0):
+            interrupt_on_deadline(None, agent=agent)
+        agent.interrupt.assert_called_once()
+
+    def test_model_router_respects_deadline(self):
+        """Test that LLM attempts get the remaining time and no fallback starts after the deadline."""
+        router = ModelRouter(routes={'plan': {'models': ['smart', 'fast'], 'slo': 30.0}})
+        timeouts = []
+
+        def call(model, timeout):
+            timeouts.append(timeout)
+            return model
+
+        with deadline_scope(5):
+            self.assertEqual(router.call('plan', call), 'smart')
+        self.assertLessEqual(timeouts[0], 5)
+
+        with deadline_scope(0):
+            with self.assertRaises(DeadlineExceeded):
+                router.call('plan', call)
+        self.assertEqual(len(timeouts), 1)
+
+if __name__ == '__main__':
+    unittest.main()
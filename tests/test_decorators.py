@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from src.utils.decorators import get_rate_limiter, rate_limit, run_memo
+from src.utils.run_context import run_scope
+
+class TestRateLimit(unittest.TestCase):
+    """Test suite for the rate limiting decorator."""
+
+    def test_shared_key_shares_budget(self):
+        """Test that functions decorated with the same key share one budget."""
+        @rate_limit(calls=2, period=60, key='test-shared')
+        def first():
+            return 1
+
+        @rate_limit(calls=2, period=60, key='test-shared')
+        def second():
+            return 2
+
+        self.assertIs(first.limiter, second.limiter)
+        self.assertIs(first.limiter, get_rate_limiter('test-shared', 2, 60))
+
+        with patch('src.utils.decorators.time.sleep') as mock_sleep:
+            first()
+            second()
+            mock_sleep.assert_not_called()
+            first()
+            mock_sleep.assert_called_once()
+
+    def test_unkeyed_limiters_are_independent(self):
+        """Test that functions without a key keep their own budget."""
+        @rate_limit(calls=1, period=60)
+        def first():
+            return 1
+
+        @rate_limit(calls=1, period=60)
+        def second():
+            return 2
+
+        with patch('src.utils.decorators.time.sleep') as mock_sleep:
+            self.assertEqual(first(), 1)
+            self.assertEqual(second(), 2)
+            mock_sleep.assert_not_called()
+
+class TestRunMemo(unittest.TestCase):
+    """Test suite for run-scoped tool memoization."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.fetch = MagicMock(side_effect=lambda subreddit, limit=10: {'success': True, 'posts': [subreddit] * limit})
+
+        @run_memo(bypass=lambda args: args['limit'] > 100)
+        def analyze(subreddit, limit=10):
+            return self.fetch(subreddit, limit)
+        self.analyze = analyze
+
+    def test_repeated_call_reused_within_run(self):
+        """Test that the same arguments, however passed, hit the memo and are counted."""
+        with run_scope() as report:
+            first = self.analyze('startups')
+            first['posts'].clear()
+            again = self.analyze(subreddit='startups', limit=10)
+            self.analyze('python')
+
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertEqual(len(again['posts']), 10)
+        counters = report.to_dict()['counters']
+        self.assertEqual(counters['tool_memo_hits'], 1)
+        self.assertEqual(counters['tool_memo_hits:analyze'], 1)
+
+    def test_not_shared_across_runs(self):
+        """Test that every run and calls outside a run start from scratch."""
+        with run_scope():
+            self.analyze('startups')
+        with run_scope():
+            self.analyze('startups')
+        self.analyze('startups')
+        self.analyze('startups')
+
+        self.assertEqual(self.fetch.call_count, 4)
+
+    def test_failures_and_bypass_not_reused(self):
+        """Test that errors and bypassed calls always call the tool."""
+        self.fetch.side_effect = [{'success': False, 'error': 'timeout'}, ValueError('down'), {'success': True}]
+        with run_scope():
+            self.assertFalse(self.analyze('startups')['success'])
+            with self.assertRaises(ValueError):
+                self.analyze('startups')
+            self.assertTrue(self.analyze('startups')['success'])
+
+            self.fetch.side_effect = None
+            self.fetch.return_value = {'success': True}
+            self.analyze('startups', limit=500)
+            self.analyze('startups', limit=500)
+
+        self.assertEqual(self.fetch.call_count, 5)
+
+if __name__ == '__main__':
+    unittest.main()
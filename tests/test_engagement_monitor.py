@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.models.records import Tweet
+from src.services.engagement_monitor import EngagementMonitor
+from src.services.publish_queue import PublishQueue
+from src.services.storage_service import DataStore
+
+def comment(id, link_id, parent_id=None, author='alice', kind='comment'):
+    return {'id': id, 'kind': kind, 'author': author, 'body': f"comment {id}", 'subreddit': 'python',
+            'link_id': link_id, 'parent_id': parent_id or link_id,
+            'permalink': f"https://reddit.com/r/python/comments/{id}", 'created_utc': 1700000000}
+
+def mention(id, conversation_id, author_id='7'):
+    return Tweet(id=id, text=f"@us tweet {id}", created_at=1700000000, author_id=author_id,
+                 conversation_id=conversation_id, like_count=0, retweet_count=0, reply_count=0, quote_count=0)
+
+class TestEngagementMonitor(unittest.TestCase):
+    """Test suite for the multiplexed engagement monitor."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.store = DataStore(':memory:')
+        self.queue = PublishQueue(':memory:')
+        self.publish('reddit_post', {'subreddit': 'python', 'title': "Hello", 'content': "World"}, {'id': 'p1'})
+        self.publish('reddit_comment', {'post_url': None, 'text': "Thanks"}, {'id': 'c1'})
+        self.publish('tweet', {'text': "1/2"}, {'id': '100'})
+
+        self.reddit = MagicMock()
+        self.reddit.get_inbox.return_value = []
+        self.reddit.get_new_comments.return_value = []
+        self.twitter = MagicMock()
+        self.twitter.get_own_user_id.return_value = '1'
+        self.twitter.iter_mentions.return_value = iter([])
+        self.handled = []
+        self.monitor = EngagementMonitor(self.reddit, self.twitter, store=self.store, publish_queue=self.queue,
+                                         handler=self.handled.append, poll_interval=0)
+        self.monitor.reddit_username = 'us'
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.queue.close()
+
+    def publish(self, action, payload, result):
+        job = self.queue.enqueue(action, payload)
+        self.queue.complete(job['id'], result)
+
+    def test_one_request_per_source(self):
+        """Test that all watched posts are covered by one request per source."""
+        for i in range(50):
+            self.publish('reddit_post', {'subreddit': f"sub{i % 5}", 'title': f"Post {i}", 'content': ""},
+                         {'id': f"x{i}"})
+
+        self.monitor.poll_once()
+
+        self.assertEqual(self.reddit.get_inbox.call_count, 1)
+        self.assertEqual(self.reddit.get_new_comments.call_count, 1)
+        self.assertEqual(len(self.reddit.get_new_comments.call_args.args[0]), 6)
+        self.assertEqual(self.twitter.iter_mentions.call_count, 1)
+
+    def test_events_deduplicated(self):
+        """Test that a comment seen in the inbox and in the subreddit's comments is one event, once."""
+        self.reddit.get_inbox.return_value = [comment('a', 't3_p1')]
+        self.reddit.get_new_comments.return_value = [comment('a', 't3_p1'), comment('b', 't3_p1', 't1_a')]
+
+        first = self.monitor.poll_once()
+        second = self.monitor.poll_once()
+
+        self.assertEqual([event['id'] for event in first], ['t1_a', 't1_b'])
+        self.assertEqual(second, [])
+        self.assertEqual(self.monitor.events.qsize(), 2)
+
+    def test_reddit_comments_filtered(self):
+        """Test that only others' comments in our threads are kept, with the item they answer."""
+        self.reddit.get_new_comments.return_value = [
+            comment('a', 't3_p1'),
+            comment('b', 't3_p1', 't1_c1'),
+            comment('c', 't3_other'),
+            comment('d', 't3_p1', author='Us')
+        ]
+
+        events = self.monitor.poll_once()
+
+        self.assertEqual([(event['id'], event['target_id']) for event in events],
+                         [('t1_a', 'p1'), ('t1_b', 'c1')])
+
+    def test_reddit_comments_resume_after_last_seen(self):
+        """Test that a poll reads every subreddit comment back to the newest one of the previous poll."""
+        self.reddit.get_new_comments.return_value = [comment('b', 't3_p1'), comment('a', 't3_p1')]
+        self.monitor.poll_once()
+        self.assertNotIn('after_id', self.reddit.get_new_comments.call_args.kwargs)
+
+        # More than a page of new comments since
+        self.reddit.get_new_comments.return_value = [comment(f"c{i:03d}", 't3_p1') for i in range(250, 0, -1)]
+        events = self.monitor.poll_once()
+
+        self.assertEqual(self.reddit.get_new_comments.call_args.kwargs['after_id'], 'b')
+        self.assertEqual(len(events), 250)
+        self.monitor.poll_once()
+        self.assertEqual(self.reddit.get_new_comments.call_args.kwargs['after_id'], 'c250')
+
+    def test_twitter_mentions(self):
+        """Test that replies in our threads are told apart from other mentions, our own tweets skipped."""
+        self.twitter.iter_mentions.return_value = iter([mention('201', '100'), mention('202', '999'),
+                                                        mention('203', '100', author_id='1')])
+
+        events = self.monitor.poll_once()
+
+        self.assertEqual([(event['id'], event['kind'], event['target_id']) for event in events],
+                         [('201', 'reply', '100'), ('202', 'mention', None)])
+        # Mentions past a cap would never be read: the next poll resumes after the newest one
+        self.assertIsNone(self.twitter.iter_mentions.call_args.kwargs['max_tweets'])
+
+    def test_failing_source_does_not_stop_others(self):
+        """Test that a failing platform does not keep the others from being polled."""
+        self.reddit.get_inbox.side_effect = Exception("Reddit is down")
+        self.twitter.iter_mentions.return_value = iter([mention('201', '100')])
+
+        events = self.monitor.poll_once()
+
+        self.assertEqual([event['id'] for event in events], ['201'])
+
+    def test_events_handled_once(self):
+        """Test that new events are handed to the handler and marked handled."""
+        self.reddit.get_inbox.return_value = [comment('m', None, kind='message')]
+        self.monitor.poll_once()
+        self.monitor.stop()
+
+        self.monitor._handle_events()
+
+        self.assertEqual([event['id'] for event in self.handled], ['t4_m'])
+        self.assertEqual(self.store.get_unhandled_events(), [])
+
+    def test_unhandled_events_handed_again(self):
+        """Test that events the handler failed on are handed to it again on the next start."""
+        self.monitor.handler = MagicMock(side_effect=Exception("Handler failed"))
+        self.reddit.get_inbox.return_value = [comment('a', 't3_p1')]
+        self.monitor.poll_once()
+        self.monitor.stop()
+        self.monitor._handle_events()
+        self.assertEqual(len(self.store.get_unhandled_events()), 1)
+
+        self.reddit.get_inbox.return_value = []
+        self.monitor.handler = self.handled.append
+        self.monitor.run()
+
+        self.assertEqual([event['id'] for event in self.handled], ['t1_a'])
+        self.assertEqual(self.store.get_unhandled_events(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from src.services.export_service import ExportService, parquet_available
+from src.services.storage_service import DataStore
+
+class TestExportService(unittest.TestCase):
+    """Test suite for the JSONL/Parquet export service."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.store = DataStore(':memory:')
+        self.store.save_reddit_posts([
+            {'id': f"p{i}", 'subreddit': 'python', 'title': f"Post {i}", 'score': i, 'num_comments': 1,
+             'is_self': True, 'created_utc': 1700000000 + i * 86400}
+            for i in range(5)
+        ])
+        self.store.save_tweets([{
+            'id': 1, 'author_id': 7, 'text': 'hello', 'created_at': 1700000000,
+            'metrics': {'like_count': 3, 'reply_count': 1, 'retweet_count': 2, 'quote_count': 0}
+        }])
+        self.store.save_run('run1', 'https://example.com', 'success', result={'posts': 3}, started_at=1700000000)
+        self.service = ExportService(self.store)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.tmp.cleanup()
+
+    def test_batches_cover_date_range(self):
+        """Test that batched reads return every row of the range exactly once."""
+        batches = list(self.service.iter_rows('reddit_posts', since=1700086400, until=1700345600, batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual([row['id'] for batch in batches for row in batch], ['p1', 'p2', 'p3'])
+
+    def test_jsonl_export(self):
+        """Test JSONL export of tweets and runs."""
+        path = os.path.join(self.tmp.name, 'tweets.jsonl')
+
+        count = self.service.export('tweets', path)
+
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(count, 1)
+        self.assertEqual(rows[0]['like_count'], 3)
+        self.assertEqual(rows[0]['author_id'], '7')
+        self.assertFalse(os.path.exists(path + '.tmp'))
+
+        self.service.export('runs', os.path.join(self.tmp.name, 'runs.jsonl'))
+        with open(os.path.join(self.tmp.name, 'runs.jsonl')) as f:
+            run = json.loads(f.readline())
+        self.assertEqual(json.loads(run['result']), {'posts': 3})
+        self.assertGreaterEqual(run['duration'], 0)
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_parquet_export_row_groups(self):
+        """Test that each batch becomes a Parquet row group."""
+        import pyarrow.parquet as pq
+        path = os.path.join(self.tmp.name, 'reddit_posts.parquet')
+
+        count = self.service.export('reddit_posts', path, format='parquet', batch_size=2)
+
+        parquet_file = pq.ParquetFile(path)
+        self.assertEqual(count, 5)
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        self.assertEqual(parquet_file.read().column('score').to_pylist(), [0, 1, 2, 3, 4])
+
+    def test_invalid_arguments(self):
+        """Test that unknown datasets and formats are rejected."""
+        path = os.path.join(self.tmp.name, 'out')
+        with self.assertRaises(ValueError):
+            self.service.export('comments', path)
+        with self.assertRaises(ValueError):
+            self.service.export('tweets', path, format='csv')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from src.services.storage_service import DataStore
+from src.utils.fingerprint import content_fingerprint
+from src.utils.run_context import current_report, record_section, run_scope
+
+class TestFingerprint(unittest.TestCase):
+    """Test suite for content fingerprints and incremental re-analysis."""
+
+    def test_layout_noise_is_ignored(self):
+        """Test that whitespace and case changes keep the fingerprint."""
+        original = content_fingerprint("Acme builds  rockets.\nFast ones.")
+
+        self.assertEqual(content_fingerprint("  acme builds rockets. \n\n\tFast ones. "), original)
+        self.assertNotEqual(content_fingerprint("Acme builds rockets. Slow ones."), original)
+        self.assertIsNone(content_fingerprint(None))
+
+    def test_store_fingerprints_pages_and_analyses(self):
+        """Test that pages are fingerprinted and analyses found by input fingerprint."""
+        store = DataStore(':memory:')
+        store.save_page('https://example.com', 'Acme builds rockets.')
+        fingerprint = store.get_page('https://example.com')['fingerprint']
+        store.save_analysis('description', fingerprint, 'A rocket company.', url='https://example.com')
+
+        self.assertEqual(fingerprint, content_fingerprint('acme builds rockets.'))
+        self.assertEqual(store.get_analysis('description', fingerprint)['content'], 'A rocket company.')
+        self.assertIsNone(store.get_analysis('profile', fingerprint))
+
+    def test_run_report_sections(self):
+        """Test that sections are recorded on the current run only."""
+        record_section('profile', 'reused')
+
+        with run_scope('run1') as report:
+            self.assertIs(current_report(), report)
+            record_section('description:https://example.com', 'reused', 'page unchanged')
+            record_section('profile', 'recomputed')
+
+        summary = report.to_dict()
+        self.assertIsNone(current_report())
+        self.assertEqual(summary['reused'], ['description:https://example.com'])
+        self.assertEqual(summary['recomputed'], ['profile'])
+
+if __name__ == '__main__':
+    unittest.main()
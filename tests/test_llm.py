@@ -0,0 +1,63 @@
+import unittest
+from types import SimpleNamespace
+from src.utils.llm import CachingLiteLLMModel, record_usage
+from src.utils.run_context import run_scope
+
+STATIC = "Follow these steps to analyze the company."
+
+class TestCachingLiteLLMModel(unittest.TestCase):
+    """Test suite for the prompt-caching model wrapper."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.messages = [
+            {'role': 'system', 'content': [{'type': 'text', 'text': 'You are a code agent. Tools: ...'}]},
+            {'role': 'user', 'content': [{'type': 'text', 'text': f"New task:\n{STATIC}\n\nURL: https://example.com"}]},
+            {'role': 'assistant', 'content': [{'type': 'text', 'text': 'Thought: scrape the site'}]},
+            {'role': 'user', 'content': 'Observation: page text'}
+        ]
+
+    def cached_blocks(self, kwargs):
+        return [(message['role'], block['text']) for message in kwargs['messages']
+                for block in message['content'] if 'cache_control' in block]
+
+    def test_static_prefixes_are_marked(self):
+        """Test that system prompt, static task prefix and last message get breakpoints."""
+        model = CachingLiteLLMModel(model_id='anthropic/claude-3-5-sonnet-latest', static_prefixes=[STATIC])
+
+        kwargs = model._prepare_completion_kwargs(messages=self.messages)
+
+        self.assertEqual(self.cached_blocks(kwargs), [
+            ('system', 'You are a code agent. Tools: ...'),
+            ('user', f"New task:\n{STATIC}"),
+            ('user', 'Observation: page text')
+        ])
+        self.assertEqual(kwargs['messages'][1]['content'][1]['text'], "\n\nURL: https://example.com")
+        self.assertNotIn('cache_control', self.messages[0]['content'][0])
+
+    def test_other_providers_untouched(self):
+        """Test that non-Anthropic models get no cache breakpoints."""
+        model = CachingLiteLLMModel(model_id='openai/gpt-4o', static_prefixes=[STATIC])
+
+        kwargs = model._prepare_completion_kwargs(messages=self.messages)
+
+        blocks = [block for message in kwargs['messages'] if isinstance(message['content'], list)
+                  for block in message['content']]
+        self.assertFalse(any('cache_control' in block for block in blocks))
+
+    def test_usage_is_recorded(self):
+        """Test that cache read and write tokens are added to the run report."""
+        usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=50,
+                                cache_read_input_tokens=1000, cache_creation_input_tokens=0)
+
+        with run_scope() as report:
+            counts = record_usage(usage)
+            record_usage({'input_tokens': 10, 'output_tokens': 5, 'cache_creation_input_tokens': 900})
+
+        self.assertEqual(counts['cache_read_tokens'], 1000)
+        self.assertEqual(report.counters['llm_calls'], 2)
+        self.assertEqual(report.counters['llm_input_tokens'], 1210)
+        self.assertEqual(report.counters['llm_cache_write_tokens'], 900)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from types import SimpleNamespace
+
+from smolagents.memory import ActionStep
+from smolagents.monitoring import Timing, TokenUsage
+
+from src.utils.memory_compaction import COMPACTED_MARKER, PINNED_HEADER, MemoryCompactor
+from src.utils.run_context import pin_fact, run_scope
+
+class TestMemoryCompactor(unittest.TestCase):
+    """Test suite for agent memory compaction."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.steps = [
+            ActionStep(
+                step_number=i,
+                timing=Timing(start_time=0),
+                model_output=f"Thought: step {i}\ncode()",
+                observations=f"result {i} " + "x" * 8000,
+                token_usage=TokenUsage(input_tokens=1000 * i, output_tokens=10)
+            )
+            for i in range(1, 5)
+        ]
+        self.agent = SimpleNamespace(
+            name='orchestrator',
+            memory=SimpleNamespace(steps=self.steps),
+            write_memory_to_messages=lambda: [m for step in self.steps for m in step.to_messages()]
+        )
+        self.compactor = MemoryCompactor(threshold=3000, keep_recent=2, max_step_tokens=100)
+
+    def test_under_threshold_untouched(self):
+        """Test that memory below the threshold is left as is."""
+        compactor = MemoryCompactor(threshold=100000, keep_recent=2, max_step_tokens=100)
+        with run_scope() as report:
+            compactor(self.steps[-1], agent=self.agent)
+
+        self.assertTrue(all(COMPACTED_MARKER not in step.observations for step in self.steps))
+        step = report.to_dict()['steps'][0]
+        self.assertEqual(step['context_tokens'], step['compacted_tokens'])
+        self.assertEqual(step['prompt_tokens'], 4000)
+
+    def test_old_steps_compacted_recent_kept(self):
+        """Test that old observations are truncated and the latest steps kept whole."""
+        with run_scope() as report:
+            self.compactor(self.steps[-1], agent=self.agent)
+
+        for step in self.steps[:2]:
+            self.assertIn(COMPACTED_MARKER, step.observations)
+            self.assertTrue(step.observations.startswith(f"result {step.step_number} "))
+            self.assertLessEqual(len(step.observations), 600)
+        for step in self.steps[2:]:
+            self.assertNotIn(COMPACTED_MARKER, step.observations)
+
+        summary = report.to_dict()
+        step = summary['steps'][0]
+        self.assertEqual(step['agent'], 'orchestrator')
+        self.assertLess(step['compacted_tokens'], step['context_tokens'])
+        self.assertEqual(summary['counters']['memory_compacted_tokens'], step['context_tokens'] - step['compacted_tokens'])
+
+    def test_pinned_facts_kept_verbatim(self):
+        """Test that pinned facts survive compaction verbatim, once."""
+        profile = "Ideal customer: CTOs of 50-500 people SaaS companies. " * 20
+        with run_scope():
+            pin_fact('company_profile', profile)
+            self.compactor(self.steps[-1], agent=self.agent)
+            # Compacting again moves the block instead of duplicating it
+            self.compactor.compact(self.steps)
+
+        memory = ''.join(step.observations for step in self.steps)
+        self.assertEqual(memory.count(profile), 1)
+        self.assertEqual(memory.count(PINNED_HEADER), 1)
+        self.assertIn(PINNED_HEADER, self.steps[1].observations)
+
+if __name__ == '__main__':
+    unittest.main()
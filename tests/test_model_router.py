@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+from src.utils.model_router import ModelRouter, is_retryable
+
+class OverloadedError(Exception):
+    status_code = 529
+
+class TestModelRouter(unittest.TestCase):
+    """Test suite for the latency-aware model router."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.router = ModelRouter(routes={
+            'summarize': {'models': ['fast', 'backup'], 'slo': 2.0},
+            'plan': {'models': ['smart', 'fast'], 'slo': 30.0}
+        }, cooldown=60)
+
+    def test_falls_back_on_overload(self):
+        """Test that an overloaded model is skipped and avoided afterwards."""
+        calls = []
+
+        def call(model, timeout):
+            calls.append((model, timeout))
+            if model == 'fast':
+                raise OverloadedError("overloaded")
+            return f"answer from {model}"
+
+        self.assertEqual(self.router.call('summarize', call), "answer from backup")
+        self.assertEqual(calls, [('fast', 6.0), ('backup', 6.0)])
+        self.assertEqual(self.router.candidates('summarize'), ['backup', 'fast'])
+        self.assertEqual(self.router.stats()['fast']['failures'], 1)
+
+    def test_other_errors_are_raised(self):
+        """Test that errors another model would not fix are not retried."""
+        def call(model, timeout):
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            self.router.call('summarize', call)
+        self.assertFalse(is_retryable(ValueError()))
+        self.assertTrue(is_retryable(TimeoutError()))
+
+    def test_slow_models_are_demoted(self):
+        """Test that models over the SLO are tried after the ones meeting it."""
+        with patch('src.utils.model_router.time.monotonic', side_effect=[0, 0, 5, 10]):
+            self.router.call('summarize', lambda model, timeout: "ok")
+
+        self.assertEqual(self.router.stats()['fast']['latency'], 5)
+        self.assertEqual(self.router.select('summarize'), 'backup')
+        # The same latency meets a looser SLO
+        self.assertEqual(self.router.select('summarize', slo=10.0), 'fast')
+
+    def test_all_models_failing(self):
+        """Test the error raised when no model succeeds."""
+        def call(model, timeout):
+            raise TimeoutError()
+
+        with self.assertRaises(Exception):
+            self.router.call('plan', call)
+        with self.assertRaises(ValueError):
+            self.router.select('unknown')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.agents.web_agent import describe_company_from_url, fetch_page_text, key_pages, prefetch_site, start_prefetch
+from src.services.storage_service import DataStore
+from src.utils.content_extractor import get_content_extractor
+from src.utils.run_context import run_scope
+
+LANDING = """<html><head><title>Acme</title></head><body>
+<nav><a href="/pricing">Pricing</a><a href="https://other.com/about">Partner</a></nav>
+<main><h1>Acme</h1><p>Acme builds deployment tools for developer teams.</p>
+<a href="/about">About us</a><a href="/blog/2024/about-our-pricing">Blog</a><a href="#top">Top</a></main>
+</body></html>"""
+
+SITEMAP = """<urlset><url><loc>https://acme.com/features</loc></url>
+<url><loc>https://acme.com/careers</loc></url></urlset>"""
+
+def response(text, status_code=200):
+    return MagicMock(text=text, status_code=status_code)
+
+class TestPrefetch(unittest.TestCase):
+    """Test suite for the speculative prefetch of company websites."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        pages = {
+            'https://acme.com': response(LANDING),
+            'https://acme.com/sitemap.xml': response(SITEMAP)
+        }
+        self.session = MagicMock()
+        self.session.get.side_effect = lambda url: pages.get(url, response("<p>Page</p>"))
+        patch('src.agents.web_agent.session', self.session).start()
+        patch('src.agents.web_agent.get_data_store').start()
+        self.addCleanup(patch.stopall)
+
+    def fetched(self):
+        return [call.args[0] for call in self.session.get.call_args_list]
+
+    def test_key_pages(self):
+        """Test that only top-level company pages of the same host are picked, by hint order."""
+        links = ['/pricing', 'https://other.com/about', '/about', '/blog/2024/about-our-pricing', '#top',
+                 'https://acme.com/features', 'https://acme.com/careers', '/about']
+
+        self.assertEqual(key_pages('https://acme.com', links, 3),
+                         ['https://acme.com/about', 'https://acme.com/features', 'https://acme.com/pricing'])
+
+    def test_prefetched_pages_not_fetched_again(self):
+        """Test that pages fetched by the prefetch are served from the run's fetch cache."""
+        with run_scope():
+            pages = prefetch_site('https://acme.com', max_pages=4)
+            text = fetch_page_text('https://acme.com')
+
+        self.assertEqual(pages, ['https://acme.com', 'https://acme.com/about',
+                                 'https://acme.com/features', 'https://acme.com/pricing'])
+        self.assertIn("deployment tools", text)
+        self.assertEqual(len(self.fetched()), len(set(self.fetched())))
+
+    def test_fetch_waits_for_prefetch_in_flight(self):
+        """Test that an agent asking for a page being prefetched waits instead of fetching it again."""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_get(url):
+            started.set()
+            release.wait(5)
+            return response(LANDING)
+        self.session.get.side_effect = slow_get
+
+        with run_scope():
+            stop = start_prefetch('https://acme.com')
+            self.assertTrue(started.wait(5))
+            threading.Timer(0.1, release.set).start()
+            text = fetch_page_text('https://acme.com')
+            stop.set()
+
+        self.assertIn("deployment tools", text)
+        self.assertEqual(self.fetched().count('https://acme.com'), 1)
+
+    def test_description_from_prefetched_page(self):
+        """Test that the description reuses the prefetched extraction and compares it with the page stored before the run."""
+        store = DataStore(':memory:')
+        patch('src.agents.web_agent.get_data_store', return_value=store).start()
+        generate = patch('src.agents.web_agent.generate_description', return_value="Acme makes tools").start()
+        extract = patch('src.agents.web_agent.get_content_extractor', wraps=get_content_extractor).start()
+
+        sections = []
+        for _ in range(2):
+            with run_scope() as report:
+                prefetch_site('https://acme.com', max_pages=4)
+                self.assertEqual(describe_company_from_url('https://acme.com'), "Acme makes tools")
+            sections.append(report.sections['description:https://acme.com'])
+
+        self.assertEqual(sections, [{'status': 'recomputed', 'detail': "new page"},
+                                    {'status': 'reused', 'detail': "page unchanged"}])
+        self.assertEqual(generate.call_count, 1)
+        # Four pages a run, the landing page extracted once for the prefetch and the description
+        self.assertEqual(extract.call_count, 8)
+
+    def test_failed_prefetch_fetched_again(self):
+        """Test that a failed prefetch does not keep the agents from fetching the page."""
+        self.session.get.side_effect = [ConnectionError("down"), response(LANDING)]
+        with run_scope():
+            self.assertEqual(prefetch_site('https://acme.com'), [])
+            self.assertIn("deployment tools", fetch_page_text('https://acme.com'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.services.publish_queue import DONE, FAILED, PENDING, PublishQueue, PublishScheduler
+from src.utils.run_context import run_scope
+
+class TestPublishQueue(unittest.TestCase):
+    """Test suite for the publish queue and its scheduler."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.queue = PublishQueue(':memory:')
+        self.published = []
+        self.tweet = MagicMock(side_effect=self.fake_tweet)
+        self.scheduler = PublishScheduler(self.queue, publishers={'tweet': self.tweet}, poll_interval=0)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.queue.close()
+
+    def fake_tweet(self, payload, parent):
+        reply_to = parent['result']['id'] if parent is not None else None
+        self.published.append((payload['text'], reply_to))
+        return {'id': f"t{len(self.published)}", 'text': payload['text']}
+
+    def drain(self, platform='twitter'):
+        while self.scheduler.publish_next(platform):
+            pass
+
+    def test_enqueue_is_idempotent(self):
+        """Test that the same content enqueued twice is one job, published once."""
+        first = self.queue.enqueue('tweet', {'text': "Hello"})
+        second = self.queue.enqueue('tweet', {'text': "Hello"})
+
+        self.assertEqual(first['id'], second['id'])
+        self.assertEqual(first['status'], PENDING)
+        self.drain()
+        self.assertEqual(self.published, [("Hello", None)])
+
+    def test_failed_job_queued_again(self):
+        """Test that enqueuing the content of a failed job queues that job again."""
+        job = self.queue.enqueue('tweet', {'text': "Hello"})
+        self.queue.claim('twitter')
+        self.queue.fail(job['id'], "Duplicate content")
+
+        retried = self.queue.enqueue('tweet', {'text': "Hello"})
+
+        self.assertEqual(retried['id'], job['id'])
+        self.assertEqual((retried['status'], retried['attempts'], retried['error']), (PENDING, 0, None))
+        self.drain()
+        self.assertEqual(self.published, [("Hello", None)])
+
+    def test_same_content_queued_again_in_another_run(self):
+        """Test that the default key only deduplicates within a run."""
+        with run_scope('run-1'):
+            first = self.queue.enqueue('tweet', {'text': "Hello"})
+            self.assertEqual(self.queue.enqueue('tweet', {'text': "Hello"})['id'], first['id'])
+        with run_scope('run-2'):
+            second = self.queue.enqueue('tweet', {'text': "Hello"})
+
+        self.assertNotEqual(second['id'], first['id'])
+        self.assertEqual(second['run_id'], 'run-2')
+
+    def test_unknown_action(self):
+        """Test that an unknown action is refused."""
+        with self.assertRaises(ValueError):
+            self.queue.enqueue('instagram_post', {'text': "Hello"})
+
+    def test_thread_published_in_order(self):
+        """Test that each tweet of a thread is published after, and in reply to, the previous one."""
+        first = self.queue.enqueue('tweet', {'text': "1/2"})
+        second = self.queue.enqueue('tweet', {'text': "2/2"}, depends_on=first['id'])
+        self.queue.enqueue('tweet', {'text': "Other"})
+
+        # The reply is not ready until the first tweet is published
+        self.assertEqual(self.queue.claim('twitter')['id'], first['id'])
+        self.assertNotEqual(self.queue.claim('twitter')['id'], second['id'])
+        self.assertIsNone(self.queue.claim('twitter'))
+
+        self.queue.complete(first['id'], {'id': 't1'})
+        job = self.queue.claim('twitter')
+        self.assertEqual(job['id'], second['id'])
+        self.assertEqual(job['parent']['result'], {'id': 't1'})
+
+    def test_thread_replies_to_published_tweet(self):
+        """Test that the scheduler passes the published parent to the publisher."""
+        first = self.queue.enqueue('tweet', {'text': "1/2"})
+        self.queue.enqueue('tweet', {'text': "2/2"}, depends_on=first['id'])
+
+        self.drain()
+
+        self.assertEqual(self.published, [("1/2", None), ("2/2", "t1")])
+        self.assertEqual(self.queue.stats(), {DONE: 2})
+
+    @patch('src.services.publish_queue.settings')
+    def test_retry_then_fail(self, mock_settings):
+        """Test that a failed publish is retried with backoff, then failed after the last attempt."""
+        mock_settings.PUBLISH_LEASE = 60
+        mock_settings.PUBLISH_MAX_ATTEMPTS = 2
+        mock_settings.PUBLISH_RETRY_DELAY = 30
+        mock_settings.PUBLISH_MAX_RETRY_DELAY = 900
+        self.tweet.side_effect = ConnectionError("Twitter is down")
+        job = self.queue.enqueue('tweet', {'text': "Hello"})
+
+        self.assertTrue(self.scheduler.publish_next('twitter'))
+        retried = self.queue.get(job['id'])
+        self.assertEqual(retried['status'], PENDING)
+        self.assertEqual(retried['error'], "Twitter is down")
+        # Not ready again before its retry delay
+        self.assertIsNone(self.queue.claim('twitter'))
+
+        self.queue._update(job['id'], not_before=0)
+        self.scheduler.publish_next('twitter')
+        failed = self.queue.get(job['id'])
+        self.assertEqual(failed['status'], FAILED)
+        self.assertEqual(failed['attempts'], 2)
+
+    def test_retry_delay(self):
+        """Test that the retry delay doubles and is capped."""
+        with patch('src.services.publish_queue.settings') as mock_settings:
+            mock_settings.PUBLISH_RETRY_DELAY = 30
+            mock_settings.PUBLISH_MAX_RETRY_DELAY = 100
+            self.assertEqual([self.scheduler.retry_delay(n) for n in (1, 2, 3, 4)], [30, 60, 100, 100])
+
+    def test_invalid_content_not_retried(self):
+        """Test that a publish refused as invalid fails at once."""
+        self.tweet.side_effect = ValueError("Tweet is too long")
+        job = self.queue.enqueue('tweet', {'text': "Hello"})
+
+        self.drain()
+
+        self.assertEqual(self.queue.get(job['id'])['status'], FAILED)
+        self.assertEqual(self.tweet.call_count, 1)
+
+    def test_failed_parent_fails_replies(self):
+        """Test that the rest of a thread is not published once a tweet failed."""
+        first = self.queue.enqueue('tweet', {'text': "1/2"})
+        second = self.queue.enqueue('tweet', {'text': "2/2"}, depends_on=first['id'])
+        self.queue.complete(first['id'], {})
+        self.queue.fail(first['id'], "Duplicate content")
+
+        self.drain()
+
+        self.assertEqual(self.queue.get(second['id'])['status'], FAILED)
+        self.tweet.assert_not_called()
+
+    def test_expired_lease_reclaimed(self):
+        """Test that a job left in progress by a crashed worker is published again."""
+        job = self.queue.enqueue('tweet', {'text': "Hello"})
+        self.assertEqual(self.queue.claim('twitter', lease=3600)['id'], job['id'])
+        self.assertIsNone(self.queue.claim('twitter'))
+
+        self.queue._update(job['id'], leased_until=0)
+        reclaimed = self.queue.claim('twitter')
+
+        self.assertEqual(reclaimed['id'], job['id'])
+        self.assertEqual(reclaimed['attempts'], 2)
+
+    def test_platforms_are_separate(self):
+        """Test that a worker only takes the jobs of its platform."""
+        self.queue.enqueue('reddit_post', {'subreddit': 'python', 'title': "Hello", 'content': "World"})
+
+        self.assertIsNone(self.queue.claim('twitter'))
+        self.assertEqual(self.queue.claim('reddit')['action'], 'reddit_post')
+
+if __name__ == '__main__':
+    unittest.main()
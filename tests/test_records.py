@@ -0,0 +1,60 @@
+import json
+import unittest
+import numpy as np
+from dataclasses import FrozenInstanceError
+from src.models.records import PageSnapshot, RedditPost, SubredditProfile, Tweet, from_columns, to_columns
+
+class TestRecords(unittest.TestCase):
+    """Test suite for the slotted record types."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tweet = Tweet.from_dict({
+            'id': 1, 'text': 'hello', 'created_at': '2024-01-01T00:00:00Z', 'author_id': 7,
+            'metrics': {'like_count': 3, 'retweet_count': 1, 'reply_count': 0, 'quote_count': 0}
+        })
+        self.post = RedditPost.from_dict({'id': 'a', 'title': 'Post', 'score': 10, 'created_utc': 1700000000.5})
+
+    def test_records_are_slotted_and_frozen(self):
+        """Test that records carry no instance dict and cannot be mutated."""
+        self.assertFalse(hasattr(self.tweet, '__dict__'))
+        with self.assertRaises(FrozenInstanceError):
+            self.tweet.text = 'changed'
+
+    def test_dict_style_access(self):
+        """Test that records answer reads written for the former dicts."""
+        self.assertEqual(self.tweet['id'], '1')
+        self.assertEqual(self.tweet.get('metrics')['like_count'], 3)
+        self.assertIsNone(self.post.get('permalink'))
+        with self.assertRaises(KeyError):
+            self.post['permalink']
+
+    def test_json_round_trip(self):
+        """Test conversion to JSON and back."""
+        for record in (self.tweet, self.post):
+            restored = type(record).from_dict(json.loads(json.dumps(record.to_dict())))
+            self.assertEqual(restored, record)
+
+        profile = SubredditProfile.from_parts({'name': 'python', 'subscribers': 5}, [{'short_name': 'Be nice'}])
+        self.assertEqual(SubredditProfile.from_dict(profile.to_dict()), profile)
+
+    def test_columns_round_trip(self):
+        """Test conversion to columns and back."""
+        posts = [self.post, RedditPost.from_dict({'id': 'b', 'title': 'Other', 'score': 3, 'num_comments': 2})]
+
+        columns = to_columns(posts)
+
+        np.testing.assert_array_equal(columns['score'], [10, 3])
+        self.assertTrue(np.isnan(columns['num_comments'][0]))
+        self.assertEqual(from_columns(RedditPost, columns), posts)
+        self.assertEqual(to_columns([]), {})
+
+    def test_page_snapshot_summary(self):
+        """Test the summary properties kept from the former analyze_website dict."""
+        page = PageSnapshot.from_dict({'url': 'https://example.com', 'title': 'Example', 'content': 'x' * 600})
+
+        self.assertEqual(page['meta_info']['title'], 'Example')
+        self.assertEqual(len(page['content_summary']), 503)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import praw
+from praw.models import Comment, MoreComments
+
+from src.services.reddit_service import RedditService, reddit_cache
+
+reddit = praw.Reddit(client_id='id', client_secret='secret', user_agent='insocia-tests')
+
+def _comment(id, parent_id, score, replies=()):
+    """Build a praw Comment as loaded from a thread, without the API."""
+    comment = Comment(reddit, _data={'id': id, 'parent_id': parent_id, 'link_id': 't3_p1', 'author': 'alice',
+                                     'body': f"comment {id}", 'score': score, 'created_utc': 1700000000})
+    comment._replies = list(replies)
+    return comment
+
+def _more(parent_id, children, depth, load):
+    """Build a 'load more comments' stub whose expansion calls load()."""
+    more = MoreComments(reddit, {'count': len(children), 'children': children, 'parent_id': parent_id,
+                                 'depth': depth, 'id': children[0], 'name': f"t1_{children[0]}"})
+    more.comments = load
+    return more
+
+class TestRedditCommentTree(unittest.TestCase):
+    """Test suite for the bounded, cached comment-tree fetcher."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = RedditService.__new__(RedditService)
+        self.service.reddit = Mock()
+        self.expanded = []
+        reddit_cache.invalidate('comments')
+
+    def thread(self, num_comments, forest):
+        self.service.reddit.submission.return_value = Mock(num_comments=num_comments, comments=forest)
+
+    def load(self, *comments):
+        def comments_of_stub():
+            self.expanded.append([comment.id for comment in comments])
+            return list(comments)
+        return comments_of_stub
+
+    def test_flattened_and_ranked(self):
+        """Test that stubs are expanded and comments flattened by score, with their depth and parent."""
+        self.thread(4, [
+            _comment('a', 't3_p1', 10, [_comment('b', 't1_a', 3)]),
+            _more('t3_p1', ['c', 'd'], 0, self.load(_comment('c', 't3_p1', 50), _comment('d', 't1_c', 7)))
+        ])
+
+        comments = self.service.get_comment_tree('p1')
+
+        self.assertEqual([comment.id for comment in comments], ['c', 'a', 'd', 'b'])
+        self.assertEqual([(comment.depth, comment.parent_id) for comment in comments],
+                         [(0, None), (0, None), (1, 'c'), (1, 'a')])
+
+    def test_depth_budget(self):
+        """Test that replies past max_depth are neither kept nor expanded."""
+        self.thread(3, [
+            _comment('a', 't3_p1', 10, [
+                _comment('b', 't1_a', 3, [_comment('c', 't1_b', 1)]),
+                _more('t1_a', ['d'], 1, self.load(_comment('d', 't1_a', 2)))
+            ])
+        ])
+
+        comments = self.service.get_comment_tree('p1', max_depth=1)
+
+        self.assertEqual([comment.id for comment in comments], ['a'])
+        self.assertEqual(self.expanded, [])
+
+    def test_comment_budget(self):
+        """Test that no more stubs are expanded once max_comments are loaded."""
+        self.thread(10, [
+            _comment('a', 't3_p1', 10),
+            _comment('b', 't3_p1', 5),
+            _more('t3_p1', ['c'], 0, self.load(_comment('c', 't3_p1', 1)))
+        ])
+
+        comments = self.service.get_comment_tree('p1', max_comments=2)
+
+        self.assertEqual(len(comments), 2)
+        self.assertEqual(self.expanded, [])
+
+    def test_time_budget(self):
+        """Test that a slow stub does not hold the fetch past its time budget."""
+        release = threading.Event()
+
+        def slow_stub():
+            release.wait(5)
+            return [_comment('c', 't3_p1', 1)]
+        self.thread(3, [_comment('a', 't3_p1', 10), _more('t3_p1', ['c'], 0, slow_stub)])
+
+        started = time.monotonic()
+        comments = self.service.get_comment_tree('p1', time_budget=0.2)
+        release.set()
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual([comment.id for comment in comments], ['a'])
+        self.assertFalse(reddit_cache.get('comments', 'p1')['complete'])
+
+    def test_stubs_expanded_concurrently(self):
+        """Test that sibling stubs are expanded in parallel."""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def stub(comment):
+            def load():
+                # Only passes if the other stub is being expanded at the same time
+                barrier.wait()
+                return [comment]
+            return load
+        self.thread(2, [
+            _more('t3_p1', ['a'], 0, stub(_comment('a', 't3_p1', 1))),
+            _more('t3_p1', ['b'], 0, stub(_comment('b', 't3_p1', 2)))
+        ])
+
+        comments = self.service.get_comment_tree('p1')
+
+        self.assertEqual([comment.id for comment in comments], ['b', 'a'])
+
+    def test_cached_then_revalidated_incrementally(self):
+        """Test that a cached tree is reused, then only its missing comments fetched once the post changed."""
+        self.thread(2, [
+            _comment('a', 't3_p1', 10),
+            _more('t3_p1', ['b'], 0, self.load(_comment('b', 't3_p1', 5)))
+        ])
+        self.service.get_comment_tree('p1')
+        self.service.get_comment_tree('p1')
+        self.assertEqual(self.service.reddit.submission.call_count, 1)
+
+        with patch('src.services.reddit_service.settings.REDDIT_COMMENTS_REVALIDATE_AFTER', 0):
+            # Same comment count: one request, no stub expanded again
+            self.service.get_comment_tree('p1')
+            self.assertEqual(self.expanded, [['b']])
+
+            self.thread(3, [
+                _comment('a', 't3_p1', 12),
+                _more('t3_p1', ['b'], 0, self.load(_comment('b', 't3_p1', 5))),
+                _more('t3_p1', ['c'], 0, self.load(_comment('c', 't3_p1', 20)))
+            ])
+            comments = self.service.get_comment_tree('p1')
+
+        self.assertEqual(self.expanded, [['b'], ['c']])
+        self.assertEqual([(comment.id, comment.score) for comment in comments], [('c', 20), ('a', 12), ('b', 5)])
+
+    def test_truncated_tree_expanded_with_bigger_budget(self):
+        """Test that a tree cut by a budget is expanded further when asked for more, keeping its depth."""
+        self.thread(3, [
+            _comment('a', 't3_p1', 10),
+            _more('t3_p1', ['b'], 0, self.load(_comment('b', 't3_p1', 5))),
+            _more('t3_p1', ['c'], 0, self.load(_comment('c', 't3_p1', 20)))
+        ])
+        comments = self.service.get_comment_tree('p1', max_depth=3, max_comments=1)
+        self.assertEqual([comment.id for comment in comments], ['a'])
+
+        comments = self.service.get_comment_tree('p1', max_depth=1, max_comments=10)
+
+        self.assertEqual(sorted(self.expanded), [['b'], ['c']])
+        self.assertEqual([comment.id for comment in comments], ['c', 'a', 'b'])
+        cached = reddit_cache.get('comments', 'p1')
+        self.assertTrue(cached['complete'])
+        self.assertEqual(cached['max_depth'], 3)
+
+    def test_known_stub_expanded_again_when_cut_below(self):
+        """Test that a stub whose comments are known is expanded again if replies below them were cut."""
+        def thread():
+            self.thread(3, [
+                _comment('a', 't3_p1', 10),
+                _more('t3_p1', ['b'], 0, self.load(
+                    _comment('b', 't3_p1', 5, [_more('t1_b', ['c'], 1, self.load(_comment('c', 't1_b', 1)))])
+                ))
+            ])
+        thread()
+        self.service.get_comment_tree('p1', max_comments=2)
+        self.assertEqual(self.expanded, [['b']])
+
+        thread()
+        comments = self.service.get_comment_tree('p1', max_comments=10)
+
+        self.assertEqual(self.expanded, [['b'], ['b'], ['c']])
+        self.assertEqual([comment.id for comment in comments], ['a', 'b', 'c'])
+
+class TestRedditNewComments(unittest.TestCase):
+    """Test suite for the subreddit comments watermark."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = RedditService.__new__(RedditService)
+        self.service.reddit = Mock()
+        # 300 comments, newest first, with increasing base 36 IDs
+        self.listing = [_comment(f"{id:x}", 't3_p1', 1) for id in range(0x10300, 0x10000, -1)]
+        self.service.reddit.subreddit.return_value.comments.side_effect = lambda limit: iter(self.listing[:limit])
+        patch.object(RedditService._fetch_listing.limiter, 'calls', 10000).start()
+        self.addCleanup(patch.stopall)
+
+    def test_pages_back_to_last_seen(self):
+        """Test that more than a page of new comments is read, down to the last one seen."""
+        with patch.object(RedditService._fetch_listing.limiter, 'acquire') as acquire:
+            comments = self.service.get_new_comments(['python'], limit=1000, after_id=self.listing[250].id)
+
+        self.assertEqual([comment['id'] for comment in comments], [comment.id for comment in self.listing[:250]])
+        # One call per page of 100
+        self.assertEqual(acquire.call_count, 3)
+
+    def test_gap_not_closed(self):
+        """Test that a warning is logged when the last comment seen is out of reach."""
+        with self.assertLogs('src.services.reddit_service', level='WARNING'):
+            comments = self.service.get_new_comments(['python'], limit=100, after_id=self.listing[250].id)
+
+        self.assertEqual(len(comments), 100)
+
+def _submission(id, subreddit, score=10):
+    """Build a praw Submission stand-in as returned by a listing."""
+    return Mock(id=id, subreddit=Mock(display_name=subreddit), author=None, title=f"Post {id}", selftext='',
+                url=f"https://reddit.com/{id}", score=score, num_comments=2, is_self=True, created_utc=1700000000)
+
+class TestRedditSubredditsBatch(unittest.TestCase):
+    """Test suite for the batched subreddit fetcher."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = RedditService.__new__(RedditService)
+        self.service.reddit = Mock()
+        self.known = {'big', 'small', 'a', 'b', 'c'}
+        # Posts of each subreddit in combined 'a+b' listings (10 otherwise)
+        self.in_combined = {'big': 18, 'small': 2}
+        self.service.reddit.info.side_effect = lambda subreddits: [
+            Mock(display_name=name, description='', subscribers=100, created_utc=1600000000)
+            for name in subreddits if name in self.known
+        ]
+        self.service.reddit.subreddit.side_effect = lambda name: Mock(hot=lambda limit: self.listing(name)[:limit])
+        patch('src.services.reddit_service.get_data_store').start()
+        # Every test shares the 'reddit' rate limit: keep it out of the way
+        patch.object(RedditService._fetch_listing.limiter, 'calls', 10000).start()
+        self.addCleanup(patch.stopall)
+        for kind in ('about', 'hot', 'rules'):
+            reddit_cache.invalidate(kind)
+
+    def listing(self, name):
+        names = name.split('+')
+        if len(names) == 1:
+            return [_submission(f"{name}{i}", name) for i in range(10)]
+        # Interleaved like a real hot listing
+        return [_submission(f"{n}{i}", n) for i in range(20) for n in names
+                if n in self.known and i < self.in_combined.get(n, 10)]
+
+    def listings_fetched(self):
+        return [call.args[0] for call in self.service.reddit.subreddit.call_args_list]
+
+    def test_short_subreddits_topped_up(self):
+        """Test that a subreddit crowded out of the combined listing gets its own, which is cached whole."""
+        batch = self.service.get_subreddits_batch(['big', 'small'], posts_per_subreddit=10, include_rules=False)
+
+        self.assertEqual([len(entry['hot_posts']) for entry in batch], [10, 10])
+        self.assertEqual(self.listings_fetched(), ['big+small', 'small'])
+        self.assertEqual(len(self.service.get_listing('small', 'hot', 10)), 10)
+        self.assertEqual(len(self.listings_fetched()), 2)
+
+    def test_chunked_lookups(self):
+        """Test that names are looked up in chunks, unknown subreddits reported without a top-up."""
+        with patch('src.services.reddit_service.MULTIREDDIT_CHUNK_SIZE', 2), \
+                patch('src.services.reddit_service.INFO_CHUNK_SIZE', 2):
+            batch = self.service.get_subreddits_batch(['a', 'b', 'c', 'gone'], posts_per_subreddit=5,
+                                                      include_rules=False)
+
+        self.assertEqual([call.kwargs['subreddits'] for call in self.service.reddit.info.call_args_list],
+                         [['a', 'b'], ['c', 'gone']])
+        self.assertEqual(self.listings_fetched(), ['a+b', 'c+gone'])
+        self.assertEqual([(entry['name'], entry['about'] is not None, len(entry['hot_posts'])) for entry in batch],
+                         [('a', True, 5), ('b', True, 5), ('c', True, 5), ('gone', False, 0)])
+
+    def test_cached_batch(self):
+        """Test that a second batch over the same subreddits makes no API call."""
+        self.service.get_subreddits_batch(['a', 'b'], posts_per_subreddit=5, include_rules=False)
+        self.service.reddit.reset_mock()
+
+        batch = self.service.get_subreddits_batch(['a', 'b'], posts_per_subreddit=5, include_rules=False)
+
+        self.assertEqual([len(entry['hot_posts']) for entry in batch], [5, 5])
+        self.service.reddit.info.assert_not_called()
+        self.service.reddit.subreddit.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock
+from src.models.records import RedditPost
+from src.services.storage_service import DataStore
+
+class TestDataStore(unittest.TestCase):
+    """Test suite for the local SQLite data store."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.store = DataStore(':memory:')
+
+    def test_reddit_posts_round_trip(self):
+        """Test saving, updating and querying Reddit posts."""
+        posts = [
+            {'id': 'a', 'subreddit': 'Python', 'title': 'First', 'score': 10, 'num_comments': 2,
+             'is_self': True, 'created_utc': 1700000000},
+            {'id': 'b', 'subreddit': 'python', 'title': 'Second', 'score': 5, 'num_comments': 1,
+             'is_self': False, 'created_utc': 1700003600}
+        ]
+        self.store.save_reddit_posts(posts)
+        self.store.save_reddit_posts([{'id': 'a', 'title': 'First', 'score': 42, 'created_utc': 1700000000}],
+                                     query='django')
+
+        rows = self.store.query_posts(platform='reddit', subreddit='PYTHON')
+
+        self.assertEqual([row['id'] for row in rows], ['b', 'a'])
+        self.assertEqual(rows[1]['score'], 42)
+        self.assertEqual(rows[1]['num_comments'], 2)
+        self.assertTrue(rows[1]['is_self'])
+        self.assertEqual(len(self.store.query_posts(query='django')), 1)
+        self.assertEqual(len(self.store.query_posts(since=1700001000)), 1)
+
+    def test_reddit_posts_by_author(self):
+        """Test that posts fetched from the API are stored with their author and body."""
+        def submission(id, author):
+            return Mock(id=id, subreddit=Mock(display_name='python'), author=author, title=f"Post {id}",
+                        selftext=f"Body {id}", url=f"https://reddit.com/{id}", score=1, num_comments=0,
+                        is_self=True, created_utc=1700000000)
+        self.store.save_reddit_posts([RedditPost.from_api(submission('a', 'alice')),
+                                      RedditPost.from_api(submission('b', None))])
+
+        rows = self.store.query_posts(platform='reddit', author='alice')
+
+        self.assertEqual([row['id'] for row in rows], ['a'])
+        self.assertEqual(rows[0]['selftext'], "Body a")
+
+    def test_tweets_are_shaped_for_analytics(self):
+        """Test that stored tweets come back with metrics and created_at."""
+        created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.store.save_tweets([{
+            'id': 1, 'author_id': 7, 'text': 'hello', 'created_at': created,
+            'metrics': {'like_count': 3, 'reply_count': 1, 'retweet_count': 2}
+        }], query='hello')
+
+        row = self.store.query_posts(platform='twitter', author='7')[0]
+
+        self.assertEqual(row['metrics']['like_count'], 3)
+        self.assertEqual(row['created_at'], created.timestamp())
+        self.assertEqual(row['author_id'], '7')
+
+    def test_subreddit_partial_upserts(self):
+        """Test that 'about' data and rules saved separately are merged."""
+        self.store.save_subreddit('Python', about={'name': 'Python', 'subscribers': 100})
+        self.store.save_subreddit('python', rules=[{'short_name': 'Be nice', 'description': ''}])
+
+        subreddit = self.store.get_subreddit('PYTHON')
+
+        self.assertEqual(subreddit['subscribers'], 100)
+        self.assertEqual(subreddit['rules'][0]['short_name'], 'Be nice')
+        self.assertIsNone(self.store.get_subreddit('unknown'))
+
+    def test_pages_and_failed_writes(self):
+        """Test page upserts, and that invalid rows are logged instead of raised."""
+        self.store.save_page('https://example.com', 'content', status_code=200, title='Example')
+        self.store.save_page('https://example.com', 'new content')
+
+        page = self.store.get_page('https://example.com')
+
+        self.assertEqual(page['content'], 'new content')
+        self.assertEqual(page['title'], 'Example')
+        self.assertEqual(self.store.save_tweets([{'text': 'no id'}]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import random
+import unittest
+from unittest.mock import Mock, patch
+
+from src.analytics.trends import (CountMinSketch, SpaceSaving, TrendTracker, current_trends, extract_terms,
+                                  format_trends)
+from src.models.records import RedditPost, Tweet
+from src.services.twitter_service import _store_page
+from src.utils.run_context import run_scope
+
+HOUR = 3600
+NOW = 1000 * HOUR
+
+def tweet(id, text, created_at=NOW):
+    return Tweet(id=str(id), text=text, created_at=created_at, author_id='1', conversation_id=str(id),
+                 like_count=0, retweet_count=0, reply_count=0, quote_count=0)
+
+class TestSketches(unittest.TestCase):
+    """Test suite for the count-min sketch and space-saving counters."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = random.Random(7)
+        # Zipf-like stream: a few heavy keys and a long tail
+        self.stream = [f"key{min(int(rng.paretovariate(1.2)), 5000)}" for _ in range(20000)]
+        self.counts = {}
+        for key in self.stream:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def test_count_min_never_undercounts(self):
+        """Test that estimates are upper bounds within the sketch's error."""
+        sketch = CountMinSketch(width=512, depth=4)
+        for start in range(0, len(self.stream), 100):
+            for key in self.stream[start:start + 100]:
+                sketch.add([key])
+
+        keys = list(self.counts)
+        estimates = sketch.estimate(keys)
+
+        for key, estimate in zip(keys, estimates):
+            self.assertGreaterEqual(estimate, self.counts[key])
+        self.assertLessEqual(max(estimates - [self.counts[key] for key in keys]), 2 * len(self.stream) / 512)
+
+    def test_space_saving_finds_heavy_hitters(self):
+        """Test that the most frequent keys are found with few counters."""
+        summary = SpaceSaving(capacity=50)
+        for key in self.stream:
+            summary.add(key)
+
+        expected = sorted(self.counts, key=self.counts.get, reverse=True)[:5]
+        top = summary.top(5)
+
+        self.assertEqual([key for key, _, _ in top], expected)
+        self.assertEqual(len(summary.counts), 50)
+        for key, count, error in top:
+            self.assertLessEqual(count - error, self.counts[key])
+            self.assertGreaterEqual(count, self.counts[key])
+
+class TestTrendTracker(unittest.TestCase):
+    """Test suite for streaming trend detection."""
+
+    def test_extract_terms(self):
+        """Test that hashtags, terms without stop words and linked domains are extracted once each."""
+        terms = extract_terms("Shipping #DevOps pipelines with @acme: the #devops way https://www.acme.com/blog "
+                              "https://t.co/x1", url="https://github.com/acme/ci")
+
+        self.assertEqual(terms['hashtag'], ['devops'])
+        self.assertEqual(terms['domain'], ['acme.com', 'github.com'])
+        self.assertIn('pipelines', terms['term'])
+        self.assertIn('shipping', terms['term'])
+        self.assertNotIn('the', terms['term'])
+        self.assertNotIn('acme', terms['term'])
+
+    def test_top_terms(self):
+        """Test that terms are ranked by number of items and items seen twice counted once."""
+        tracker = TrendTracker(window=HOUR)
+        tracker.observe_tweets([tweet(i, "Kubernetes tips #k8s") for i in range(5)])
+        tracker.observe_tweets([tweet(i, "Kubernetes tips #k8s") for i in range(5)])
+        tracker.observe_posts([RedditPost(id='p1', subreddit='devops', author='alice', title="Kubernetes at scale",
+                                          selftext='', url='https://www.acme.com/post', score=1, num_comments=0,
+                                          is_self=False, created_utc=NOW)])
+
+        self.assertEqual(tracker.items, 6)
+        self.assertEqual(tracker.top('hashtag'), [{'term': 'k8s', 'count': 5}])
+        self.assertEqual(tracker.top('term', 1), [{'term': 'kubernetes', 'count': 6}])
+        self.assertEqual(tracker.top('domain'), [{'term': 'acme.com', 'count': 1}])
+
+    def test_rising_terms(self):
+        """Test that terms whose share of the latest window grew are flagged, steady ones not."""
+        tracker = TrendTracker(window=HOUR, windows=3)
+        for i in range(40):
+            tracker.observe(f"#python tips {i}", created_at=NOW - 2 * HOUR + i)
+            tracker.observe(f"#python news {i}", created_at=NOW - HOUR + i)
+        for i in range(20):
+            tracker.observe("#python", created_at=NOW + i)
+            tracker.observe("#rustlang is here", created_at=NOW + i)
+
+        rising = tracker.rising('hashtag')
+
+        self.assertEqual([term['term'] for term in rising], ['rustlang'])
+        self.assertEqual(rising[0]['count'], 20)
+        self.assertEqual(rising[0]['expected'], 0)
+
+    def test_old_windows_dropped(self):
+        """Test that only the latest windows are kept, older items counting in the overall ranking only."""
+        tracker = TrendTracker(window=HOUR, windows=2)
+        tracker.observe("#old", created_at=NOW - 5 * HOUR)
+        tracker.observe("#new", created_at=NOW)
+        tracker.observe("#older", created_at=NOW - 9 * HOUR)
+
+        self.assertEqual(sorted(tracker._windows), [NOW // HOUR])
+        self.assertEqual(len(tracker.top('hashtag')), 3)
+
+    def test_seen_ids_bounded(self):
+        """Test that the IDs kept to skip duplicates stay capped, the least recently seen dropped first."""
+        tracker = TrendTracker(window=HOUR, seen_capacity=3)
+        tracker.observe_tweets([tweet(i, "#k8s") for i in range(3)])
+        tracker.observe_tweets([tweet(0, "#k8s"), tweet(3, "#k8s")])
+        self.assertEqual(tracker.items, 4)
+
+        tracker.observe_tweets([tweet(0, "#k8s"), tweet(1, "#k8s")])
+        tracker.observe_tweets([tweet(i, "#k8s") for i in range(4, 100)])
+
+        # Tweet 1 was forgotten, tweet 0 seen again just before
+        self.assertEqual(tracker.items, 101)
+        self.assertEqual(len(tracker._seen), 3)
+
+    def test_fetched_tweets_feed_the_run_tracker(self):
+        """Test that tweets fetched during a run are counted by the run's tracker, and only then."""
+        response = Mock(data=[Mock(id=i, text="Launch week #buildinpublic", created_at=None, author_id=1,
+                                   conversation_id=i, public_metrics={}) for i in range(3)])
+
+        with patch('src.services.twitter_service.get_data_store'):
+            _store_page(response, None)
+            self.assertIsNone(current_trends())
+            with run_scope():
+                _store_page(response, None)
+                summary = format_trends(current_trends())
+
+        self.assertIn("Top hashtags: #buildinpublic (3)", summary)
+
+if __name__ == '__main__':
+    unittest.main()
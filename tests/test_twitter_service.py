@@ -0,0 +1,129 @@
+import unittest
+from unittest.mock import Mock, patch
+from src.services.twitter_service import TwitterService, twitter_cache
+
+def _page(ids, next_token=None):
+    """Build a fake tweepy Response page."""
+    tweets = [Mock(id=i, text=f"tweet {i}", created_at=None, author_id=1, conversation_id=i,
+                   public_metrics={'like_count': 1}) for i in ids]
+    meta = {'newest_id': str(ids[0]) if ids else None}
+    if next_token:
+        meta['next_token'] = next_token
+    return Mock(data=tweets, meta=meta)
+
+class TestTwitterServicePagination(unittest.TestCase):
+    """Test suite for the paginated, incremental Twitter fetchers."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = TwitterService.__new__(TwitterService)
+        self.service.client = Mock()
+        twitter_cache.invalidate('since_id')
+
+    def test_follows_pagination_token_lazily(self):
+        """Test that pages are only fetched as the iterator is consumed."""
+        self.service.client.search_recent_tweets.side_effect = [
+            _page([30, 29], next_token='t1'),
+            _page([28, 27])
+        ]
+
+        iterator = self.service.iter_search('python', max_tweets=3)
+        self.service.client.search_recent_tweets.assert_not_called()
+
+        tweets = list(iterator)
+
+        self.assertEqual([t.id for t in tweets], ['30', '29', '28'])
+        second_call = self.service.client.search_recent_tweets.call_args_list[1]
+        self.assertEqual(second_call.kwargs['pagination_token'], 't1')
+
+    def test_incremental_fetch_uses_stored_since_id(self):
+        """Test that a second poll only asks for tweets newer than the first."""
+        self.service.client.get_users_tweets.side_effect = [_page([12, 11]), _page([])]
+
+        list(self.service.iter_user_timeline(42, max_tweets=10))
+        list(self.service.iter_user_timeline(42, max_tweets=10))
+
+        first_call, second_call = self.service.client.get_users_tweets.call_args_list
+        self.assertNotIn('since_id', first_call.kwargs)
+        self.assertEqual(second_call.kwargs['since_id'], '12')
+
+    def test_non_incremental_fetch_keeps_watermark(self):
+        """Test that full reloads neither use nor move the stored since_id."""
+        twitter_cache.set('since_id', 'search:python', '5')
+        self.service.client.search_recent_tweets.return_value = _page([9])
+
+        self.service.search_tweets('python', max_results=10)
+
+        self.assertNotIn('since_id', self.service.client.search_recent_tweets.call_args.kwargs)
+        self.assertEqual(twitter_cache.get('since_id', 'search:python'), '5')
+
+    def test_mentions_of_own_account_since_last_poll(self):
+        """Test that mentions default to the authenticated account and resume after the newest one."""
+        self.service.client.get_me.return_value = Mock(data=Mock(id=1))
+        self.service.client.get_users_mentions.side_effect = [_page([21, 20]), _page([])]
+
+        list(self.service.iter_mentions())
+        list(self.service.iter_mentions())
+
+        first_call, second_call = self.service.client.get_users_mentions.call_args_list
+        self.assertEqual(first_call.kwargs['id'], '1')
+        self.assertEqual(second_call.kwargs['since_id'], '21')
+        self.assertEqual(self.service.client.get_me.call_count, 1)
+
+    def test_uncapped_mentions_read_to_the_end(self):
+        """Test that an uncapped walk follows every page before moving the watermark."""
+        self.service.client.get_users_mentions.side_effect = [
+            _page(list(range(300, 200, -1)), next_token='t1'),
+            _page(list(range(200, 150, -1)))
+        ]
+
+        tweets = list(self.service.iter_mentions(user_id=1, max_tweets=None))
+
+        self.assertEqual(len(tweets), 150)
+        self.assertEqual(self.service.client.get_users_mentions.call_args.kwargs['max_results'], 100)
+        self.assertEqual(twitter_cache.get('since_id', 'mentions:1'), '300')
+
+class TestTwitterServiceUsers(unittest.TestCase):
+    """Test suite for the batched, cached user resolver."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = TwitterService.__new__(TwitterService)
+        self.service.client = Mock()
+        twitter_cache.invalidate('user')
+
+    @staticmethod
+    def _users(ids):
+        users = []
+        for i in ids:
+            user = Mock(id=i, description='', verified=False, public_metrics={'followers_count': i})
+            user.name = f"User {i}"
+            user.username = f"User{i}"
+            users.append(user)
+        return Mock(data=users)
+
+    def test_batches_lookups_by_100(self):
+        """Test that 250 usernames are resolved in three requests."""
+        self.service.client.get_users.side_effect = lambda usernames, user_fields: self._users(
+            [int(name[4:]) for name in usernames]
+        )
+
+        users = self.service.get_users([f"user{i}" for i in range(1, 251)])
+
+        self.assertEqual(len(users), 250)
+        self.assertEqual(self.service.client.get_users.call_count, 3)
+
+    def test_cached_users_skip_the_api(self):
+        """Test that users resolved by name are cached for lookups by ID."""
+        self.service.client.get_users.return_value = self._users([7])
+
+        self.service.get_users(['@User7'])
+        by_id = self.service.get_users_by_ids([7])
+        info = self.service.get_user_info('user7')
+
+        self.assertEqual(self.service.client.get_users.call_count, 1)
+        self.assertEqual(by_id['7']['username'], 'User7')
+        self.assertEqual(info['followers_count'], 7)
+
+if __name__ == '__main__':
+    unittest.main()